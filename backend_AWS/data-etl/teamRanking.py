@@ -1,20 +1,162 @@
+import glob
+import json
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
-df= pd.read_csv('data_2023_sorted_latest_rating.csv')
-df['leagueId'] = df['leagueId'].astype(np.int64)
-df['team_id'] = df['team_id'].astype(np.int64)
+#The rating history is read the same way as for the API's snapshot, and the
+#ranking rules live with the API's query engine, so both agree.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda-functions'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'models'))
+from ranking_engine import league_ranks, tied_ranks
+from ranking_snapshot import load_rating_history, load_team_names
+
+#Teams are ranked within a league, a year and a split (stageTournament, e.g.
+#"LCK 2022 Spring"). Files are split by league and year so that Athena only
+#reads the partitions a query asks for.
+GROUP_KEYS = ['leagueid', 'year', 'split']
+PARTITION_KEYS = ['leagueid', 'year']
+OUTPUT_DIR = 'teamRankings'
+#Athena skips files starting with an underscore. Holds the last game date
+#and the games seen at that date (see new_games).
+STATE_FILE = '_last_games.json'
+
+COLUMNS = GROUP_KEYS + ['tournament_name', 'team_id', 'team_code', 'team_name', 'rating', 'date']
+
+def latest_ratings(history, teams=None):
+    '''Last rating of every team in every league, year and split.'''
+    if teams is None:
+        teams = load_team_names()
+    latest = history.drop_duplicates(subset=['leagueId', 'year', 'stageTournament', 'team'], keep='last')
+    latest = latest.merge(teams, how='left', on='team')
+    return pd.DataFrame({
+        'leagueid': latest['leagueId'].astype(np.int64),
+        'year': latest['year'].astype(np.int64),
+        'split': latest['stageTournament'].astype(str),
+        'tournament_name': latest['stageTournament'].astype(str),
+        'team_id': latest['team'].astype(np.int64),
+        'team_code': latest['team_code'].astype(object),
+        'team_name': latest['team_name'].astype(object),
+        'rating': latest['rating'].astype(float),
+        'date': latest['date']
+    })
+
+def rank_all(latest):
+    '''
+    Rows by league, year, split, then best rating first, ties broken by team
+    id, with the ranks ranking_engine gives within each group:
+    - rank_team: 1, 2, 3, 4... (ordinal, what the API has always shown)
+    - rank_competition: 1, 2, 2, 4... (equal ratings share a rank)
+    - rank_dense: 1, 2, 2, 3...
+    '''
+    groups = latest.groupby(GROUP_KEYS, sort=True).ngroup().to_numpy(dtype=np.int64)
+    ratings = latest['rating'].to_numpy(dtype=float)
+    order, ranks = league_ranks(groups, ratings, latest['team_id'].to_numpy())
+    ranked = latest.iloc[order].reset_index(drop=True)
+    ranked['rank_team'] = ranks
+    ranked['rank_competition'], ranked['rank_dense'] = tied_ranks(groups[order], ratings[order])
+    return ranked
+
+#Changed teams are not placed by sorted insertion into the written order: a
+#partition is one league's year, a few hundred rows, and every rank below a
+#moved team shifts anyway, so all of its ranks are recomputed either way.
+#Ranking the partition again with rank_all costs one small sort and keeps a
+#single implementation of the tie rules (tied_ranks) for full and
+#incremental runs.
+def update_rankings(ranked, changed):
+    '''Ranks of one partition after the changed teams' new ratings: their
+    old rows in the groups they played in are replaced, then the partition is
+    ranked again.'''
+    keys = GROUP_KEYS + ['team_id']
+    replaced = pd.MultiIndex.from_frame(ranked[keys]).isin(pd.MultiIndex.from_frame(changed[keys]))
+    return rank_all(pd.concat([ranked.loc[~replaced, COLUMNS], changed[COLUMNS]], ignore_index=True))
+
+def partition_path(output_dir, leagueid, year):
+    return os.path.join(output_dir, f'leagueid={leagueid}', f'year={year}', 'teamRankings.parquet')
+
+def write_partitions(ranked, output_dir=OUTPUT_DIR):
+    '''One Parquet file per league and year; the partition values live in the
+    folder names, as Athena expects.'''
+    for (leagueid, year), partition in ranked.groupby(PARTITION_KEYS, sort=False):
+        filename = partition_path(output_dir, leagueid, year)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        partition.drop(columns=PARTITION_KEYS).to_parquet(filename, index=False)
+
+def read_partition(output_dir, leagueid, year):
+    filename = partition_path(output_dir, leagueid, year)
+    if not os.path.isfile(filename):
+        return None
+    partition = pd.read_parquet(filename)
+    partition.insert(0, 'year', np.int64(year))
+    partition.insert(0, 'leagueid', np.int64(leagueid))
+    return partition
+
+def game_keys(rows):
+    '''(team, game_num) of history rows: one team plays one game at a time,
+    so this tells apart the games recorded at the same date.'''
+    return list(zip(rows['team'].astype(np.int64).tolist(), rows['game_num'].astype(str).tolist()))
+
+def read_watermark(output_dir=OUTPUT_DIR):
+    '''(last game date, game keys recorded at that date) of the last run.'''
+    filename = os.path.join(output_dir, STATE_FILE)
+    if not os.path.isfile(filename):
+        return None
+    with open(filename, 'r') as state_file:
+        state = json.load(state_file)
+    return pd.Timestamp(state['date']), {(team, game_num) for team, game_num in state['games']}
+
+def write_watermark(history, output_dir=OUTPUT_DIR):
+    last_game_date = history['date'].max()
+    games = game_keys(history[history['date'] == last_game_date])
+    with open(os.path.join(output_dir, STATE_FILE), 'w') as state_file:
+        json.dump({'date': last_game_date.isoformat(), 'games': games}, state_file)
 
+def new_games(history, watermark):
+    '''
+    History rows the last run did not see: later dates, and the rows of its
+    last date that are not among its games (the games of a Bo3/Bo5 often
+    share a timestamp, and more may have been added since).
+    '''
+    last_game_date, seen = watermark
+    is_new = (history['date'] > last_game_date).to_numpy().copy()
+    at_last_date = np.flatnonzero((history['date'] == last_game_date).to_numpy())
+    is_new[at_last_date] = [key not in seen for key in game_keys(history.iloc[at_last_date])]
+    return history[is_new]
 
-# Sort the DataFrame by 'league_id', 'rating', and 'team_id' to ensure proper ranking
-df.sort_values(by=['leagueId', 'rating', 'team_id'], ascending=[True, False, True], inplace=True)
+def run_ranking_etl(history, output_dir=OUTPUT_DIR, full=False):
+    '''
+    Ranks every league, year and split found in the rating history.
+    After a first full run, latest ratings are only taken for the teams that
+    played since the last run, and only the partitions they belong to are
+    read and ranked again. Returns the number of partitions written.
+    '''
+    watermark = read_watermark(output_dir)
 
-# Reset the index of the DataFrame after sorting
-df.reset_index(drop=True, inplace=True)
+    if full or watermark is None:
+        if os.path.isdir(output_dir):
+            for filename in glob.glob(os.path.join(output_dir, 'leagueid=*', 'year=*', '*.parquet')):
+                os.remove(filename)
+        ranked = rank_all(latest_ratings(history))
+        write_partitions(ranked, output_dir)
+        nb_partitions = ranked.groupby(PARTITION_KEYS).ngroups
+    else:
+        #The history is in game order: the last new row of a team is its latest rating.
+        changed = latest_ratings(new_games(history, watermark))
+        nb_partitions = 0
+        for (leagueid, year), changed_rows in changed.groupby(PARTITION_KEYS):
+            partition = read_partition(output_dir, leagueid, year)
+            ranked = rank_all(changed_rows) if partition is None else update_rankings(partition, changed_rows)
+            write_partitions(ranked, output_dir)
+            nb_partitions += 1
 
-# Use the rank method to create the 'rank_team' column
-df['rank_team'] = df.groupby('leagueId').cumcount() + 1
+    os.makedirs(output_dir, exist_ok=True)
+    if len(history):
+        write_watermark(history, output_dir)
+    return nb_partitions
 
-# Display the resulting DataFrame
-df.head()
-df.to_csv("teamRankings.csv",index=None)
+if __name__ == '__main__':
+    #python teamRanking.py [--full], from the folder holding the elos_<year>.csv files
+    nb_partitions = run_ranking_etl(load_rating_history(), full='--full' in sys.argv)
+    print(f'{nb_partitions} league/year partitions written to {OUTPUT_DIR}/')
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import time
+
+# Athena hands every value back as a string; ColumnInfo tells us what it was.
+INTEGER_TYPES = {'tinyint', 'smallint', 'integer', 'int', 'bigint'}
+FLOAT_TYPES = {'float', 'real', 'double', 'decimal'}
+
+# How long a finished query's results are served again for the same SQL.
+reuse_seconds = float(os.getenv('ATHENA_REUSE_SECONDS', 300))
+
+class QueryFailed(Exception):
+    '''The query ended FAILED or CANCELLED.'''
+
+class QueryTimeout(QueryFailed):
+    '''The query was still running when the runner gave up on it.'''
+
+def decode_value(value, column_type):
+    if value is None:
+        return None
+    if column_type in INTEGER_TYPES:
+        return int(value)
+    if column_type in FLOAT_TYPES:
+        return float(value)
+    if column_type == 'boolean':
+        return value == 'true'
+    return value
+
+def fingerprint(query, database=None):
+    '''Identifies a query regardless of whitespace and letter case outside of
+    string literals, so that reformatting the SQL doesn't defeat reuse.'''
+    parts = re.split(r"('(?:[^']|'')*')", query.strip())
+    normalized = ''.join(part if part.startswith("'") else re.sub(r'\s+', ' ', part).lower()
+                         for part in parts)
+    return hashlib.sha256(f"{database}\n{normalized}".encode()).hexdigest()
+
+class AthenaRunner:
+    '''
+    Runs a query and streams its rows, shared by the ranking handlers.
+    - polling backs off exponentially from initial_delay, so a query that
+      finishes in a few hundred ms is picked up right away
+    - results are paginated with NextToken, nothing past 1000 rows is lost
+    - rows come back as dicts keyed on column name, decoded with ColumnInfo
+    - the last successful execution of every SQL fingerprint is remembered
+      for reuse_seconds: the same query within that window reads the stored
+      results of that execution instead of scanning the table again. Athena's
+      own result reuse is requested as well, which covers cold containers.
+    The client is created on first use; a fake one (anything with the three
+    Athena calls) can be passed in for tests.
+    '''
+
+    def __init__(self, client=None, database=None, output_location=None, initial_delay=0.05,
+                 max_delay=1.0, backoff=2.0, timeout=30.0, page_size=1000, reuse_seconds=reuse_seconds,
+                 sleep=time.sleep, clock=time.monotonic):
+        self._client = client
+        self.database = database
+        self.output_location = output_location
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+        self.page_size = page_size
+        self.reuse_seconds = reuse_seconds
+        self.sleep = sleep
+        self.clock = clock
+        # fingerprint -> (QueryExecutionId, when it succeeded), oldest first
+        self.executions = {}
+        self.max_executions = 512
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('athena')
+        return self._client
+
+    def start(self, query, database=None):
+        kwargs = {}
+        if self.reuse_seconds > 0:
+            kwargs['ResultReuseConfiguration'] = {
+                'ResultReuseByAgeConfiguration': {
+                    'Enabled': True,
+                    'MaxAgeInMinutes': max(1, int(self.reuse_seconds // 60))
+                }
+            }
+        response = self.client.start_query_execution(
+            QueryString=query,
+            QueryExecutionContext={
+                'Database': database or self.database
+            },
+            ResultConfiguration={
+                'OutputLocation': self.output_location
+            },
+            **kwargs
+        )
+        return response['QueryExecutionId']
+
+    def wait(self, query_execution_id):
+        '''Polls until the query succeeds, raises QueryFailed otherwise.'''
+        delay = self.initial_delay
+        deadline = self.clock() + self.timeout
+        while True:
+            response = self.client.get_query_execution(QueryExecutionId=query_execution_id)
+            status = response['QueryExecution']['Status']
+            query_state = status['State']
+            if query_state == 'SUCCEEDED':
+                return query_execution_id
+            if query_state in ['FAILED', 'CANCELLED']:
+                raise QueryFailed(f"Query {query_execution_id} {query_state}: "
+                                  f"{status.get('StateChangeReason', 'no reason given')}")
+            if self.clock() + delay > deadline:
+                raise QueryTimeout(f"Query {query_execution_id} still {query_state} after {self.timeout} s")
+            self.sleep(delay)
+            delay = min(delay * self.backoff, self.max_delay)
+
+    def get_page(self, query_execution_id, next_token=None):
+        kwargs = {'QueryExecutionId': query_execution_id, 'MaxResults': self.page_size}
+        if next_token is not None:
+            kwargs['NextToken'] = next_token
+        return self.client.get_query_results(**kwargs)
+
+    def iter_rows(self, query_execution_id, results=None):
+        '''Every result row, one page at a time. The header row only appears
+        on the first page, which can be passed in if it was fetched already.'''
+        if results is None:
+            results = self.get_page(query_execution_id)
+        first_page = True
+        while True:
+            column_info = results['ResultSet']['ResultSetMetadata']['ColumnInfo']
+            names = [column['Name'] for column in column_info]
+            types = [column['Type'].lower() for column in column_info]
+
+            rows = results['ResultSet']['Rows']
+            if first_page:
+                rows = rows[1:]  # Skip the header row
+                first_page = False
+            for row in rows:
+                yield {
+                    name: decode_value(data.get('VarCharValue'), column_type)
+                    for name, column_type, data in zip(names, types, row['Data'])
+                }
+
+            if 'NextToken' not in results:
+                break
+            results = self.get_page(query_execution_id, results['NextToken'])
+
+    def reusable_execution(self, query_fingerprint):
+        '''The last successful execution of this query, if still fresh.'''
+        execution = self.executions.get(query_fingerprint)
+        if execution is None:
+            return None
+        query_execution_id, succeeded_at = execution
+        if self.clock() - succeeded_at > self.reuse_seconds:
+            del self.executions[query_fingerprint]
+            return None
+        return query_execution_id
+
+    def run(self, query, database=None):
+        '''Returns a generator over the query's rows, reusing a recent execution
+        of the same SQL when there is one, otherwise starting it and waiting.'''
+        query_fingerprint = fingerprint(query, database or self.database)
+        query_execution_id = self.reusable_execution(query_fingerprint)
+        if query_execution_id is not None:
+            try:
+                return self.iter_rows(query_execution_id, self.get_page(query_execution_id))
+            except Exception as e:
+                # Results expired or were cleaned up from S3: run the query again.
+                print("Could not reuse query", query_execution_id, e)
+                del self.executions[query_fingerprint]
+
+        query_execution_id = self.wait(self.start(query, database))
+        self.executions.pop(query_fingerprint, None)
+        self.executions[query_fingerprint] = (query_execution_id, self.clock())
+        if len(self.executions) > self.max_executions:
+            del self.executions[next(iter(self.executions))]
+        return self.iter_rows(query_execution_id)
+
+def make_runner(database=None, output_location=None):
+    '''The runner the handlers use: Athena, or the local SQLite warehouse
+    (local_warehouse.py) when LOCAL_WAREHOUSE names its folder.'''
+    local_warehouse = os.getenv('LOCAL_WAREHOUSE')
+    if local_warehouse:
+        from local_warehouse import LocalRunner
+        return LocalRunner(local_warehouse, database)
+    return AthenaRunner(database=database, output_location=output_location)
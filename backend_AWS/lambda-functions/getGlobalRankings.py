@@ -1,86 +1,65 @@
-import boto3
 import json
-import uuid
-import time
 import os
+import snapshot_store
+from athena_runner import QueryFailed, make_runner
+from response_cache import cache_key, response_cache
+from response_encoding import dumps, ok_response, revalidate
 
-athena = boto3.client('athena')
 output_s3= os.getenv('S3_OUTPUT_LOC')
 year= os.getenv('YEAR')
 database= os.getenv('DATABASE')
 table = os.getenv('TABLE')
+# One row per team and league stage, written by models/elo_calculation.py
+current_table = os.getenv('CURRENT_RATINGS_TABLE', 'current_ratings')
 
-def lambda_handler(event, context):
-    client_request_token = str(uuid.uuid4())
+runner = make_runner(database=database, output_location=output_s3)
 
+def lambda_handler(event, context):
     number_of_teams = int(event['queryStringParameters'].get('number_of_teams', 20))  # Default to 20 teams
-    
-    
-    query= f"""
-    WITH ranked_teams AS (
-    SELECT team_id, team_code, team_name, rating, game_date,
-           RANK() OVER (PARTITION BY team_id ORDER BY game_date DESC) AS rank
-    FROM "{database}"."{table}")
-    SELECT team_id, team_code, team_name, rating
-    FROM ranked_teams
-    WHERE rank = 1
-    ORDER BY rating DESC
-    LIMIT {number_of_teams}
-    """
-
-    # Run the Athena query
-    response = athena.start_query_execution(
-        QueryString=query,
-        QueryExecutionContext={
-            'Database': database
-        },
-        ResultConfiguration={
-            'OutputLocation': output_s3
-        }
-    )
-
-    query_execution_id = response['QueryExecutionId']
-    print("query_execution_id",query_execution_id)
-    
-    team_rankings = []
-
-    while True:
-        response = athena.get_query_execution(QueryExecutionId=query_execution_id)
-        query_state = response['QueryExecution']['Status']['State']
-        if query_state in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            break
-        time.sleep(3)  # Wait for 5 seconds before checking again
 
-    # If the query succeeded, fetch and process the results
-    if query_state == 'SUCCEEDED':
-        results = athena.get_query_results(QueryExecutionId=query_execution_id)
+    key = cache_key('global', number_of_teams=number_of_teams)
+    cached_response = response_cache.get(key)
+    if cached_response is not None:
+        return revalidate(event, cached_response)
 
-        # Process the query results into a JSON response
-        rows = results['ResultSet']['Rows'][1:]  # Skip the header row
-        print("results",rows)
-        # team_rankings = []
-
-        for row in rows:
-            columns = row['Data']
-            team_rankings.append({
-                'team_id': columns[0]['VarCharValue'],
-                'team_code':columns[1]['VarCharValue'],
-                'team_name': columns[2]['VarCharValue'],
-                'ranking_points': columns[3].get('VarCharValue', 'N/A')
-
-            })
-            
     headers = {
         'Access-Control-Allow-Origin': '*', 
         'Access-Control-Allow-Headers': 'Content-Type',
         'Access-Control-Allow-Methods': 'OPTIONS,GET' 
     }
 
-    return {
-        'statusCode': 200,
-        'headers': headers,
-        'body': json.dumps({
-        'teams': team_rankings
-    })
-        }
+    # Served from the in-memory ranking snapshot when one is deployed
+    if snapshot_store.snapshot_uri:
+        bodies = snapshot_store.load_bodies()
+        body = bodies.global_body(number_of_teams)
+        data_version = bodies.version
+    else:
+        try:
+            team_rankings = query_global_rankings(number_of_teams)
+        except QueryFailed as e:
+            return {'statusCode': 502, 'headers': headers, 'body': json.dumps({'error': str(e)})}
+        body = dumps({'teams': team_rankings})
+        data_version = response_cache.data_version
+
+    return revalidate(event, response_cache.put(key, ok_response(body, headers, data_version)))
+
+def query_global_rankings(number_of_teams):
+    query= f"""
+    SELECT team_id, team_code, team_name, rating
+    FROM "{database}"."{current_table}"
+    WHERE is_global_latest
+    ORDER BY rating DESC, team_id ASC
+    LIMIT {number_of_teams}
+    """
+
+    team_rankings = []
+    for row in runner.run(query):
+        team_rankings.append({
+            'team_id': str(row['team_id']),
+            'team_code': row['team_code'],
+            'team_name': row['team_name'],
+            # Sent as text, the way Athena returned it before the runner decoded it
+            'ranking_points': 'N/A' if row['rating'] is None else str(row['rating'])
+        })
 
+    return team_rankings
@@ -0,0 +1,69 @@
+import json
+
+import snapshot_store
+from response_cache import cache_key, response_cache
+from response_encoding import dumps, ok_response, revalidate
+
+# Series lengths played in the leagues
+SERIES_LENGTHS = (1, 3, 5)
+
+def lambda_handler(event, context):
+    # ?team_id=1,2 for one matchup (the first team's chance to win)
+    # or ?tournament_id=98767991302996019 for every matchup of a league's teams
+    # &best_of=1|3|5, a single game if absent
+    params = event.get('queryStringParameters') or {}
+    team_ids = [int(tid.strip('[]').strip()) for tid in params.get('team_id', '').split(',') if tid]
+    league_id = params.get('tournament_id')
+    best_of = params.get('best_of', '1')
+
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Allow-Methods': 'OPTIONS,GET'
+    }
+
+    if best_of not in [str(length) for length in SERIES_LENGTHS]:
+        return {'statusCode': 400, 'headers': headers, 'body': json.dumps({'error': f'Invalid best_of: {best_of}'})}
+    best_of = int(best_of)
+    if league_id is None and len(team_ids) != 2:
+        return {'statusCode': 400, 'headers': headers,
+                'body': json.dumps({'error': 'Expected two team_id values or a tournament_id'})}
+    # Predictions come from the ranking snapshot's latest ratings only
+    if not snapshot_store.snapshot_uri:
+        return {'statusCode': 503, 'headers': headers, 'body': json.dumps({'error': 'No ranking snapshot deployed'})}
+
+    key = cache_key('matchup', tournament_id=league_id, team_id=team_ids, best_of=best_of)
+    cached_response = response_cache.get(key)
+    if cached_response is not None:
+        return revalidate(event, cached_response)
+
+    snapshot = snapshot_store.load_snapshot()
+    probabilities = snapshot_store.win_probabilities(snapshot)
+    if league_id is None:
+        body = dumps({
+            'best_of': best_of,
+            'team_ids': [str(team_id) for team_id in team_ids],
+            'probability': probabilities.probability(team_ids[0], team_ids[1], best_of)
+        })
+    else:
+        body = dumps(league_matchups(snapshot, probabilities, int(league_id), best_of))
+
+    data_version = snapshot['version']
+    return revalidate(event, response_cache.put(key, ok_response(body, headers, data_version)))
+
+def league_matchups(snapshot, probabilities, league_id, best_of):
+    '''The league's teams, best first, and the chance that the team of each
+    row beats the team of each column.'''
+    league = snapshot['leagues'].get(str(league_id))
+    if league is None:
+        return {'tournament_id': league_id, 'leaguelabel': "", 'best_of': best_of, 'teams': [], 'matrix': []}
+    teams = {int(team['team_id']): team for team in league['latest']}
+    team_ids, matrix = probabilities.matrix(list(teams), best_of, key=league_id)
+    return {
+        'tournament_id': league_id,
+        'leaguelabel': league['leaguelabel'],
+        'best_of': best_of,
+        'teams': [{'team_id': str(team_id), 'team_code': teams[team_id].get('team_code'),
+                   'team_name': teams[team_id].get('team_name')} for team_id in team_ids.tolist()],
+        'matrix': matrix.round(4).tolist()
+    }
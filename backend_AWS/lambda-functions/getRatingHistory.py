@@ -0,0 +1,65 @@
+import datetime as dt
+import json
+
+import numpy as np
+
+import rating_history
+from response_cache import cache_key, response_cache
+from response_encoding import dumps, ok_response, revalidate
+
+def lambda_handler(event, context):
+    # ?date=2023-06-01 (or a full ISO timestamp, UTC unless stated), latest if absent
+    # &team_id=1,2,3 for some teams only, every team that had played otherwise
+    params = event.get('queryStringParameters') or {}
+    team_ids = [int(tid.strip('[]').strip()) for tid in params.get('team_id', '').split(',') if tid]
+    date = params.get('date')
+
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Allow-Methods': 'OPTIONS,GET'
+    }
+
+    try:
+        as_of = parse_date(date)
+    except ValueError:
+        return {'statusCode': 400, 'headers': headers, 'body': json.dumps({'error': f'Invalid date: {date}'})}
+
+    if not rating_history.history_uri:
+        return {'statusCode': 503, 'headers': headers, 'body': json.dumps({'error': 'No rating history deployed'})}
+
+    key = cache_key('rating_history', date=as_of, team_id=team_ids)
+    cached_response = response_cache.get(key)
+    if cached_response is not None:
+        return revalidate(event, cached_response)
+
+    data_version = response_cache.data_version
+    history = rating_history.load_history(data_version)
+    body = dumps({
+        'date': None if as_of is None else format_date(as_of),
+        'teams': ratings_at(history, as_of, team_ids)
+    })
+    return revalidate(event, response_cache.put(key, ok_response(body, headers, data_version)))
+
+def parse_date(date):
+    '''ms since the epoch, None for "latest". A bare date means the end of that day.'''
+    if not date:
+        return None
+    parsed = dt.datetime.fromisoformat(date.replace('Z', '+00:00'))
+    if len(date) == 10:
+        parsed += dt.timedelta(days=1) - dt.timedelta(milliseconds=1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+def format_date(ms):
+    return dt.datetime.fromtimestamp(ms / 1000, tz=dt.timezone.utc).isoformat()
+
+def ratings_at(history, as_of, team_ids):
+    '''Teams by rating as of the date, best first, ties broken by team id.'''
+    date = np.iinfo(np.int64).max if as_of is None else as_of
+    teams, ratings, dates = history.ratings_at(date, team_ids or None)
+    order = np.lexsort((teams, -ratings))
+    return [{'team_id': str(team_id), 'ranking_points': rating, 'rating_date': format_date(game_date)}
+            for team_id, rating, game_date in zip(teams[order].tolist(), ratings[order].tolist(),
+                                                  dates[order].tolist())]
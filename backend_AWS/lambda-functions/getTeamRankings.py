@@ -1,131 +1,88 @@
-import boto3
 import json
-import time
 import os
+import time
+import snapshot_store
+from athena_runner import QueryFailed, make_runner
+from league_index import LeagueIndex
+from response_cache import cache_key, response_cache
+from response_encoding import dumps, ok_response, revalidate
 
 output_s3= os.getenv('S3_OUTPUT_LOC')
 database= os.getenv('DATABASE')
 table= os.getenv('TABLE')
 
-athena = boto3.client('athena')
+runner = make_runner(database=database, output_location=output_s3)
+
+# The whole team_rankings table is one row per team and league: it is read
+# once, grouped by league, and every request is answered from it until it is
+# older than this or the data version changes.
+index_refresh_seconds = float(os.getenv('TEAM_RANKINGS_REFRESH', 300))
+_league_index = None
+_league_index_loaded_at = None
+_league_index_version = None
 
 def lambda_handler(event, context):
     
     tournament_ids = [int(tid.strip('[]').strip()) for tid in event['queryStringParameters'].get('tournament_id', '').split(',') if tid]
     team_ids = [int(tid.strip('[]').strip()) for tid in event['queryStringParameters'].get('team_id', '').split(',') if tid]
 
+    key = cache_key('team', tournament_id=tournament_ids, team_id=team_ids)
+    cached_response = response_cache.get(key)
+    if cached_response is not None:
+        return revalidate(event, cached_response)
 
-    # Construct the Athena query based on tournament_ids and team_ids
-    query = construct_athena_query(tournament_ids, team_ids)
-
-    # Execute the Athena query
-    query_execution_id = execute_athena_query(query)
-
-    # Get the query results
-    results = get_athena_query_results(query_execution_id)
-
-    # Process the query results into the desired structure
-    processed_data = process_athena_results(results)
-
-    # Return the processed data as JSON
-    response_data = {
-        "teamRanking": processed_data
-    }
     headers = {
             'Access-Control-Allow-Origin': '*', 
             'Access-Control-Allow-Headers': 'Content-Type',
             'Access-Control-Allow-Methods': 'OPTIONS,GET' 
         }
 
+    # Served from the in-memory ranking snapshot when one is deployed
+    if snapshot_store.snapshot_uri:
+        bodies = snapshot_store.load_bodies()
+        body = bodies.team_body(tournament_ids, team_ids)
+        data_version = bodies.version
+    else:
+        try:
+            processed_data = load_league_index().select(tournament_ids, team_ids)
+        except QueryFailed as e:
+            return {'statusCode': 502, 'headers': headers, 'body': json.dumps({'error': str(e)})}
+
+        # Return the processed data as JSON
+        response_data = {
+            "teamRanking": processed_data
+        }
+        body = dumps(response_data)
+        data_version = response_cache.data_version
 
-    return {
-        'statusCode': 200,
-        'headers': headers,
-        'body': json.dumps(response_data)
-    }
+    return revalidate(event, response_cache.put(key, ok_response(body, headers, data_version)))
 
-def construct_athena_query(tournament_ids, team_ids):
+def construct_athena_query():
     
     # Construct the Athena SQL query
+    # team_rankings holds every year and split: keep each league's latest one
     query = """
-    SELECT tournament_name, team_id, team_code,team_name, rating, rank_team
-    FROM "team_rankings"."team_rankings"
-    WHERE leagueid IN ({tournament_ids}) 
-    """.format(tournament_ids=",".join([str(tid) for tid in tournament_ids]))
-
-    if team_ids:
-        query += "AND team_id IN ({team_ids})".format(team_ids=",".join([str(tid) for tid in team_ids]))
-        
-    query+= "ORDER BY leagueid ASC, rank_team ASC"
-
-    return query
-
-
-def execute_athena_query(query):
-    
-    response = athena.start_query_execution(
-        QueryString=query,
-        QueryExecutionContext={
-            'Database': database
-        },
-        ResultConfiguration={
-            'OutputLocation': output_s3
-        }
+    WITH latest_split AS (
+        SELECT leagueid, MAX_BY(year, date) AS year, MAX_BY(split, date) AS split
+        FROM "team_rankings"."team_rankings"
+        GROUP BY leagueid
     )
-    print("response",response['QueryExecutionId'])
-    return response['QueryExecutionId']
-
-def get_athena_query_results(query_execution_id):
-    
-    
-    while True:
-        response = athena.get_query_execution(QueryExecutionId=query_execution_id)
-        query_state = response['QueryExecution']['Status']['State']
-        if query_state in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            break
-        time.sleep(5) 
-        
-        
-    # If the query succeeded, fetch and process the results
-    if query_state == 'SUCCEEDED':
-        results = athena.get_query_results(QueryExecutionId=query_execution_id)
-        
-    return results
-
-
-
-def process_athena_results(results):
-    rows = results['ResultSet']['Rows'][1:]  # Skip the header row
-    tournament_data = {}
-
-    for row in rows:
-        columns = row['Data']
-        tournament_id = columns[0]['VarCharValue']
-        team_id = columns[1]['VarCharValue']
-        team_code = columns[2]['VarCharValue']
-        team_name = columns[3]['VarCharValue']
-        ranking_points = float(columns[4]['VarCharValue'])  # Convert to float
-        rank = int(columns[5]['VarCharValue'])
-
-        # Create a team ranking dictionary
-        team_ranking = {
-            "team_id": team_id,
-            "team_code": team_code,
-            "team_name": team_name,
-            "ranking_points": ranking_points,
-            "rank": rank
-        }
-
-        # If the tournament_id is not in the dictionary, create an entry
-        if tournament_id not in tournament_data:
-            tournament_data[tournament_id] = {"tournament_id": tournament_id, "team_rankings": []}
-
-        # Append the team ranking to the tournament data
-        tournament_data[tournament_id]["team_rankings"].append(team_ranking)
-
-    # Extract the values from the dictionary and add to the result list
-    processed_data = list(tournament_data.values())
-
-    return processed_data
+    SELECT t.leagueid, t.tournament_name, t.team_id, t.team_code, t.team_name, t.rating, t.rank_team
+    FROM "team_rankings"."team_rankings" t
+    JOIN latest_split l ON t.leagueid = l.leagueid AND t.year = l.year AND t.split = l.split
+    ORDER BY t.leagueid ASC, t.rank_team ASC
+    """
 
+    return query
 
+def load_league_index():
+    '''Every league's ranked teams, queried and grouped once per refresh period
+    and data version (response_cache checks the version before this runs).'''
+    global _league_index, _league_index_loaded_at, _league_index_version
+    now = time.monotonic()
+    if (_league_index is None or now - _league_index_loaded_at > index_refresh_seconds
+            or _league_index_version != response_cache.data_version):
+        _league_index = LeagueIndex.from_rows(runner.run(construct_athena_query()))
+        _league_index_loaded_at = now
+        _league_index_version = response_cache.data_version
+    return _league_index
@@ -1,13 +1,18 @@
 
-import boto3
 import json
-import time
 import os
+import snapshot_store
+from athena_runner import QueryFailed, make_runner
+from response_cache import cache_key, response_cache
+from response_encoding import dumps, ok_response, revalidate
 
-athena = boto3.client('athena')
 output_s3= os.getenv('S3_OUTPUT_LOC')
 database= os.getenv('DATABASE')
 table = os.getenv('TABLE')
+# One row per team and league stage, written by models/elo_calculation.py
+current_table = os.getenv('CURRENT_RATINGS_TABLE', 'current_ratings')
+
+runner = make_runner(database=database, output_location=output_s3)
 
 def lambda_handler(event, context):
     leagueid = int(event['pathParameters']['tournament_id'])
@@ -16,69 +21,57 @@ def lambda_handler(event, context):
     else:
         stage_name = None
 
-    leaguelabel=""
-
-    query = f"""
-    SELECT t1.team_id, t1.team_code, t1.team_name, t1.rating,t1.leaguelabel
-    FROM "all_years_riot"."riot_all_years" t1
-    JOIN (
-        SELECT team_id, MAX(game_date) AS latest_date
-        FROM "all_years_riot"."riot_all_years"
-        WHERE leagueid = {leagueid}
-          AND (stage_name = '{stage_name}' OR '{stage_name}' IS NULL)
-        GROUP BY team_id
-    ) t2 ON t1.team_id = t2.team_id AND t1.game_date = t2.latest_date
-    ORDER BY t1.rating DESC;
-"""
-
+    key = cache_key('tournament', tournament_id=leagueid, stage_name=stage_name)
+    cached_response = response_cache.get(key)
+    if cached_response is not None:
+        return revalidate(event, cached_response)
 
-    response = athena.start_query_execution(
-        QueryString=query,
-        QueryExecutionContext={
-            'Database': 'all_years_riot'  
-        },
-        ResultConfiguration={
-            'OutputLocation': output_s3
-        }
-
-    )
-
-    query_execution_id = response['QueryExecutionId']
-    while True:
-        response = athena.get_query_execution(QueryExecutionId=query_execution_id)
-        query_state = response['QueryExecution']['Status']['State']
-        if query_state in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            break
-        time.sleep(3)  # Wait for 5 seconds before checking again
-
-    # If the query succeeded, fetch and process the results
-    if query_state == 'SUCCEEDED':
-        results = athena.get_query_results(QueryExecutionId=query_execution_id)
+    # Served from the in-memory ranking snapshot when one is deployed
+    if snapshot_store.snapshot_uri:
+        bodies = snapshot_store.load_bodies()
+        body = bodies.tournament_body(leagueid, stage_name)
+        data_version = bodies.version
+    else:
+        try:
+            leaguelabel, team_rankings = query_tournament_rankings(leagueid, stage_name)
+        except QueryFailed as e:
+            return {'statusCode': 502, 'body': json.dumps({'error': str(e)})}
+        body = dumps({
+            'tournament_id': leagueid,
+            'stage_name': stage_name,
+            'leaguelabel':leaguelabel,
+            'teams': team_rankings
+        })
+        data_version = response_cache.data_version
 
-        # Process the query results into a JSON response
-        rows = results['ResultSet']['Rows'][1:]  # Skip the header row
-        team_rankings = []
+    return revalidate(event, response_cache.put(key, ok_response(body, {}, data_version)))
 
-        for row in rows:
-            columns = row['Data']
-            leaguelabel=columns[4]['VarCharValue']
-            team_rankings.append({
-                'team_id': columns[0]['VarCharValue'],
-                'team_code':columns[1]['VarCharValue'],
-                'team_name': columns[2]['VarCharValue'],
-                # 'ranking_points': columns[2]['VarCharValue']
-                'ranking_points': columns[3].get('VarCharValue', 'N/A')
+def query_tournament_rankings(leagueid, stage_name):
+    leaguelabel=""
+    team_rankings = []
 
-            })
+    # A team's latest rating in the league, or in the requested stage
+    if stage_name is None:
+        stage_filter = "is_league_latest"
+    else:
+        stage_filter = "stage_name = '{}'".format(stage_name.replace("'", "''"))
 
+    query = f"""
+    SELECT team_id, team_code, team_name, rating, leaguelabel
+    FROM "all_years_riot"."{current_table}"
+    WHERE leagueid = {leagueid}
+      AND {stage_filter}
+    ORDER BY rating DESC, team_id ASC;
+"""
 
-    return {
-        'statusCode': 200,
-        'body': json.dumps({
-            'tournament_id': leagueid,
-            'stage_name': stage_name,
-            'leaguelabel':leaguelabel,
-            'teams': team_rankings
+    for row in runner.run(query, database='all_years_riot'):
+        leaguelabel = row['leaguelabel']
+        team_rankings.append({
+            'team_id': str(row['team_id']),
+            'team_code': row['team_code'],
+            'team_name': row['team_name'],
+            # Sent as text, the way Athena returned it before the runner decoded it
+            'ranking_points': 'N/A' if row['rating'] is None else str(row['rating'])
         })
-    }
 
+    return leaguelabel, team_rankings
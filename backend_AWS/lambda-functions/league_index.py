@@ -0,0 +1,57 @@
+class LeagueIndex:
+    '''
+    league id -> (label, ranked teams), built once per data version so that a
+    getTeamRankings request, however many leagues and teams it asks for, only
+    picks ready-made team dicts out of lists before json.dumps. Nothing is
+    parsed or converted at request time.
+    '''
+
+    def __init__(self, leagues):
+        # {league_id: (label, [team ranking dicts in rank order])}
+        self.leagues = leagues
+        # {league_id: {team_id: position in the league's list}}
+        self.positions = {
+            league_id: {team['team_id']: position for position, team in enumerate(teams)}
+            for league_id, (label, teams) in leagues.items()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls({int(league_id): (league['tournament_name'], league['teams'])
+                    for league_id, league in snapshot['leagues'].items()})
+
+    @classmethod
+    def from_rows(cls, rows):
+        '''Rows of the team_rankings table (typed by the Athena runner), in
+        league then rank order.'''
+        leagues = {}
+        for row in rows:
+            league_id = int(row['leagueid'])
+            if league_id not in leagues:
+                leagues[league_id] = (row['tournament_name'], [])
+            leagues[league_id][1].append({
+                "team_id": str(row['team_id']),
+                "team_code": row['team_code'],
+                "team_name": row['team_name'],
+                "ranking_points": float(row['rating']),
+                "rank": int(row['rank_team'])
+            })
+        return cls(leagues)
+
+    def select(self, league_ids, team_ids=None):
+        '''Ranked teams of each requested league, in ascending league id order,
+        optionally only the requested teams (still in rank order).'''
+        wanted_teams = {str(team_id) for team_id in team_ids} if team_ids else None
+
+        processed_data = []
+        for league_id in sorted(set(league_ids)):
+            if league_id not in self.leagues:
+                continue
+            label, teams = self.leagues[league_id]
+            if wanted_teams is not None:
+                positions = self.positions[league_id]
+                teams = [teams[position] for position in
+                         sorted(positions[team_id] for team_id in wanted_teams if team_id in positions)]
+            if teams:
+                processed_data.append({"tournament_id": label, "team_rankings": teams})
+        return processed_data
@@ -0,0 +1,153 @@
+import glob
+import os
+import sqlite3
+
+from athena_runner import QueryFailed
+
+# Local stand-in for the Athena tables, so the handlers' SQL can be run,
+# timed and regression-tested offline. Every <schema>.sqlite file in the
+# warehouse folder is attached under its name, so queries written against
+# "all_years_riot"."current_ratings" or "team_rankings"."team_rankings" run
+# unchanged.
+SCHEMAS = {
+    'all_years_riot': ['riot_all_years', 'current_ratings'],
+    'team_rankings': ['team_rankings'],
+}
+
+INDEXES = [
+    ('all_years_riot', 'riot_all_years', ['team_id', 'game_date']),
+    ('all_years_riot', 'riot_all_years', ['leagueid', 'stage_name']),
+    ('all_years_riot', 'current_ratings', ['leagueid', 'stage_name']),
+    ('all_years_riot', 'current_ratings', ['is_global_latest', 'rating']),
+    ('team_rankings', 'team_rankings', ['leagueid', 'year', 'split']),
+]
+
+class MaxBy:
+    '''Athena's MAX_BY(value, key): the value on the row with the largest key.'''
+
+    def __init__(self):
+        self.value = None
+        self.key = None
+
+    def step(self, value, key):
+        if key is not None and (self.key is None or key > self.key):
+            self.value, self.key = value, key
+
+    def finalize(self):
+        return self.value
+
+class LocalRunner:
+    '''
+    Same interface as AthenaRunner (run() returns a generator of typed row
+    dicts, failures raise QueryFailed), over the SQLite warehouse. As with
+    Athena's query context, the selected database (run's, else the runner's)
+    is where unqualified table names are looked up; it must be one of the
+    warehouse's schemas.
+    '''
+
+    def __init__(self, directory, database=None):
+        self.directory = directory
+        self.database = database
+        self._connections = {}
+
+    def schemas(self):
+        '''{schema: file} of the warehouse folder.'''
+        return {os.path.splitext(os.path.basename(filename))[0]: filename
+                for filename in sorted(glob.glob(os.path.join(self.directory, '*.sqlite')))}
+
+    def connection(self, database=None):
+        '''Connection with every schema attached under its name and, if a
+        database is selected, its file opened as the main one.'''
+        if database not in self._connections:
+            schemas = self.schemas()
+            if database is not None and database not in schemas:
+                raise QueryFailed(f"Local query failed: no database {database} in {self.directory}")
+            if database is None:
+                connection = sqlite3.connect(':memory:')
+            else:
+                connection = sqlite3.connect(f'file:{schemas[database]}?mode=ro', uri=True)
+            connection.create_aggregate('MAX_BY', 2, MaxBy)
+            for schema, filename in schemas.items():
+                connection.execute('ATTACH DATABASE ? AS "{}"'.format(schema), (filename,))
+            self._connections[database] = connection
+        return self._connections[database]
+
+    def run(self, query, database=None):
+        connection = self.connection(database or self.database)
+        try:
+            cursor = connection.execute(query.strip().rstrip(';'))
+        except sqlite3.Error as e:
+            raise QueryFailed(f"Local query failed: {e}")
+        names = [column[0] for column in cursor.description]
+        return (dict(zip(names, row)) for row in cursor)
+
+def build_warehouse(directory, rating_history, current_ratings, team_rankings):
+    '''
+    Loads the pipeline outputs into <directory>/<schema>.sqlite files:
+    - all_years_riot.riot_all_years: the full rating history (elos_<year>.csv)
+    - all_years_riot.current_ratings: build_current_ratings' output
+    - team_rankings.team_rankings: teamRanking.py's output
+    Frames are passed in already read; see __main__ for the usual files.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    tables = {
+        'riot_all_years': rating_history,
+        'current_ratings': current_ratings,
+        'team_rankings': team_rankings,
+    }
+    for schema, table_names in SCHEMAS.items():
+        filename = os.path.join(directory, f'{schema}.sqlite')
+        if os.path.isfile(filename):
+            os.remove(filename)
+        with sqlite3.connect(filename) as connection:
+            for table_name in table_names:
+                df = tables[table_name].copy()
+                # SQLite has no timestamp type: ISO text sorts the same way.
+                for col in df.columns:
+                    if str(df[col].dtype).startswith('datetime'):
+                        df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+                df.to_sql(table_name, connection, index=False)
+            for index_schema, table_name, columns in INDEXES:
+                if index_schema == schema:
+                    connection.execute('CREATE INDEX "{}_{}" ON "{}" ({})'.format(
+                        table_name, '_'.join(columns), table_name, ', '.join(f'"{col}"' for col in columns)))
+            connection.execute('ANALYZE')
+
+def rating_history_table(history, teams):
+    '''The Athena riot_all_years layout, from load_rating_history's output.'''
+    import pandas as pd
+    history = history.merge(teams, how='left', on='team')
+    return pd.DataFrame({
+        'team_id': history['team'].astype('int64'),
+        'team_code': history['team_code'],
+        'team_name': history['team_name'],
+        'rating': history['rating'].astype(float),
+        'game_date': history['date'],
+        'leagueid': history['leagueId'].astype('int64'),
+        'leaguelabel': history['leagueLabel'],
+        'stage_name': history['stage_name'],
+    })
+
+def read_partitioned(directory):
+    '''A Hive-partitioned Parquet folder, partition values as int columns.'''
+    import pandas as pd
+    frames = []
+    for filename in sorted(glob.glob(os.path.join(directory, '**', '*.parquet'), recursive=True)):
+        frame = pd.read_parquet(filename)
+        for part in os.path.relpath(filename, directory).split(os.sep)[:-1]:
+            name, value = part.split('=', 1)
+            frame[name] = int(value)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+if __name__ == '__main__':
+    # python local_warehouse.py <warehouse dir>, from the folder holding the
+    # elos_<year>.csv files, current_ratings/ and teamRankings/
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'models'))
+    from ranking_snapshot import CURRENT_RATINGS_DIR, load_rating_history, load_team_names
+
+    build_warehouse(sys.argv[1] if len(sys.argv) > 1 else 'warehouse',
+                    rating_history_table(load_rating_history(), load_team_names()),
+                    read_partitioned(CURRENT_RATINGS_DIR),
+                    read_partitioned('teamRankings'))
@@ -0,0 +1,172 @@
+import numpy as np
+
+# The ranking endpoints only ever ask three things of the rating output:
+# - the top N teams overall (getGlobalRankings)
+# - the ranked teams of a few leagues' latest splits, maybe only some teams (getTeamRankings)
+# - the latest ratings in a league or one of its stages (getTournamentRanking)
+# RankingEngine answers them from arrays sorted once, so each call is a slice.
+
+def league_order(league_ids, ratings, team_ids):
+    '''Indices sorting rows by league, best rating first, ties broken by team id.'''
+    return np.lexsort((np.asarray(team_ids), -np.asarray(ratings, dtype=float), np.asarray(league_ids)))
+
+def group_bounds(sorted_keys):
+    '''Start of every run of equal keys in a sorted array, plus the end.'''
+    sorted_keys = np.asarray(sorted_keys)
+    if len(sorted_keys) == 0:
+        return np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    return np.r_[starts, len(sorted_keys)]
+
+def league_ranks(league_ids, ratings, team_ids):
+    '''
+    Rank of every team within its league, 1 being the best rating, the way
+    teamRanking.py numbers them. Returns (order, ranks): order sorts the rows
+    like league_order, ranks[i] is the rank of row order[i].
+    '''
+    order = league_order(league_ids, ratings, team_ids)
+    bounds = group_bounds(np.asarray(league_ids)[order])
+    ranks = np.arange(len(order)) - np.repeat(bounds[:-1], np.diff(bounds)) + 1
+    return order, ranks
+
+def tied_ranks(sorted_league_ids, sorted_ratings):
+    '''
+    Ranks of rows sorted like league_order where equal ratings share a rank:
+    competition ranks (1, 2, 2, 4) and dense ranks (1, 2, 2, 3).
+    '''
+    sorted_ratings = np.asarray(sorted_ratings, dtype=float)
+    bounds = group_bounds(sorted_league_ids)
+    starts = np.repeat(bounds[:-1], np.diff(bounds))
+    index = np.arange(len(sorted_ratings))
+    new_rating = index == starts
+    new_rating[1:] |= sorted_ratings[1:] != sorted_ratings[:-1]
+    rating_start = np.maximum.accumulate(np.where(new_rating, index, 0))
+    dense = np.cumsum(new_rating)
+    return rating_start - starts + 1, dense - dense[starts] + 1
+
+def optional_text(column):
+    '''Object array of a text column, with None where the value is missing.'''
+    return column.astype(object).where(column.notna(), None).to_numpy()
+
+def stage_codes_of(stage):
+    '''Integer code per stage name (missing names included), and the names.'''
+    stage_names = sorted({name for name in stage.tolist() if name is not None})
+    codes = {name: code for code, name in enumerate(stage_names)}
+    stage_names.append(None)
+    return np.array([codes.get(name, len(codes)) for name in stage.tolist()], dtype=np.int64), stage_names
+
+class RankingEngine:
+    '''
+    In-process version of the ranking queries, built from the current ratings
+    table (see build_current_ratings in models/ranking_snapshot.py). Responses
+    have the same shape as the Athena-backed handlers'.
+    '''
+
+    def __init__(self, current_ratings):
+        df = current_ratings.reset_index(drop=True)
+        team = df['team_id'].to_numpy(dtype=np.int64)
+        rating = df['rating'].to_numpy(dtype=float)
+        league = df['leagueid'].to_numpy(dtype=np.int64)
+        stage = optional_text(df['stage_name'])
+        self.team_code = optional_text(df['team_code'])
+        self.team_name = optional_text(df['team_name'])
+        self.leaguelabel = df['leaguelabel'].astype(object).to_numpy()
+        self.tournament_name = optional_text(df['tournament_name'])
+        self.team = team
+        self.rating = rating
+
+        # Top N overall: one row per team, best first.
+        is_global = np.flatnonzero(df['is_global_latest'].to_numpy(dtype=bool))
+        self.global_rows = is_global[np.lexsort((team[is_global], -rating[is_global]))]
+
+        # Per league: one row per team, sorted by (league, rating).
+        is_league = np.flatnonzero(df['is_league_latest'].to_numpy(dtype=bool))
+        self.league_rows = is_league[league_order(league[is_league], rating[is_league], team[is_league])]
+        bounds = group_bounds(league[self.league_rows])
+        self.league_index = {int(league[self.league_rows[start]]): (start, end)
+                             for start, end in zip(bounds[:-1], bounds[1:])}
+
+        # Per league's latest split: one row per team, sorted by (league, rating) with ranks.
+        is_split = np.flatnonzero(df['is_split_latest'].to_numpy(dtype=bool))
+        order, ranks = league_ranks(league[is_split], rating[is_split], team[is_split])
+        self.split_rows = is_split[order]
+        self.split_rank = ranks
+        bounds = group_bounds(league[self.split_rows])
+        self.split_index = {int(league[self.split_rows[start]]): (start, end)
+                            for start, end in zip(bounds[:-1], bounds[1:])}
+
+        # Team id -> positions in the split block, for filtered requests.
+        block_teams = team[self.split_rows]
+        by_team = np.argsort(block_teams, kind='stable')
+        team_bounds = group_bounds(block_teams[by_team])
+        self.team_index = {int(block_teams[by_team[start]]): np.sort(by_team[start:end])
+                           for start, end in zip(team_bounds[:-1], team_bounds[1:])}
+
+        # Per league stage: every row, sorted by (league, stage, rating).
+        stage_codes, stage_names = stage_codes_of(stage)
+        self.stage_rows = np.lexsort((team, -rating, stage_codes, league))
+        bounds = group_bounds(league[self.stage_rows] * (len(stage_names) + 1) + stage_codes[self.stage_rows])
+        self.stage_index = {(int(league[self.stage_rows[start]]), stage_names[stage_codes[self.stage_rows[start]]]): (start, end)
+                            for start, end in zip(bounds[:-1], bounds[1:])}
+
+    @classmethod
+    def load(cls, path):
+        '''Engine over a current ratings Parquet file or partitioned folder.'''
+        import pandas as pd
+        df = pd.read_parquet(path)
+        df['leagueid'] = df['leagueid'].astype(np.int64)
+        return cls(df)
+
+    def records(self, rows, ranks=None):
+        '''Response rows. As with Athena, ranking_points are text unless ranked.'''
+        team_ids = self.team[rows].tolist()
+        ratings = self.rating[rows].tolist()
+        codes = self.team_code[rows].tolist()
+        names = self.team_name[rows].tolist()
+        if ranks is None:
+            return [{'team_id': str(team_id), 'team_code': code, 'team_name': name,
+                     'ranking_points': str(rating)}
+                    for team_id, code, name, rating in zip(team_ids, codes, names, ratings)]
+        return [{'team_id': str(team_id), 'team_code': code, 'team_name': name,
+                 'ranking_points': rating, 'rank': rank}
+                for team_id, code, name, rating, rank in zip(team_ids, codes, names, ratings, ranks.tolist())]
+
+    def top_n(self, number_of_teams):
+        return self.records(self.global_rows[:number_of_teams])
+
+    def league_ranking(self, league_ids, team_ids=None):
+        '''Ranked teams of each league's latest split, labelled with the split,
+        in ascending league id order.'''
+        wanted = None
+        if team_ids:
+            positions = [self.team_index[team_id] for team_id in set(team_ids) if team_id in self.team_index]
+            wanted = np.sort(np.concatenate(positions)) if positions else np.zeros(0, dtype=np.int64)
+
+        processed_data = []
+        for league_id in sorted(set(league_ids)):
+            if league_id not in self.split_index:
+                continue
+            start, end = self.split_index[league_id]
+            if wanted is None:
+                positions = np.arange(start, end)
+            else:
+                positions = wanted[np.searchsorted(wanted, start):np.searchsorted(wanted, end)]
+            if len(positions):
+                rows = self.split_rows[positions]
+                processed_data.append({"tournament_id": self.tournament_name[rows[0]],
+                                       "team_rankings": self.records(rows, self.split_rank[positions])})
+        return processed_data
+
+    def stage_ranking(self, league_id, stage_name=None):
+        '''(leaguelabel, teams): latest ratings in the league, or in one stage.'''
+        if stage_name is None:
+            if league_id not in self.league_index:
+                return "", []
+            start, end = self.league_index[league_id]
+            rows = self.league_rows[start:end]
+        else:
+            if (league_id, stage_name) not in self.stage_index:
+                return "", []
+            start, end = self.stage_index[(league_id, stage_name)]
+            rows = self.stage_rows[start:end]
+        return self.leaguelabel[rows[0]], self.records(rows)
@@ -0,0 +1,101 @@
+import io
+import os
+
+import numpy as np
+
+from ranking_engine import group_bounds
+
+# Every rating a team ever had (one row per team per game in elos_<year>.csv),
+# sorted by team then date, so that "rating of a team at a date" is a binary
+# search in that team's run of rows instead of a window function over the
+# whole history. Written next to the snapshot by models/elo_calculation.py.
+history_uri = os.getenv('RATING_HISTORY')
+
+# Loaded once per warm container and ranking version.
+_history = None
+_history_version = None
+
+class RatingHistory:
+    '''
+    Rating history as three arrays sorted by (team, date): team ids, dates
+    (int64 ms since the epoch, UTC) and ratings. Rows of one team on the same
+    date keep their game order, the last one being the rating after that day.
+    '''
+
+    def __init__(self, team_ids, dates, ratings):
+        order = np.lexsort((np.asarray(dates), np.asarray(team_ids)))
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)[order]
+        self.dates = np.asarray(dates, dtype=np.int64)[order]
+        self.ratings = np.asarray(ratings, dtype=float)[order]
+        bounds = group_bounds(self.team_ids)
+        self.teams = self.team_ids[bounds[:-1]]
+        self.team_starts = bounds[:-1]
+        self.team_index = {int(team_id): (start, end)
+                           for team_id, start, end in zip(self.teams, bounds[:-1], bounds[1:])}
+
+        # (team, date) folded into one sorted int64 key, dates replaced by their
+        # rank among all distinct dates, so ratings_at() searches every team at
+        # once with a single searchsorted.
+        self.unique_dates, date_ranks = np.unique(self.dates, return_inverse=True)
+        self.stride = len(self.unique_dates) + 1
+        team_codes = np.repeat(np.arange(len(self.teams), dtype=np.int64), np.diff(bounds))
+        self.keys = team_codes * self.stride + date_ranks.reshape(-1) + 1
+
+    @classmethod
+    def from_frame(cls, history):
+        '''From load_rating_history's output (date, team, rating columns).'''
+        dates = history['date'].dt.tz_convert('UTC').dt.tz_localize(None)
+        return cls(history['team'].to_numpy(dtype=np.int64),
+                   dates.to_numpy(dtype='datetime64[ms]').astype(np.int64),
+                   history['rating'].to_numpy(dtype=float))
+
+    def save(self, filename):
+        np.savez(filename, team_ids=self.team_ids, dates=self.dates, ratings=self.ratings)
+
+    @classmethod
+    def load(cls, data):
+        '''From save()'s output: a filename or the file's bytes.'''
+        source = io.BytesIO(data) if isinstance(data, bytes) else data
+        with np.load(source) as arrays:
+            return cls(arrays['team_ids'], arrays['dates'], arrays['ratings'])
+
+    def rating_at(self, team_id, date):
+        '''(rating, date of the game it comes from) of a team as of <date>
+        (ms since the epoch), None if the team had not played yet.'''
+        if team_id not in self.team_index:
+            return None
+        start, end = self.team_index[team_id]
+        position = start + np.searchsorted(self.dates[start:end], date, side='right') - 1
+        if position < start:
+            return None
+        return float(self.ratings[position]), int(self.dates[position])
+
+    def ratings_at(self, date, team_ids=None):
+        '''
+        Rating of every team (or of <team_ids>) as of <date>: arrays of team
+        ids, ratings and game dates, leaving out teams that had not played yet.
+        '''
+        if team_ids is None:
+            team_codes = np.arange(len(self.teams))
+        else:
+            team_codes = np.searchsorted(self.teams, np.asarray(team_ids, dtype=np.int64))
+            team_codes = team_codes[team_codes < len(self.teams)]
+            team_codes = np.unique(team_codes[np.isin(self.teams[team_codes], team_ids)])
+        date_rank = np.searchsorted(self.unique_dates, date, side='right')
+        positions = np.searchsorted(self.keys, team_codes * self.stride + date_rank, side='right') - 1
+        played = positions >= self.team_starts[team_codes]
+        positions = positions[played]
+        return self.team_ids[positions], self.ratings[positions], self.dates[positions]
+
+def load_history(data_version=None, uri=None):
+    '''The deployed rating history, read again when the ranking version changes.
+    Raises ValueError when none is configured (RATING_HISTORY).'''
+    global _history, _history_version
+    if _history is None or data_version != _history_version:
+        from snapshot_store import read_uri
+        uri = uri or history_uri
+        if not uri:
+            raise ValueError('No rating history deployed')
+        _history = RatingHistory.load(read_uri(uri))
+        _history_version = data_version
+    return _history
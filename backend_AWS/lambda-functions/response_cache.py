@@ -0,0 +1,86 @@
+import os
+import time
+from collections import OrderedDict
+
+import snapshot_store
+
+# Marker written next to the snapshot by models/ranking_snapshot.py whenever
+# the rankings are rebuilt: s3://bucket/key or a local path.
+version_uri = os.getenv('RANKING_VERSION')
+ttl_seconds = float(os.getenv('RESPONSE_CACHE_TTL', 300))
+max_entries = int(os.getenv('RESPONSE_CACHE_SIZE', 256))
+# Reading the marker costs an S3 round trip, so it is checked at most this often.
+version_check_seconds = float(os.getenv('RANKING_VERSION_CHECK', 30))
+
+def cache_key(endpoint, **params):
+    '''Normalized key: parameter order doesn't matter, lists are sorted and
+    deduplicated, so that equivalent requests share an entry.'''
+    normalized = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(set(value)))
+        normalized.append((name, value))
+    return (endpoint, tuple(normalized))
+
+class ResponseCache:
+    '''
+    Module-level cache of full Lambda responses, kept across warm invocations.
+    Entries expire after ttl_seconds, the least recently used one is evicted
+    once max_entries is reached, and everything is dropped (in-memory
+    snapshot included) when the data-version marker changes.
+    '''
+
+    def __init__(self, max_entries=max_entries, ttl_seconds=ttl_seconds,
+                 version_uri=version_uri, version_check_seconds=version_check_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_uri = version_uri
+        self.version_check_seconds = version_check_seconds
+        self.entries = OrderedDict()
+        self.data_version = None
+        self.version_checked_at = None
+
+    def check_version(self):
+        '''Clears the cache if the rankings were rebuilt since the last check.'''
+        if not self.version_uri:
+            return
+        now = time.monotonic()
+        if self.version_checked_at is not None and now - self.version_checked_at < self.version_check_seconds:
+            return
+        self.version_checked_at = now
+        try:
+            current_version = snapshot_store.read_uri(self.version_uri).decode().strip()
+        except Exception as e:
+            # Keep serving what we have; the TTL still bounds staleness.
+            print("Could not read the ranking version marker:", e)
+            return
+        if current_version != self.data_version:
+            if self.data_version is not None:
+                self.clear()
+                snapshot_store.reset_snapshot()
+            self.data_version = current_version
+
+    def get(self, key):
+        self.check_version()
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+# Shared by the handlers living in the same container.
+response_cache = ResponseCache()
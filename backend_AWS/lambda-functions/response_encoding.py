@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+# orjson is several times faster than json.dumps on lists of dicts; it is
+# used when it is packaged with the function, json otherwise. Importing it
+# costs a few ms, so that only happens on the first encode: containers that
+# serve pre-encoded bodies never pay it.
+_dumps = None
+
+def dumps(obj):
+    '''JSON text of obj, with the fastest encoder available.'''
+    global _dumps
+    if _dumps is None:
+        try:
+            import orjson
+            _dumps = lambda value: orjson.dumps(value).decode()
+        except ImportError:
+            _dumps = json.dumps
+    return _dumps(obj)
+
+def make_etag(data_version, body):
+    '''Strong ETag for a response: a hash of the body actually sent, since
+    orjson and json don't encode the same data to the same bytes. The data
+    version, when there is one, prefixes it.'''
+    digest = hashlib.sha1(body.encode()).hexdigest()[:20]
+    if data_version is not None:
+        return f'"{data_version}-{digest}"'
+    return f'"{digest}"'
+
+def ok_response(body, headers, data_version):
+    '''200 response carrying an ETag, ready to be cached.'''
+    headers = dict(headers, ETag=make_etag(data_version, body))
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': body
+    }
+
+def if_none_match(event):
+    '''ETags the client already has, from the If-None-Match header.'''
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == 'if-none-match' and value:
+            # API Gateway may weaken our tags when it compresses the body
+            return {tag.strip().replace('W/', '', 1) for tag in value.split(',')}
+    return set()
+
+def revalidate(event, response):
+    '''The response itself, or an empty 304 if the client's copy is current.'''
+    etag = response.get('headers', {}).get('ETag')
+    client_tags = if_none_match(event)
+    if etag is not None and (etag in client_tags or '*' in client_tags):
+        return {
+            'statusCode': 304,
+            'headers': response['headers'],
+            'body': ''
+        }
+    return response
@@ -0,0 +1,264 @@
+import json
+import mmap
+import os
+import struct
+from league_index import LeagueIndex
+from response_encoding import dumps
+
+# Location of the ranking snapshot built by models/ranking_snapshot.py:
+# either s3://bucket/key or a local path (tests, local runs).
+snapshot_uri = os.getenv('RANKING_SNAPSHOT')
+# Optional file of pre-encoded response bodies (see write_body_file), mapped
+# into memory rather than parsed: a cold container reads only what it serves.
+bodies_uri = os.getenv('RANKING_BODIES')
+
+# Loaded once per warm container, then served from memory.
+_snapshot = None
+_league_index = None
+_probabilities = None
+_encoded = None
+_bodies = None
+
+# getGlobalRankings sizes whose bodies are encoded up front.
+TOP_N_BUCKETS = (5, 10, 20, 25, 50, 100)
+
+_s3 = None
+
+def s3_client():
+    '''boto3 is only imported, and the client only built, when S3 is used.'''
+    global _s3
+    if _s3 is None:
+        import boto3
+        _s3 = boto3.client('s3')
+    return _s3
+
+def read_uri(uri):
+    '''Raw bytes behind an s3:// URI or a local file path.'''
+    if uri.startswith('s3://'):
+        bucket, key = uri[len('s3://'):].split('/', 1)
+        return s3_client().get_object(Bucket=bucket, Key=key)['Body'].read()
+    with open(uri, 'rb') as snapshot_file:
+        return snapshot_file.read()
+
+def load_snapshot(uri=None):
+    '''The ranking snapshot, read on the first call only.'''
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = json.loads(read_uri(uri or snapshot_uri))
+    return _snapshot
+
+def reset_snapshot():
+    '''Forgets the in-memory snapshot so the next call reloads it.'''
+    global _snapshot, _league_index, _probabilities, _encoded, _bodies
+    _snapshot = None
+    _league_index = None
+    _probabilities = None
+    _encoded = None
+    # Only a body file holds a mapping to release; EncodedSnapshot is plain memory.
+    if isinstance(_bodies, MappedBodies):
+        _bodies.close()
+    _bodies = None
+
+def global_rankings(snapshot, number_of_teams):
+    '''Top teams by latest rating, like the getGlobalRankings query.'''
+    return snapshot['global'][:number_of_teams]
+
+def league_index(snapshot):
+    '''LeagueIndex over the snapshot's ranked leagues, built once per snapshot.'''
+    global _league_index
+    if _league_index is None or _league_index[0] is not snapshot:
+        _league_index = (snapshot, LeagueIndex.from_snapshot(snapshot))
+    return _league_index[1]
+
+def win_probabilities(snapshot):
+    '''WinProbabilities over the snapshot's latest ratings, built once per
+    snapshot; its matrices are kept with it.'''
+    global _probabilities
+    if _probabilities is None or _probabilities[0] is not snapshot:
+        # Imported here: numpy is only paid for by getMatchupPredictions
+        from win_probability import WinProbabilities
+        _probabilities = (snapshot, WinProbabilities.from_snapshot(snapshot))
+    return _probabilities[1]
+
+def team_rankings(snapshot, league_ids, team_ids=None):
+    '''Per-league ranked teams, optionally restricted to a few team ids, like
+    the getTeamRankings query. Leagues come out in ascending id order.'''
+    return league_index(snapshot).select(league_ids, team_ids)
+
+def tournament_rankings(snapshot, league_id, stage_name=None):
+    '''Latest rating of every team in a league (or one of its stages), best
+    first, like the getTournamentRanking query. Returns (leaguelabel, teams).'''
+    league = snapshot['leagues'].get(str(league_id))
+    if league is None:
+        return "", []
+    if stage_name is None:
+        return league['leaguelabel'], league['latest']
+    return league['leaguelabel'], snapshot['stages'].get(str(league_id), {}).get(stage_name, [])
+
+class EncodedSnapshot:
+    '''
+    Response bodies of the common requests, encoded once per snapshot:
+    - getGlobalRankings for the usual team counts
+    - getTournamentRanking for every league and league stage
+    - getTeamRankings per league, as fragments joined into the list
+    Anything else (team filters, other sizes) is encoded on request.
+    '''
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.version = snapshot['version']
+        self.global_bodies = {number_of_teams: dumps({'teams': global_rankings(snapshot, number_of_teams)})
+                              for number_of_teams in TOP_N_BUCKETS}
+        self.league_fragments = {}
+        self.tournament_bodies = {}
+        for league_id, league in snapshot['leagues'].items():
+            league_id = int(league_id)
+            self.league_fragments[league_id] = dumps({"tournament_id": league['tournament_name'],
+                                                      "team_rankings": league['teams']})
+            self.tournament_bodies[(league_id, None)] = tournament_body(league_id, None, league['leaguelabel'],
+                                                                        league['latest'])
+            for stage_name, teams in snapshot['stages'].get(str(league_id), {}).items():
+                self.tournament_bodies[(league_id, stage_name)] = tournament_body(league_id, stage_name,
+                                                                                  league['leaguelabel'], teams)
+
+    def global_body(self, number_of_teams):
+        if number_of_teams in self.global_bodies:
+            return self.global_bodies[number_of_teams]
+        return dumps({'teams': global_rankings(self.snapshot, number_of_teams)})
+
+    def team_body(self, league_ids, team_ids=None):
+        if team_ids:
+            return dumps({"teamRanking": team_rankings(self.snapshot, league_ids, team_ids)})
+        fragments = [self.league_fragments[league_id] for league_id in sorted(set(league_ids))
+                     if league_id in self.league_fragments]
+        return '{"teamRanking": [' + ', '.join(fragments) + ']}'
+
+    def tournament_body(self, league_id, stage_name=None):
+        if (league_id, stage_name) in self.tournament_bodies:
+            return self.tournament_bodies[(league_id, stage_name)]
+        leaguelabel, teams = tournament_rankings(self.snapshot, league_id, stage_name)
+        return tournament_body(league_id, stage_name, leaguelabel, teams)
+
+def tournament_body(league_id, stage_name, leaguelabel, teams):
+    return dumps({
+        'tournament_id': league_id,
+        'stage_name': stage_name,
+        'leaguelabel': leaguelabel,
+        'teams': teams
+    })
+
+def encoded_bodies(snapshot):
+    '''EncodedSnapshot of the snapshot, built once per snapshot.'''
+    global _encoded
+    if _encoded is None or _encoded.snapshot is not snapshot:
+        _encoded = EncodedSnapshot(snapshot)
+    return _encoded
+
+# Body file layout: an 8-byte header length, a JSON header (version and
+# offsets of every body), then the UTF-8 bodies back to back.
+HEADER_LENGTH = struct.Struct('<Q')
+
+def write_body_file(snapshot, filename):
+    '''Writes every body EncodedSnapshot prepares up front to one file.'''
+    encoded = EncodedSnapshot(snapshot)
+    chunks = []
+    position = 0
+
+    def add(body):
+        nonlocal position
+        data = body.encode()
+        chunks.append(data)
+        position += len(data)
+        return [position - len(data), len(data)]
+
+    header = {
+        'version': encoded.version,
+        'global': {str(number_of_teams): add(body) for number_of_teams, body in encoded.global_bodies.items()},
+        'leagues': {str(league_id): add(body) for league_id, body in encoded.league_fragments.items()},
+        'tournaments': {}
+    }
+    for (league_id, stage_name), body in encoded.tournament_bodies.items():
+        league = header['tournaments'].setdefault(str(league_id), {'stages': {}})
+        if stage_name is None:
+            league['latest'] = add(body)
+        else:
+            league['stages'][stage_name] = add(body)
+
+    header_data = json.dumps(header).encode()
+    with open(filename, 'wb') as body_file:
+        body_file.write(HEADER_LENGTH.pack(len(header_data)))
+        body_file.write(header_data)
+        for data in chunks:
+            body_file.write(data)
+
+class MappedBodies:
+    '''
+    Same interface as EncodedSnapshot, over a body file mapped in memory. Only
+    the small header is parsed; a body is decoded when it is served. Requests
+    the file doesn't cover fall back to the JSON snapshot, loaded then.
+    '''
+
+    def __init__(self, filename):
+        self.body_file = open(filename, 'rb')
+        self.mapped = mmap.mmap(self.body_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_length = HEADER_LENGTH.unpack_from(self.mapped, 0)[0]
+        self.header = json.loads(self.mapped[HEADER_LENGTH.size:HEADER_LENGTH.size + header_length])
+        self.start = HEADER_LENGTH.size + header_length
+        self.version = self.header['version']
+
+    def read(self, location):
+        offset, length = location
+        return self.mapped[self.start + offset:self.start + offset + length].decode()
+
+    def fallback(self):
+        return encoded_bodies(load_snapshot())
+
+    def global_body(self, number_of_teams):
+        location = self.header['global'].get(str(number_of_teams))
+        if location is None:
+            return self.fallback().global_body(number_of_teams)
+        return self.read(location)
+
+    def team_body(self, league_ids, team_ids=None):
+        if team_ids:
+            return self.fallback().team_body(league_ids, team_ids)
+        fragments = [self.read(self.header['leagues'][str(league_id)]) for league_id in sorted(set(league_ids))
+                     if str(league_id) in self.header['leagues']]
+        return '{"teamRanking": [' + ', '.join(fragments) + ']}'
+
+    def tournament_body(self, league_id, stage_name=None):
+        league = self.header['tournaments'].get(str(league_id), {})
+        location = league.get('latest') if stage_name is None else league.get('stages', {}).get(stage_name)
+        if location is None:
+            return self.fallback().tournament_body(league_id, stage_name)
+        return self.read(location)
+
+    def close(self):
+        self.mapped.close()
+        self.body_file.close()
+
+def local_path(uri):
+    '''A local file for the URI: S3 objects are copied to /tmp once.'''
+    if not uri.startswith('s3://'):
+        return uri
+    filename = os.path.join('/tmp', os.path.basename(uri))
+    with open(filename, 'wb') as local_file:
+        local_file.write(read_uri(uri))
+    return filename
+
+def load_bodies():
+    '''Response bodies for the snapshot-backed handlers: the mapped body file
+    when one is deployed, bodies encoded from the JSON snapshot otherwise.'''
+    global _bodies
+    if _bodies is None:
+        if bodies_uri:
+            _bodies = MappedBodies(local_path(bodies_uri))
+        else:
+            _bodies = encoded_bodies(load_snapshot())
+    return _bodies
+
+if __name__ == '__main__':
+    # python snapshot_store.py ranking_snapshot.json ranking_snapshot.bodies
+    import sys
+    with open(sys.argv[1], 'rb') as snapshot_file:
+        write_body_file(json.loads(snapshot_file.read()), sys.argv[2])
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+# Head-to-head predictions from Elo ratings. elo_formula scores one game at a
+# time; here every pair of teams is scored in one broadcast operation, and
+# series odds (Bo3, Bo5) follow from the single-game probabilities.
+
+def expected_scores(ratings_a, ratings_b):
+    '''Chance that a beats b in one game: elo_formula's expected result,
+    broadcast over arrays.'''
+    delta = np.asarray(ratings_a, dtype=float) - np.asarray(ratings_b, dtype=float)
+    return 1 / (10 ** (-delta / 400) + 1)
+
+def expected_matrix(ratings):
+    '''[N, N] matrix whose (i, j) entry is the chance that team i beats team j.'''
+    ratings = np.asarray(ratings, dtype=float)
+    return expected_scores(ratings[:, None], ratings[None, :])
+
+def series_probability(p, best_of):
+    '''
+    Chance of winning a best-of-<best_of> series from the single-game chance
+    <p> (scalar or array), games being independent: the series is won in
+    wins_needed + losses games, the last one being a win.
+    '''
+    p = np.asarray(p, dtype=float)
+    wins_needed = best_of // 2 + 1
+    total = np.zeros_like(p)
+    for losses in range(wins_needed):
+        total += math.comb(wins_needed - 1 + losses, losses) * (1 - p) ** losses
+    return total * p ** wins_needed
+
+class WinProbabilities:
+    '''
+    Predictions for a set of teams. Matrices are computed on first use and
+    kept per key (e.g. a league), teams asked for and series length.
+    '''
+
+    def __init__(self, team_ids, ratings):
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)
+        self.ratings = np.asarray(ratings, dtype=float)
+        self.positions = {int(team_id): i for i, team_id in enumerate(self.team_ids)}
+        self.matrices = {}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        '''Latest rating of every team, from the snapshot's global ranking.'''
+        teams = snapshot['global']
+        return cls([int(team['team_id']) for team in teams], [float(team['ranking_points']) for team in teams])
+
+    def probability(self, team_a, team_b, best_of=1):
+        '''Chance that team_a beats team_b, None if either has no rating.'''
+        if team_a not in self.positions or team_b not in self.positions:
+            return None
+        p = expected_scores(self.ratings[self.positions[team_a]], self.ratings[self.positions[team_b]])
+        return float(series_probability(p, best_of)) if best_of > 1 else float(p)
+
+    def matrix(self, team_ids=None, best_of=1, key=None):
+        '''
+        Matrix over <team_ids> (rated teams only, in the given order; all
+        teams if None). Pass a <key> (e.g. the league id) to keep it.
+        Returns (team ids, matrix).
+        '''
+        cache_key = (key, None if team_ids is None else tuple(team_ids), best_of)
+        if key is not None and cache_key in self.matrices:
+            return self.matrices[cache_key]
+        if team_ids is None:
+            rows = np.arange(len(self.team_ids))
+        else:
+            rows = np.array([self.positions[team_id] for team_id in team_ids if team_id in self.positions],
+                            dtype=np.int64)
+        matrix = expected_matrix(self.ratings[rows])
+        if best_of > 1:
+            matrix = series_probability(matrix, best_of)
+        result = (self.team_ids[rows], matrix)
+        if key is not None:
+            self.matrices[cache_key] = result
+        return result
@@ -0,0 +1,125 @@
+'''
+Compares the column-by-column fillna loop and the copy/replace ADR dance that
+process_and_score_games used to run with the shared feature engineering module
+(build_metrics), on a synthetic frame shaped like hackathon-riot-data.csv.
+
+Run from the repository root: python benchmarks/bench_feature_engineering.py [nb_games]
+'''
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+from feature_engineering import ROLES, OBJECTIVE_COLUMNS, build_metrics
+
+TOWERS = [f'{tier}{lane}{side}Timer' for side in ['Blue', 'Red']
+          for tier, lane in [('Outer', 'Top'), ('Outer', 'Mid'), ('Outer', 'Bot'),
+                             ('Inner', 'Top'), ('Inner', 'Mid'), ('Inner', 'Bot'),
+                             ('Base', 'Top'), ('Base', 'Mid'), ('Base', 'Bot'),
+                             ('Nexus1', 'Mid'), ('Nexus2', 'Mid')]]
+
+def synthetic_games(nb_games, seed=0):
+    '''A frame with the columns the scoring needs, where roughly half of the
+    tower timers are NaN (the tower never fell) and some teams never died.'''
+    rng = np.random.default_rng(seed)
+    data = {
+        'winner': rng.choice(['blue', 'red'], nb_games),
+        'gameDuration': rng.uniform(1200, 2700, nb_games),
+    }
+    for col in TOWERS:
+        data[col] = np.where(rng.random(nb_games) < 0.5, np.nan, rng.uniform(300, 2400, nb_games))
+    for side in ['Blue', 'Red']:
+        data[f'{side}TotalGoldEnd'] = rng.integers(30000, 80000, nb_games).astype(float)
+        data[f'{side}AssistsEnd'] = rng.integers(0, 60, nb_games).astype(float)
+        data[f'{side}DeathsEnd'] = rng.integers(0, 30, nb_games).astype(float)
+        for col in OBJECTIVE_COLUMNS:
+            data[f'{side}{col}'] = rng.integers(0, 11, nb_games).astype(float)
+        for role in ROLES:
+            data[f'VisionScore{role}{side}'] = rng.uniform(10, 150, nb_games)
+            #The rest of the per-role endgame columns only widen the frame.
+            for stat in ['DamageDealt', 'DamageTaken', 'TotalCCDuration']:
+                data[f'{stat}{role}{side}'] = rng.uniform(0, 50000, nb_games)
+            for value in [10, 15, 'End']:
+                data[f'Gold{role}{side}{value}'] = rng.uniform(2000, 20000, nb_games)
+
+    #10 and 15-minute stats, some of which are missing for short games.
+    for value in [10, 15]:
+        for role in ROLES + ['Bot']:
+            data[f'GoldDiff{value}{role}'] = rng.normal(0, 1000, nb_games)
+            data[f'XPDiff{value}{role}'] = rng.normal(0, 800, nb_games)
+        for side in ['Blue', 'Red']:
+            for stat in ['Kills', 'Assists', 'Deaths', 'TotalGold', 'DragonKills', 'TowerKills', 'InhibKills']:
+                data[f'{side}{stat}{value}'] = np.where(rng.random(nb_games) < 0.01, np.nan,
+                                                        rng.integers(0, 20, nb_games))
+    return pd.DataFrame(data)
+
+def legacy_metrics(df):
+    '''The pre-refactor code path, kept here only as a point of comparison.'''
+    for col in df.columns.tolist():
+        if df[col].isnull().sum() != 0:
+            df[col] = df[col].fillna(df['gameDuration'])
+
+    features_df = pd.DataFrame()
+    features_df['winner'] = df['winner']
+    features_df['gameDurationMin'] = (df['gameDuration'] / 60)
+    for side in ['Blue', 'Red']:
+        for col in OBJECTIVE_COLUMNS:
+            features_df[f'{side}{col}'] = df[f'{side}{col}']
+    features_df['GoldDiffEnd'] = df['BlueTotalGoldEnd'] - df['RedTotalGoldEnd']
+    features_df['VisionScoreBlue'] = sum(df[f'VisionScore{role}Blue'] for role in ROLES)
+    features_df['VisionScoreRed'] = sum(df[f'VisionScore{role}Red'] for role in ROLES)
+
+    for side in ['Blue', 'Red']:
+        df[f'{side}DeathsEndCopy'] = df[f'{side}DeathsEnd']
+        df[f'{side}DeathsEnd'] = df[f'{side}DeathsEnd'].replace(0.0, 1.0)
+        features_df[f'{side}ADREnd'] = (df[f'{side}AssistsEnd'] / df[f'{side}DeathsEnd'])
+        df[f'{side}DeathsEnd'] = df[f'{side}DeathsEndCopy']
+        df.drop(columns=[f'{side}DeathsEndCopy'], inplace=True)
+
+    metrics_df = pd.DataFrame()
+    metrics_df['winner'] = features_df['winner']
+    metrics_df['GoldDiffPerMinEnd'] = (features_df['GoldDiffEnd'] / features_df['gameDurationMin'])
+    metrics_df['ADRDiffEnd'] = (features_df['BlueADREnd'] - features_df['RedADREnd'])
+    metrics_df['VisionScoreDiffPerMin'] = ((features_df['VisionScoreBlue'] - features_df['VisionScoreRed']) / features_df['gameDurationMin'])
+    metrics_df['ObjectiveDiff'] = (sum(features_df[f'Blue{col}'] for col in OBJECTIVE_COLUMNS) -
+                                   sum(features_df[f'Red{col}'] for col in OBJECTIVE_COLUMNS)).astype(int)
+    return metrics_df
+
+def shared_metrics(df):
+    #No fillna pass: none of the four metrics reads a tower timer.
+    return build_metrics(df)
+
+def measure(func, df, repeats=3):
+    '''Best wall time over a few runs, and the peak traced allocation of one run.'''
+    timings = []
+    for _ in range(repeats):
+        frame = df.copy()
+        start = time.perf_counter()
+        result = func(frame)
+        timings.append(time.perf_counter() - start)
+
+    frame = df.copy()
+    tracemalloc.start()
+    func(frame)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, min(timings), peak
+
+if __name__ == '__main__':
+    nb_games = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    games_df = synthetic_games(nb_games)
+
+    legacy_df, legacy_time, legacy_peak = measure(legacy_metrics, games_df)
+    shared_df, shared_time, shared_peak = measure(shared_metrics, games_df)
+
+    #Both paths have to agree before the numbers mean anything.
+    pd.testing.assert_frame_equal(legacy_df, shared_df, check_dtype=False)
+
+    print(f'{nb_games} synthetic games')
+    print(f'legacy loop:    {legacy_time:8.3f} s, peak {legacy_peak / 2**20:8.1f} MiB')
+    print(f'shared module:  {shared_time:8.3f} s, peak {shared_peak / 2**20:8.1f} MiB')
+    print(f'speedup x{legacy_time / shared_time:.1f}, memory x{legacy_peak / shared_peak:.1f}')
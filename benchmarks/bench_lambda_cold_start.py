@@ -0,0 +1,137 @@
+'''
+Cold-start cost of the ranking Lambda handlers: import time, first invocation
+and second (warm) invocation, each measured in a fresh interpreter, for the
+three ways a handler can answer:
+- athena:   through the Athena runner, against a stubbed boto3 that answers at once
+- snapshot: from the JSON ranking snapshot
+- bodies:   from the memory-mapped file of pre-encoded bodies
+
+Run from the repository root: python benchmarks/bench_lambda_cold_start.py [nb_teams]
+'''
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LAMBDA_DIR = os.path.join(ROOT, 'backend_AWS', 'lambda-functions')
+sys.path.insert(0, os.path.join(ROOT, 'models'))
+from ranking_snapshot import build_ranking_snapshot
+
+#Stands in for boto3 in the child processes: Athena queries succeed at once
+#and return a few rows carrying every column the handlers read.
+BOTO3_STUB = '''
+COLUMNS = ['leagueid', 'tournament_name', 'leaguelabel', 'team_id', 'team_code', 'team_name', 'rating', 'rank_team']
+TYPES = ['bigint', 'varchar', 'varchar', 'bigint', 'varchar', 'varchar', 'double', 'integer']
+
+class FakeAthena:
+    def start_query_execution(self, **kwargs):
+        return {'QueryExecutionId': 'stub'}
+
+    def get_query_execution(self, QueryExecutionId):
+        return {'QueryExecution': {'Status': {'State': 'SUCCEEDED'}}}
+
+    def get_query_results(self, QueryExecutionId, MaxResults, NextToken=None):
+        rows = [{'Data': [{'VarCharValue': name} for name in COLUMNS]}]
+        for rank in range(1, 21):
+            values = ['1', 'League 1', 'League 1', str(rank), f'T{rank}', f'Team {rank}', str(1600.0 - rank), str(rank)]
+            rows.append({'Data': [{'VarCharValue': value} for value in values]})
+        return {'ResultSet': {'ResultSetMetadata': {'ColumnInfo': [{'Name': name, 'Type': column_type}
+                for name, column_type in zip(COLUMNS, TYPES)]}, 'Rows': rows}}
+
+def client(service_name, **kwargs):
+    return FakeAthena()
+'''
+
+CHILD = '''
+import sys, time, json
+start = time.perf_counter()
+handler = __import__(sys.argv[1])
+imported = time.perf_counter()
+event = json.loads(sys.argv[2])
+handler.lambda_handler(event, None)
+first = time.perf_counter()
+handler.lambda_handler(event, None)
+second = time.perf_counter()
+print(json.dumps([imported - start, first - imported, second - first]))
+'''
+
+EVENTS = {
+    'getGlobalRankings': {'queryStringParameters': {'number_of_teams': '20'}},
+    'getTeamRankings': {'queryStringParameters': {'tournament_id': '1,2,3'}},
+    'getTournamentRanking': {'pathParameters': {'tournament_id': '1'}, 'queryStringParameters': {}},
+}
+
+def synthetic_history(nb_teams, nb_leagues=40, games_per_team=60, seed=0):
+    rng = np.random.default_rng(seed)
+    nb_rows = nb_teams * games_per_team
+    team = rng.integers(0, nb_teams, nb_rows)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2023-01-01', tz='UTC') + pd.to_timedelta(np.sort(rng.integers(0, 300, nb_rows)), unit='D'),
+        'team': team,
+        'rating': rng.normal(1500, 200, nb_rows).round(2),
+        'leagueId': team % nb_leagues + 1,
+        'leagueLabel': 'League ' + pd.Series(team % nb_leagues + 1).astype(str),
+        'stageTournament': 'Split ' + pd.Series(rng.integers(1, 3, nb_rows)).astype(str),
+        'stageName': 'Regular Season',
+        'year': 2023,
+        'stage_name': 'Split 1 Regular Season 2023'
+    })
+
+def check_reset(snapshot_file, bodies_file):
+    '''A data-version change resets the snapshot store whichever bodies it
+    serves (encoded from the snapshot, or mapped from the body file), and the
+    next request reloads them.'''
+    sys.path.insert(0, LAMBDA_DIR)
+    import snapshot_store
+    snapshot_store.snapshot_uri = snapshot_file
+    for bodies_uri in (None, bodies_file):
+        snapshot_store.bodies_uri = bodies_uri
+        body = snapshot_store.load_bodies().global_body(20)
+        snapshot_store.reset_snapshot()
+        assert snapshot_store._bodies is None and snapshot_store._snapshot is None
+        assert snapshot_store.load_bodies().global_body(20) == body
+        snapshot_store.reset_snapshot()
+
+def measure(handler, env, stub_dir, repeats=5):
+    '''Median of each timing over a few fresh interpreters, in milliseconds.'''
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([stub_dir, LAMBDA_DIR]), **env)
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', CHILD, handler, json.dumps(EVENTS[handler])],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output))
+    return [statistics.median(run[i] for run in runs) * 1000 for i in range(3)]
+
+if __name__ == '__main__':
+    nb_teams = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.makedirs(os.path.join(work_dir, 'boto3'))
+        with open(os.path.join(work_dir, 'boto3', '__init__.py'), 'w') as stub_file:
+            stub_file.write(BOTO3_STUB)
+
+        snapshot_file = os.path.join(work_dir, 'ranking_snapshot.json')
+        bodies_file = os.path.join(work_dir, 'ranking_snapshot.bodies')
+        build_ranking_snapshot(synthetic_history(nb_teams), teams=pd.DataFrame(columns=['team', 'team_code', 'team_name']),
+                               output_filename=snapshot_file, version_filename=os.path.join(work_dir, 'version.txt'),
+                               bodies_filename=bodies_file)
+        print(f'{nb_teams} teams, snapshot {os.path.getsize(snapshot_file) / 2**20:.1f} MiB, '
+              f'bodies {os.path.getsize(bodies_file) / 2**20:.1f} MiB')
+        check_reset(snapshot_file, bodies_file)
+
+        modes = {
+            'athena': {'S3_OUTPUT_LOC': 's3://stub/', 'DATABASE': 'stub'},
+            'snapshot': {'RANKING_SNAPSHOT': snapshot_file},
+            'bodies': {'RANKING_SNAPSHOT': snapshot_file, 'RANKING_BODIES': bodies_file},
+        }
+        print(f'{"handler":<22}{"mode":<10}{"import":>10}{"first call":>12}{"warm call":>11}   (ms)')
+        for handler in EVENTS:
+            for mode, env in modes.items():
+                imported, first, second = measure(handler, env, work_dir)
+                print(f'{handler:<22}{mode:<10}{imported:10.2f}{first:12.2f}{second:11.3f}')
@@ -0,0 +1,102 @@
+'''
+Per-endpoint latency of the ranking handlers served from the local SQLite
+warehouse (local_warehouse.py) with the same SQL they send to Athena, over a
+synthetic rating history. The response cache is disabled so every call runs
+its query. The window-function query getGlobalRankings used to run on the
+full history is timed next to the current ratings table it now reads.
+
+Run from the repository root: python benchmarks/bench_local_warehouse.py [nb_teams]
+'''
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'backend_AWS', 'data-etl'))
+sys.path.insert(0, os.path.join(ROOT, 'backend_AWS', 'lambda-functions'))
+sys.path.insert(0, os.path.join(ROOT, 'models'))
+from bench_lambda_cold_start import synthetic_history
+from local_warehouse import LocalRunner, build_warehouse, rating_history_table
+from ranking_snapshot import build_current_ratings
+from teamRanking import latest_ratings, rank_all
+
+LEGACY_GLOBAL_QUERY = '''
+    WITH ranked_teams AS (
+    SELECT team_id, team_code, team_name, rating, game_date,
+           RANK() OVER (PARTITION BY team_id ORDER BY game_date DESC) AS rank
+    FROM "all_years_riot"."riot_all_years")
+    SELECT team_id, team_code, team_name, rating
+    FROM ranked_teams
+    WHERE rank = 1
+    ORDER BY rating DESC
+    LIMIT 20
+'''
+
+CURRENT_GLOBAL_QUERY = '''
+    SELECT team_id, team_code, team_name, rating
+    FROM "all_years_riot"."current_ratings"
+    WHERE is_global_latest
+    ORDER BY rating DESC, team_id ASC
+    LIMIT 20
+'''
+
+def latency(func, calls):
+    '''Mean and 99th percentile latency in milliseconds.'''
+    timings = []
+    for args in calls:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return timings.mean(), np.percentile(timings, 99)
+
+if __name__ == '__main__':
+    nb_teams = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    history = synthetic_history(nb_teams)
+    teams = pd.DataFrame({'team': np.arange(nb_teams), 'team_code': [f'T{team}' for team in range(nb_teams)],
+                          'team_name': [f'Team {team}' for team in range(nb_teams)]})
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        warehouse_dir = os.path.join(work_dir, 'warehouse')
+        start = time.perf_counter()
+        build_warehouse(warehouse_dir, rating_history_table(history, teams),
+                        build_current_ratings(history, teams, output_dir=os.path.join(work_dir, 'current_ratings')),
+                        rank_all(latest_ratings(history, teams)))
+        print(f'{len(history)} rating rows, {nb_teams} teams, warehouse built in {time.perf_counter() - start:.2f} s')
+
+        #Read at import by the handlers.
+        os.environ.update(LOCAL_WAREHOUSE=warehouse_dir, DATABASE='all_years_riot',
+                          RESPONSE_CACHE_SIZE='0', TEAM_RANKINGS_REFRESH='0')
+        import getGlobalRankings
+        import getTeamRankings
+        import getTournamentRanking
+
+        rng = np.random.default_rng(1)
+        leagues = history['leagueId'].unique()
+        stages = history['stage_name'].unique()
+        global_events = [({'queryStringParameters': {'number_of_teams': str(n)}}, None) for n in rng.integers(5, 100, 200)]
+        team_events = [({'queryStringParameters': {'tournament_id': ','.join(map(str, rng.choice(leagues, 3)))}}, None)
+                       for _ in range(200)]
+        tournament_events = [({'pathParameters': {'tournament_id': str(rng.choice(leagues))},
+                               'queryStringParameters': {'stage_name': str(rng.choice(stages))} if i % 2 else {}}, None)
+                             for i in range(200)]
+
+        print(f'{"endpoint":<22}{"mean":>10}{"p99":>10}   (ms)')
+        for name, handler, events in [
+            ('getGlobalRankings', getGlobalRankings.lambda_handler, global_events),
+            ('getTeamRankings', getTeamRankings.lambda_handler, team_events),
+            ('getTournamentRanking', getTournamentRanking.lambda_handler, tournament_events)
+        ]:
+            assert handler(*events[0])['statusCode'] == 200
+            mean, p99 = latency(handler, events)
+            print(f'{name:<22}{mean:10.2f}{p99:10.2f}')
+
+        runner = LocalRunner(warehouse_dir)
+        print('top 20 query, full history window vs current ratings table:')
+        for name, query in [('window function', LEGACY_GLOBAL_QUERY), ('current_ratings', CURRENT_GLOBAL_QUERY)]:
+            mean, p99 = latency(lambda: list(runner.run(query)), [()] * 20)
+            print(f'  {name:<20}{mean:10.2f}{p99:10.2f}')
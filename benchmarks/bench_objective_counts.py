@@ -0,0 +1,110 @@
+'''
+Nb*Blue/Red objective counts for a folder of cleaned games, two ways:
+- per game: json.load() and extract_datapoints_from_game on every file, as
+  build_csv does
+- arena: objective_counts over the event arena (grouped bincounts), timed
+  with and without the one-off arena build
+Both must give the same counts. The games are synthetic, with the event mix
+and fields extract_useful_data writes.
+
+Run from the repository root: python benchmarks/bench_objective_counts.py [nb_games]
+'''
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'data-core'))
+from assemble_riot_dataset import extract_datapoints_from_game
+from event_arena import build_event_arena, cleaned_game_files, load_event_arena
+from objective_counts import COLUMNS, objective_counts
+
+MONSTERS = ['dragon', 'baron', 'riftHerald', 'scuttleCrab', 'blueCamp', 'redCamp', 'gromp', 'wolf', 'krug', 'raptor']
+WARDS = ['yellowTrinket', 'control', 'sight']
+LANES = ['top', 'mid', 'bot']
+TIERS = ['outer', 'inner', 'base', 'nexus']
+
+def position(rng):
+    return {'x': float(rng.uniform(0, 15000)), 'z': float(rng.uniform(0, 15000))}
+
+def synthetic_game(platform_id, rng, nb_events=800):
+    '''One cleaned game: header, game_info, then random objective, ward and
+    kill events, ending on game_end.'''
+    game = [{'gameDate': '2023-03-01T10:00:00.000+00:00', 'esportsPlatformId': platform_id, 'gameVersion': '13.4.1'},
+            {'gameTime': 0.0, 'eventType': 'game_info',
+             'blue': [{'participantID': i, 'summonerName': f'Player {i}', 'championName': 'Ahri'} for i in range(1, 6)],
+             'red': [{'participantID': i, 'summonerName': f'Player {i}', 'championName': 'Ahri'} for i in range(6, 11)]}]
+    duration = float(rng.uniform(1500, 2500))
+    for game_time in np.sort(rng.uniform(1, duration, nb_events)):
+        game_time = float(game_time)
+        kind = rng.random()
+        if kind < 0.3:
+            game.append({'gameTime': game_time, 'eventType': 'ward_placed', 'placer': int(rng.integers(1, 11)),
+                         'wardType': str(rng.choice(WARDS)), 'position': position(rng)})
+        elif kind < 0.45:
+            game.append({'gameTime': game_time, 'eventType': 'ward_killed', 'killer': int(rng.integers(1, 11)),
+                         'wardType': str(rng.choice(WARDS)), 'position': position(rng)})
+        elif kind < 0.65:
+            #No team on some kills: the killer's side decides.
+            game.append({'gameTime': game_time, 'eventType': 'epic_monster_kill', 'monsterType': str(rng.choice(MONSTERS)),
+                         'killer': int(rng.integers(0, 11)), 'team': [None, 'blue', 'red'][rng.integers(0, 3)],
+                         'inEnemyJungle': bool(rng.random() < 0.2)})
+        elif kind < 0.75:
+            game.append({'gameTime': game_time, 'eventType': 'turret_plate_destroyed',
+                         'team': str(rng.choice(['blue', 'red'])), 'lane': str(rng.choice(LANES))})
+        elif kind < 0.8:
+            game.append({'gameTime': game_time, 'eventType': 'building_destroyed', 'team': str(rng.choice(['blue', 'red'])),
+                         'lane': str(rng.choice(LANES)), 'buildingType': 'turret', 'turretTier': str(rng.choice(TIERS))})
+        else:
+            game.append({'gameTime': game_time, 'eventType': 'champion_kill', 'killerTeam': str(rng.choice(['blue', 'red'])),
+                         'victimTeam': str(rng.choice(['blue', 'red'])), 'killer': int(rng.integers(1, 11)),
+                         'assistants': [1, 2], 'position': position(rng)})
+    game.append({'gameTime': duration, 'eventType': 'game_end', 'winningTeam': str(rng.choice(['blue', 'red']))})
+    return game
+
+def write_synthetic_games(directory, nb_games, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    for game_number in range(nb_games):
+        platform_id = f'ESPORTSTMNT01:{3000000 + game_number}'
+        with open(os.path.join(directory, f"{platform_id.replace(':', '_')}-cleaned.json"), 'w') as game_file:
+            json.dump(synthetic_game(platform_id, rng), game_file)
+
+def per_game_counts(directory):
+    rows = []
+    for filename in cleaned_game_files(directory):
+        with open(filename, 'r') as game_file:
+            game_stats = extract_datapoints_from_game(json.load(game_file))
+        rows.append([game_stats[column] for column in COLUMNS])
+    return np.array(rows)
+
+if __name__ == '__main__':
+    nb_games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        games_dir = os.path.join(work_dir, 'games')
+        arena_dir = os.path.join(work_dir, 'event_arena')
+        write_synthetic_games(games_dir, nb_games)
+
+        start = time.perf_counter()
+        expected = per_game_counts(games_dir)
+        per_game = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_event_arena(games_dir, arena_dir)
+        build = time.perf_counter() - start
+
+        arena = load_event_arena(arena_dir)
+        start = time.perf_counter()
+        counts = objective_counts(arena)
+        vectorized = time.perf_counter() - start
+
+        assert np.array_equal(counts[COLUMNS].to_numpy(), expected)
+        print(f'{nb_games} games, {len(arena.events)} events')
+        print(f'per game loop (json.load + extract):   {per_game:8.2f} s')
+        print(f'arena build (one-off):                 {build:8.2f} s')
+        print(f'objective_counts on the arena:         {vectorized * 1000:8.1f} ms')
@@ -0,0 +1,129 @@
+'''
+Latency of the three ranking query shapes answered by ranking_engine, next to
+the same queries done with pandas filters and sorts on every call, over the
+current ratings table of a synthetic rating history. The engine's answers are
+first checked against the snapshot-backed handlers' responses.
+
+Run from the repository root: python benchmarks/bench_ranking_engine.py [nb_teams]
+'''
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'backend_AWS', 'lambda-functions'))
+sys.path.insert(0, os.path.join(ROOT, 'models'))
+from bench_lambda_cold_start import synthetic_history
+from ranking_engine import RankingEngine
+from ranking_snapshot import build_current_ratings, build_ranking_snapshot
+
+def synthetic_ratings(nb_teams, work_dir):
+    '''Current ratings table and ranking snapshot of the same synthetic
+    history, whose leagues play two splits of two stages each.'''
+    history = synthetic_history(nb_teams, games_per_team=10)
+    history['stageName'] = np.where(np.arange(len(history)) % 3, 'Regular Season', 'Playoffs')
+    history['stage_name'] = history['stageTournament'] + ' ' + history['stageName'] + ' 2023'
+    teams = pd.DataFrame({'team': np.arange(nb_teams), 'team_code': [f'T{team}' for team in range(nb_teams)],
+                          'team_name': [f'Team {team}' for team in range(nb_teams)]})
+    current = build_current_ratings(history, teams, output_dir=os.path.join(work_dir, 'current_ratings'))
+    snapshot_file = os.path.join(work_dir, 'ranking_snapshot.json')
+    build_ranking_snapshot(history, teams, output_filename=snapshot_file,
+                           version_filename=os.path.join(work_dir, 'version.txt'),
+                           bodies_filename=os.path.join(work_dir, 'ranking_snapshot.bodies'))
+    return current.reset_index(drop=True), snapshot_file
+
+def check_handlers(engine, snapshot_file, league_calls, stage_calls):
+    '''The engine answers every query exactly as the snapshot-backed handlers.'''
+    #snapshot_store came in with ranking_snapshot, before the path was known.
+    import snapshot_store
+    snapshot_store.snapshot_uri = snapshot_file
+    os.environ.update(RESPONSE_CACHE_SIZE='0')
+    import getGlobalRankings
+    import getTeamRankings
+    import getTournamentRanking
+
+    def body(handler, event):
+        return json.loads(handler.lambda_handler(event, None)['body'])
+
+    for league_ids, team_ids in league_calls:
+        for wanted in (team_ids, []):
+            event = {'queryStringParameters': {'tournament_id': ','.join(map(str, league_ids)),
+                                               'team_id': ','.join(map(str, wanted))}}
+            assert body(getTeamRankings, event) == {'teamRanking': engine.league_ranking(league_ids, wanted)}
+    for league_id, stage_name in stage_calls:
+        params = {} if stage_name is None else {'stage_name': stage_name}
+        leaguelabel, teams = engine.stage_ranking(league_id, stage_name)
+        assert body(getTournamentRanking, {'pathParameters': {'tournament_id': str(league_id)},
+                                           'queryStringParameters': params}) == \
+            {'tournament_id': league_id, 'stage_name': stage_name, 'leaguelabel': leaguelabel, 'teams': teams}
+    assert body(getGlobalRankings, {'queryStringParameters': {'number_of_teams': '20'}}) == {'teams': engine.top_n(20)}
+
+def pandas_top_n(df, number_of_teams):
+    top = df[df['is_global_latest']].sort_values(['rating', 'team_id'], ascending=[False, True])
+    return top.head(number_of_teams)
+
+def pandas_league_ranking(df, league_ids, team_ids):
+    league = df[df['is_split_latest'] & df['leagueid'].isin(league_ids)]
+    league = league.sort_values(['leagueid', 'rating', 'team_id'], ascending=[True, False, True])
+    league = league.assign(rank=league.groupby('leagueid').cumcount() + 1)
+    return league[league['team_id'].isin(team_ids)]
+
+def pandas_stage_ranking(df, league_id, stage_name):
+    stage = df[(df['leagueid'] == league_id) & (df['stage_name'] == stage_name)]
+    return stage.sort_values(['rating', 'team_id'], ascending=[False, True])
+
+def latency(func, calls):
+    '''Mean and 99th percentile latency in microseconds over a list of argument tuples.'''
+    timings = []
+    for args in calls:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    return timings.mean(), np.percentile(timings, 99)
+
+if __name__ == '__main__':
+    nb_teams = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as work_dir:
+        df, snapshot_file = synthetic_ratings(nb_teams, work_dir)
+
+        start = time.perf_counter()
+        engine = RankingEngine(df)
+        build_time = time.perf_counter() - start
+
+        rng = np.random.default_rng(1)
+        leagues = df['leagueid'].unique()
+        stages = df['stage_name'].unique()
+        top_calls = [(int(n),) for n in rng.integers(5, 50, 500)]
+        league_calls = [([int(league) for league in rng.choice(leagues, 3)],
+                         [int(team) for team in rng.integers(0, nb_teams, 5)]) for _ in range(500)]
+        stage_calls = [(int(rng.choice(leagues)), str(rng.choice(stages))) for _ in range(500)]
+
+        #Both paths have to agree with the handlers before the numbers mean anything.
+        check_handlers(engine, snapshot_file, league_calls[:50],
+                       stage_calls[:50] + [(league_id, None) for league_id, _ in stage_calls[:10]])
+    for league_ids, team_ids in league_calls[:50]:
+        expected = pandas_league_ranking(df, league_ids, team_ids)
+        found = [(int(team['team_id']), team['rank']) for league in engine.league_ranking(league_ids, team_ids)
+                 for team in league['team_rankings']]
+        assert found == list(zip(expected['team_id'].tolist(), expected['rank'].tolist()))
+    for league_id, stage_name in stage_calls[:50]:
+        expected = pandas_stage_ranking(df, league_id, stage_name)['team_id'].tolist()
+        assert [int(team['team_id']) for team in engine.stage_ranking(league_id, stage_name)[1]] == expected
+    assert [int(team['team_id']) for team in engine.top_n(20)] == pandas_top_n(df, 20)['team_id'].tolist()
+
+    print(f'{len(df)} current rating rows, {nb_teams} teams, engine built in {build_time * 1000:.1f} ms')
+    print(f'{"query":<16}{"engine mean":>14}{"p99":>10}{"pandas mean":>14}{"p99":>10}   (us)')
+    for name, engine_func, pandas_func, calls in [
+        ('top_n', engine.top_n, lambda n: pandas_top_n(df, n), top_calls),
+        ('league_ranking', engine.league_ranking, lambda l, t: pandas_league_ranking(df, l, t), league_calls),
+        ('stage_ranking', engine.stage_ranking, lambda l, s: pandas_stage_ranking(df, l, s), stage_calls)
+    ]:
+        engine_mean, engine_p99 = latency(engine_func, calls)
+        pandas_mean, pandas_p99 = latency(pandas_func, calls)
+        print(f'{name:<16}{engine_mean:14.1f}{engine_p99:10.1f}{pandas_mean:14.1f}{pandas_p99:10.1f}')
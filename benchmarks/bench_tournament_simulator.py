@@ -0,0 +1,128 @@
+'''
+Monte Carlo odds of a Worlds-sized event (four double round robin groups of
+four, Bo1, then an eight-team Bo5 bracket), two ways:
+- loop: one simulation at a time, match by match, in plain Python
+- arrays: Tournament.simulate, every simulation at once, then split over
+  worker processes
+Title odds must agree within Monte Carlo error. The event is synthetic, in
+the stages/sections/matches layout of tournaments-cleaned.json, with its
+first group games already played.
+
+Run from the repository root: python benchmarks/bench_tournament_simulator.py [nb_sims]
+'''
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+from tournament_simulator import build_tournament, cross_seeding
+
+def match(match_id, team_a, team_b, best_of, winner=None):
+    teams = []
+    for team_id in (team_a, team_b):
+        outcome = None if winner is None else ('win' if winner == team_id else 'loss')
+        teams.append({'id': str(team_id) if team_id else '0', 'code': 'TBD' if not team_id else f'T{team_id}',
+                      'result': {'outcome': outcome}})
+    return {'id': str(match_id), 'state': 'unstarted' if winner is None else 'completed',
+            'strategy': {'type': 'bestOf', 'count': best_of}, 'teams': teams}
+
+def synthetic_worlds(seed=0, nb_played=8):
+    '''Tournament record and ratings: 16 teams rated around 1500, the first
+    <nb_played> group games already won by the better rated team.'''
+    rng = np.random.default_rng(seed)
+    team_ids = list(range(100, 116))
+    ratings = dict(zip(team_ids, rng.normal(1500, 120, len(team_ids)).tolist()))
+    sections = []
+    match_id = 0
+    for group in range(4):
+        teams = team_ids[group * 4:(group + 1) * 4]
+        matches = []
+        for leg in range(2):
+            for i in range(4):
+                for j in range(i + 1, 4):
+                    team_a, team_b = (teams[i], teams[j]) if leg == 0 else (teams[j], teams[i])
+                    winner = max(team_a, team_b, key=ratings.get) if match_id < nb_played else None
+                    matches.append(match(match_id, team_a, team_b, 1, winner))
+                    match_id += 1
+        sections.append({'name': f'Group {"ABCD"[group]}', 'matches': matches})
+    bracket = [{'name': name, 'matches': [match(match_id + k, None, None, 5) for k in range(size)]}
+               for name, size in [('Quarterfinals', 4), ('Semifinals', 2), ('Final', 1)]]
+    tournament = {'id': 1, 'slug': 'worlds_synthetic', 'stages': [
+        {'name': 'Groups', 'sections': sections},
+        {'name': 'Knockouts', 'sections': bracket}]}
+    return tournament, ratings
+
+def series_win(p, best_of):
+    wins = losses = 0
+    while wins <= best_of // 2 and losses <= best_of // 2:
+        if random.random() < p:
+            wins += 1
+        else:
+            losses += 1
+    return wins > losses
+
+def loop_simulation(tournament_data, ratings, nb_sims, seed=0):
+    '''Title counts, one simulation and one game at a time.'''
+    random.seed(seed)
+    groups_stage, knockouts = tournament_data['stages']
+    seeding = cross_seeding(4, 2)
+    titles = {}
+    for _ in range(nb_sims):
+        qualifiers = []
+        for section in groups_stage['sections']:
+            wins = {}
+            for group_match in section['matches']:
+                team_a, team_b = (int(team['id']) for team in group_match['teams'])
+                wins.setdefault(team_a, 0)
+                wins.setdefault(team_b, 0)
+                outcome = group_match['teams'][0]['result']['outcome']
+                if outcome is None:
+                    p = 1 / (10 ** (-(ratings[team_a] - ratings[team_b]) / 400) + 1)
+                    a_won = random.random() < p
+                else:
+                    a_won = outcome == 'win'
+                wins[team_a if a_won else team_b] += 1
+            standings = sorted(wins, key=lambda team_id: (wins[team_id], random.random()), reverse=True)
+            qualifiers += standings[:2]
+        slots = [qualifiers[position] for position in seeding]
+        while len(slots) > 1:
+            slots = [team_a if series_win(1 / (10 ** (-(ratings[team_a] - ratings[team_b]) / 400) + 1), 5) else team_b
+                     for team_a, team_b in zip(slots[0::2], slots[1::2])]
+        titles[slots[0]] = titles.get(slots[0], 0) + 1
+    return titles
+
+def main(nb_sims=100_000):
+    tournament_data, ratings = synthetic_worlds()
+    tournament = build_tournament(tournament_data, ratings)
+    print(f'{len(tournament.team_ids)} teams, stages: {[stage.name for stage in tournament.stages]}')
+
+    nb_loop = max(nb_sims // 20, 1000)
+    start = time.perf_counter()
+    titles = loop_simulation(tournament_data, ratings, nb_loop)
+    loop_time = time.perf_counter() - start
+    print(f'loop:   {nb_loop} simulations in {loop_time:.2f}s '
+          f'({loop_time * nb_sims / nb_loop:.1f}s for {nb_sims} extrapolated)')
+
+    start = time.perf_counter()
+    odds = tournament.simulate(nb_sims, seed=0)
+    array_time = time.perf_counter() - start
+    print(f'arrays: {nb_sims} simulations in {array_time:.2f}s ({loop_time * nb_sims / nb_loop / array_time:.0f}x)')
+
+    processes = max(2, min(os.cpu_count() or 1, 4))
+    start = time.perf_counter()
+    parallel_odds = tournament.simulate(nb_sims, seed=0, processes=processes)
+    print(f'arrays, {processes} processes: {nb_sims} simulations in {time.perf_counter() - start:.2f}s')
+
+    loop_odds = np.array([titles.get(team_id, 0) / nb_loop for team_id in odds['team_id']])
+    #Four standard errors of the loop's smaller sample.
+    tolerance = 4 * np.sqrt(np.maximum(odds['title'], 1e-3) * (1 - odds['title']) / nb_loop)
+    assert (np.abs(odds['title'] - loop_odds) <= tolerance).all(), 'title odds differ'
+    assert np.allclose(odds['title'].sum(), 1) and np.allclose(parallel_odds['title'].sum(), 1)
+    assert np.allclose(odds['Groups'].sum(), 8) and np.allclose(odds['Knockouts Semifinals'].sum(), 4)
+    print(odds.head(8).to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -5,8 +5,13 @@ import shutil
 import time
 import os
 from io import BytesIO
+import numpy as np
 import pandas as pd
 import datetime as dt
+from player_stats import player_rows, write_player_stats
+from draft_index import draft_rows, write_draft_table
+from tower_timeline import (EVENT_SLOTS, NEVER_FELL, NEXUS2_OFFSET, SIDE_OFFSETS, TOWER_COLUMNS, TOWER_SLOTS,
+                            tower_timers)
 
 file_error_raised = False
 
@@ -296,30 +301,8 @@ def extract_datapoints_from_game(game_json):
     dragon_type_count = {'blue':{}, 'red':{}}
     baron_count = [0, 0] #blue, red
     tower_count = [0, 0] #blue, red
-    tower_log = {
-        'OuterTopBlueTimer': None,
-        'OuterMidBlueTimer': None,
-        'OuterBotBlueTimer': None,
-        'InnerTopBlueTimer': None,
-        'InnerMidBlueTimer': None,
-        'InnerBotBlueTimer': None,
-        'BaseTopBlueTimer': None,
-        'BaseMidBlueTimer': None,
-        'BaseBotBlueTimer': None,
-        'Nexus1MidBlueTimer': None,
-        'Nexus2MidBlueTimer': None,
-        'OuterTopRedTimer': None,
-        'OuterMidRedTimer': None,
-        'OuterBotRedTimer': None,
-        'InnerTopRedTimer': None,
-        'InnerMidRedTimer': None,
-        'InnerBotRedTimer': None,
-        'BaseTopRedTimer': None,
-        'BaseMidRedTimer': None,
-        'BaseBotRedTimer': None,
-        'Nexus1MidRedTimer': None,
-        'Nexus2MidRedTimer': None
-    } #Time values for each event
+    #When each turret fell (ms), one slot per turret (see tower_timeline.py)
+    tower_times = np.full(len(TOWER_COLUMNS), NEVER_FELL, dtype=np.int32)
     team_side = None
 
     smaller_camps = ['blueCamp','redCamp','gromp','wolf','krug','raptor']
@@ -483,17 +466,15 @@ def extract_datapoints_from_game(game_json):
                 building_type = game_event.get('buildingType')
 
                 if building_type == 'turret' and team_side is not None:
-                    building_lane = game_event.get('lane').title()
-                    building_tier = game_event.get('turretTier').title()
-
-                    if building_tier == 'Nexus':
-                        if tower_log.get(f'{building_tier}1{building_lane}{team_side.title()}Timer',None) is not None:
-                            building_tier = 'Nexus2'
-                        else:
-                            building_tier = 'Nexus1'
-
-                    tower_log.update({f'{building_tier}{building_lane}{team_side.title()}Timer':
-                                    game_event.get('gameTime')})
+                    tower_slot = EVENT_SLOTS.get((game_event.get('turretTier').lower(), game_event.get('lane').lower()))
+                    side_offset = SIDE_OFFSETS.get(team_side.lower())
+
+                    if tower_slot is not None and side_offset is not None:
+                        tower_slot += side_offset
+                        #Both nexus turrets are logged as 'nexus': the second one is Nexus2.
+                        if TOWER_SLOTS[tower_slot][0] == 'Nexus1' and tower_times[tower_slot] != NEVER_FELL:
+                            tower_slot += NEXUS2_OFFSET
+                        tower_times[tower_slot] = round(game_event.get('gameTime') * 1000)
                     tower_count = add_event_to_counter(tower_count, None, team_side,
                                                         None, None)[0]
             except:
@@ -547,7 +528,7 @@ def extract_datapoints_from_game(game_json):
         'NbPlatesRed': plates_taken[1]
     })
 
-    dict_stats.update(tower_log)
+    dict_stats.update(tower_timers(tower_times))
     dict_stats.update(dragon_soul)
     dict_stats.update(game_state_10)
     dict_stats.update(game_state_15)
@@ -560,6 +541,8 @@ def build_csv():
     games_dir = 'games'
     cleaned_files = os.listdir(games_dir)
     total_data = []
+    player_data = []
+    draft_data = []
     global file_error_raised
 
     for cleaned_game in cleaned_files:
@@ -570,12 +553,18 @@ def build_csv():
                 file_error_raised = False
             #try:
             total_data.append(extract_datapoints_from_game(game_data))
+            #Same pass: the player-level rows and the draft, which the team
+            #columns leave out.
+            player_data.extend(player_rows(game_data))
+            draft_data.extend(draft_rows(game_data))
             #except:
                 #print(f'Missing values on {games_dir}/{cleaned_game}')
                 #continue
 
     df_data = pd.DataFrame(total_data)
     df_data.to_csv(path_or_buf='hackathon-riot-data.csv',sep=';',index=False)
+    write_player_stats(player_data)
+    write_draft_table(draft_data)
 
 def map_all_games():
     with open("esports-data/tournaments-cleaned.json", "r") as json_file:
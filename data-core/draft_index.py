@@ -0,0 +1,198 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+#Champion draft of every game (bans and picks, in draft order when the game
+#logged its champ_select), and pick/ban/win counts per patch, league and
+#champion kept as dense [patch, league, champion] matrices, so that a
+#patch's draft statistics are array lookups.
+DRAFT_TABLE = 'draft-table.csv'
+DRAFT_INDEX = 'draft_index.npz'
+DRAFT_COLUMNS = ['esportsPlatformId', 'gameVersion', 'side', 'action', 'order',
+                 'championID', 'championName', 'participantID', 'win']
+
+def patch_of(game_version):
+    '''13.4.487.9012 -> 13.4, as the crush score groups games.'''
+    return '.'.join(str(game_version).split('.')[:2]) if game_version else ''
+
+def draft_rows(game_json):
+    '''
+    Bans and picks of one cleaned game. <order> is the place of the action in
+    the draft, from the draftOrder extract_useful_data records; files cleaned
+    before it only give their bans in list order, and picks get -1. Games
+    without champ_select still get their picks from game_info.
+    '''
+    header = {}
+    champ_select = None
+    champion_names = {}
+    for game_event in game_json:
+        event_type = game_event.get('eventType')
+        if event_type is None:
+            header = game_event
+        elif event_type == 'champ_select':
+            champ_select = game_event
+        elif event_type == 'game_info':
+            for side in ['blue', 'red']:
+                for player in game_event.get(side) or []:
+                    champion_names[player.get('participantID')] = (side, player.get('championName'))
+
+    if champ_select is None:
+        actions = [{'action': 'pick', 'team': side, 'championID': None, 'participantID': participant_id}
+                   for participant_id, (side, _) in sorted(champion_names.items(), key=lambda item: item[0] or 0)]
+        ordered = False
+    elif champ_select.get('draftOrder') is not None:
+        actions = champ_select['draftOrder']
+        ordered = True
+    else:
+        actions = [{'action': 'ban', 'team': ban.get('team'), 'championID': ban.get('championID'),
+                    'participantID': None} for ban in champ_select.get('bannedChampions') or []]
+        actions += [{'action': 'pick', 'team': side, 'championID': player.get('championID'),
+                     'participantID': player.get('participantID')}
+                    for side, team_data in [('blue', 'teamOne'), ('red', 'teamTwo')]
+                    for player in champ_select.get(team_data) or []]
+        ordered = False
+
+    winner = game_json[-1].get('winningTeam') if game_json else None
+    rows = []
+    for position, action in enumerate(actions):
+        is_pick = action['action'] == 'pick'
+        rows.append({
+            'esportsPlatformId': header.get('esportsPlatformId'),
+            'gameVersion': header.get('gameVersion'),
+            'side': action.get('team'),
+            'action': action['action'],
+            'order': position if ordered or not is_pick else -1,
+            'championID': action.get('championID') or -1,
+            'championName': champion_names.get(action.get('participantID'), (None, None))[1] if is_pick else None,
+            'participantID': action.get('participantID'),
+            'win': winner is not None and winner == action.get('team'),
+        })
+    return rows
+
+def write_draft_table(rows, filename=DRAFT_TABLE):
+    df = pd.DataFrame(rows, columns=DRAFT_COLUMNS)
+    df.to_csv(path_or_buf=filename, sep=';', index=False)
+    return df
+
+def load_game_leagues(directory="esports-data"):
+    '''platformGameId -> leagueId, from game-list.json (prepare_esports_metadata).'''
+    with open(f"{directory}/game-list.json", "r") as json_file:
+        return {game['platformGameId']: game['leagueId'] for game in json.load(json_file)
+                if game.get('platformGameId')}
+
+def champion_keys(draft):
+    '''
+    Champion name of every row. Bans only carry a championID: they take the
+    name that id is most often picked under, or '#<id>' if it never was.
+    '''
+    picks = draft[(draft['action'] == 'pick') & draft['championName'].notna() & (draft['championID'] != -1)]
+    id_names = picks.groupby('championID')['championName'].agg(lambda names: names.value_counts().index[0])
+    by_id = draft['championID'].map(id_names)
+    fallback = '#' + draft['championID'].astype(str)
+    return draft['championName'].fillna(by_id).fillna(fallback)
+
+class DraftIndex:
+    '''
+    Counts per [patch, league, champion]: picks, bans and wins (games won
+    when picked), with games per [patch, league]. Leagues are leagueIds, -1
+    for games the game list does not know.
+    '''
+
+    def __init__(self, patches, leagues, champions, picks, bans, wins, games):
+        self.patches = list(patches)
+        self.leagues = list(leagues)
+        self.champions = list(champions)
+        self.picks = picks
+        self.bans = bans
+        self.wins = wins
+        self.games = games
+        self.patch_codes = {patch: code for code, patch in enumerate(self.patches)}
+        self.league_codes = {league: code for code, league in enumerate(self.leagues)}
+        self.champion_codes = {champion: code for code, champion in enumerate(self.champions)}
+
+    def save(self, filename=DRAFT_INDEX):
+        np.savez(filename, patches=np.array(self.patches, dtype=str), leagues=np.array(self.leagues, dtype=np.int64),
+                 champions=np.array(self.champions, dtype=str), picks=self.picks, bans=self.bans,
+                 wins=self.wins, games=self.games)
+
+    @classmethod
+    def load(cls, filename=DRAFT_INDEX):
+        with np.load(filename) as arrays:
+            return cls([str(patch) for patch in arrays['patches']], [int(league) for league in arrays['leagues']],
+                       [str(champion) for champion in arrays['champions']], arrays['picks'], arrays['bans'],
+                       arrays['wins'], arrays['games'])
+
+    def counts(self, patch, league=None):
+        '''(picks, bans, wins) per champion and the number of games, for a
+        patch in one league or in all of them.'''
+        patch_code = self.patch_codes[patch]
+        if league is None:
+            return (self.picks[patch_code].sum(axis=0), self.bans[patch_code].sum(axis=0),
+                    self.wins[patch_code].sum(axis=0), self.games[patch_code].sum())
+        league_code = self.league_codes[league]
+        return (self.picks[patch_code, league_code], self.bans[patch_code, league_code],
+                self.wins[patch_code, league_code], self.games[patch_code, league_code])
+
+    def patch_table(self, patch, league=None):
+        '''Every champion drafted on a patch, with its rates, most present first.'''
+        picks, bans, wins, games = self.counts(patch, league)
+        df = pd.DataFrame({'champion': self.champions, 'picks': picks, 'bans': bans, 'wins': wins})
+        df = df[(df['picks'] > 0) | (df['bans'] > 0)]
+        df['pick_rate'] = df['picks'] / games
+        df['ban_rate'] = df['bans'] / games
+        df['presence'] = df['pick_rate'] + df['ban_rate']
+        df['win_rate'] = df['wins'] / df['picks'].where(df['picks'] > 0)
+        return df.sort_values(['presence', 'champion'], ascending=[False, True]).reset_index(drop=True)
+
+    def champion_stats(self, champion, patch, league=None):
+        picks, bans, wins, games = self.counts(patch, league)
+        code = self.champion_codes[champion]
+        return {
+            'games': int(games),
+            'picks': int(picks[code]),
+            'bans': int(bans[code]),
+            'wins': int(wins[code]),
+            'pick_rate': picks[code] / games if games else np.nan,
+            'ban_rate': bans[code] / games if games else np.nan,
+            'win_rate': wins[code] / picks[code] if picks[code] else np.nan,
+        }
+
+def build_draft_index(draft, game_leagues=None):
+    '''DraftIndex of a draft table (write_draft_table's output), counted with
+    one np.add.at per matrix.'''
+    game_leagues = game_leagues or {}
+    draft = draft.copy()
+    draft['champion'] = champion_keys(draft)
+    draft['patch'] = draft['gameVersion'].map(patch_of)
+    draft['league'] = draft['esportsPlatformId'].map(game_leagues).fillna(-1).astype(np.int64)
+
+    patch_codes, patches = pd.factorize(draft['patch'], sort=True)
+    league_codes, leagues = pd.factorize(draft['league'], sort=True)
+    champion_codes, champions = pd.factorize(draft['champion'], sort=True)
+    shape = (len(patches), len(leagues), len(champions))
+
+    is_pick = (draft['action'] == 'pick').to_numpy()
+    is_ban = (draft['action'] == 'ban').to_numpy()
+    won = draft['win'].to_numpy(dtype=bool)
+    picks = np.zeros(shape, dtype=np.int32)
+    bans = np.zeros(shape, dtype=np.int32)
+    wins = np.zeros(shape, dtype=np.int32)
+    np.add.at(picks, (patch_codes[is_pick], league_codes[is_pick], champion_codes[is_pick]), 1)
+    np.add.at(bans, (patch_codes[is_ban], league_codes[is_ban], champion_codes[is_ban]), 1)
+    np.add.at(wins, (patch_codes[is_pick & won], league_codes[is_pick & won], champion_codes[is_pick & won]), 1)
+
+    games = np.zeros(shape[:2], dtype=np.int32)
+    first_rows = ~draft.duplicated('esportsPlatformId').to_numpy()
+    np.add.at(games, (patch_codes[first_rows], league_codes[first_rows]), 1)
+    return DraftIndex(patches, leagues, champions, picks, bans, wins, games)
+
+if __name__ == '__main__':
+    #python draft_index.py, after build_csv wrote draft-table.csv
+    draft = pd.read_csv(DRAFT_TABLE, sep=';')
+    game_leagues = load_game_leagues() if os.path.isfile('esports-data/game-list.json') else None
+    draft_index = build_draft_index(draft, game_leagues)
+    draft_index.save()
+    print(f'{len(draft_index.patches)} patches, {len(draft_index.leagues)} leagues, '
+          f'{len(draft_index.champions)} champions written to {DRAFT_INDEX}')
@@ -0,0 +1,293 @@
+import datetime as dt
+import glob
+import json
+import os
+
+import numpy as np
+
+#Every cleaned game (see extract_useful_data) packed into one array of events,
+#stored CSR style: the events of game i are events[offsets[i]:offsets[i+1]].
+#The events are written to a raw file and memory-mapped back, so whole-history
+#aggregates become array operations instead of json.load() calls on tens of
+#thousands of files.
+ARENA_DIR = 'event_arena'
+EVENTS_FILE = 'events.bin'
+OFFSETS_FILE = 'offsets.npy'
+GAMES_FILE = 'games.npy'
+HEADER_FILE = 'arena.json'
+
+#Text fields are stored as small integer codes (-1 = missing). The lists are
+#seeded so that codes stay the same from one build to the next; values never
+#seen before are appended, and the full lists are saved with the arena.
+VOCABULARIES = {
+    'event_type': ['game_info', 'champ_select', 'building_destroyed', 'turret_plate_destroyed',
+                   'epic_monster_kill', 'ward_placed', 'ward_killed', 'champion_kill',
+                   'champion_kill_special', 'champion_level_up', 'queued_dragon_info',
+                   'game_state_10mn', 'game_state_15mn', 'game_state_end', 'game_end'],
+    #queued_dragon_info events store their nextDragonName here as well.
+    'monster': ['dragon', 'baron', 'riftHerald', 'scuttleCrab', 'blueCamp', 'redCamp',
+                'gromp', 'wolf', 'krug', 'raptor', 'air', 'earth', 'fire', 'water',
+                'chemtech', 'hextech', 'elder'],
+    'lane': ['top', 'mid', 'bot'],
+    'tier': ['outer', 'inner', 'base', 'nexus'],
+    'building': ['turret', 'inhibitor'],
+    'ward': ['yellowTrinket', 'control', 'sight', 'blueTrinket', 'teemoMushroom', 'unknown'],
+}
+
+#Same spellings add_event_to_counter accepts. 0 = blue, 1 = red, -1 = no team.
+SIDES = {'blue': 0, 'Blue': 0, '100': 0, 'red': 1, 'Red': 1, '200': 1}
+BLUE, RED, NO_SIDE = 0, 1, -1
+
+#Bits of the flags field
+IN_ENEMY_JUNGLE = 1
+
+EVENT_DTYPE = np.dtype([
+    ('game', np.int32),          #index of the game in the arena
+    ('event_type', np.int16),
+    ('game_time', np.float64),   #seconds since game_info
+    ('team', np.int8),           #team, or killerTeam on champion kills
+    ('victim_team', np.int8),
+    ('participant', np.int8),    #killer, or placer on ward_placed (0 = none)
+    ('nb_assists', np.int8),
+    ('monster', np.int16),
+    ('lane', np.int8),
+    ('tier', np.int8),
+    ('building', np.int8),
+    ('ward', np.int8),
+    ('flags', np.uint8),
+    ('x', np.float32),           #position, NaN when the event has none
+    ('z', np.float32),
+])
+
+GAME_DTYPE = np.dtype([
+    ('platform_id', 'U48'),
+    ('game_date', 'datetime64[s]'),  #UTC
+    ('game_version', 'U32'),
+    ('duration', np.float64),        #gameTime of the last event
+    ('winner', np.int8),
+    ('sides', np.int8, (11,)),       #side of participants 1 to 10, from game_info
+])
+
+def side_code(team):
+    return SIDES.get(team, NO_SIDE) if team is not None else NO_SIDE
+
+def read_game(filename):
+    '''
+    Reads one cleaned game into a game record and a list of raw event rows
+    (text fields not encoded yet), in file order. Safe to run in worker
+    processes: only plain values come back.
+    '''
+    with open(filename, 'r') as game_file:
+        game_json = json.load(game_file)
+
+    platform_id = os.path.basename(filename).replace('-cleaned.json', '').replace('_', ':')
+    game_date = None
+    game_version = ''
+    sides = [NO_SIDE] * 11
+    rows = []
+
+    for game_event in game_json:
+        event_type = game_event.get('eventType')
+
+        #The header written by extract_useful_data
+        if event_type is None:
+            if game_event.get('esportsPlatformId'):
+                platform_id = game_event['esportsPlatformId']
+            game_version = game_event.get('gameVersion') or ''
+            if game_event.get('gameDate'):
+                game_date = dt.datetime.fromisoformat(game_event['gameDate']).astimezone(dt.timezone.utc)
+            continue
+
+        #As in extract_datapoints_from_game, the last game_info wins.
+        if event_type == 'game_info':
+            sides = [NO_SIDE] * 11
+            for side, side_name in [(BLUE, 'blue'), (RED, 'red')]:
+                for player in game_event.get(side_name) or []:
+                    participant = player.get('participantID')
+                    if isinstance(participant, int) and 0 < participant < 11:
+                        sides[participant] = side
+
+        if event_type == 'champion_kill':
+            team = game_event.get('killerTeam')
+        else:
+            team = game_event.get('team')
+        participant = game_event.get('placer') if event_type == 'ward_placed' else game_event.get('killer')
+        monster = game_event.get('nextDragonName') if event_type == 'queued_dragon_info' else game_event.get('monsterType')
+        position = game_event.get('position') or {}
+
+        rows.append((
+            event_type,
+            game_event.get('gameTime'),
+            side_code(team),
+            side_code(game_event.get('victimTeam')),
+            participant if isinstance(participant, int) and 0 < participant < 11 else 0,
+            len(game_event.get('assistants') or []),
+            monster,
+            game_event.get('lane'),
+            game_event.get('turretTier'),
+            game_event.get('buildingType'),
+            game_event.get('wardType'),
+            IN_ENEMY_JUNGLE if game_event.get('inEnemyJungle') else 0,
+            position.get('x', np.nan),
+            position.get('z', np.nan),
+        ))
+
+    last_event = game_json[-1] if game_json else {}
+    duration = last_event.get('gameTime')
+    game = (
+        platform_id,
+        np.datetime64(game_date.replace(tzinfo=None), 's') if game_date else np.datetime64('NaT'),
+        game_version,
+        np.nan if duration is None else duration,
+        side_code(last_event.get('winningTeam')),
+        sides,
+    )
+    return game, rows
+
+class Vocabulary:
+    '''Text value <-> code, growing as new values are met.'''
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def encode_events(game_index, rows, vocabularies):
+    events = np.empty(len(rows), dtype=EVENT_DTYPE)
+    if not rows:
+        return events
+    columns = list(zip(*rows))
+    coded = {0: 'event_type', 6: 'monster', 7: 'lane', 8: 'tier', 9: 'building', 10: 'ward'}
+    for position, field in enumerate(EVENT_DTYPE.names[1:]):
+        if position in coded:
+            vocabulary = vocabularies[coded[position]]
+            events[field] = [vocabulary.code(value) for value in columns[position]]
+        elif field == 'game_time':
+            events[field] = [np.nan if value is None else value for value in columns[position]]
+        else:
+            events[field] = columns[position]
+    events['game'] = game_index
+    return events
+
+def cleaned_game_files(directory="games"):
+    return sorted(glob.glob(os.path.join(directory, '*-cleaned.json')))
+
+def build_event_arena(directory="games", output_dir=ARENA_DIR, executor=None):
+    '''
+    Packs every <directory>/*-cleaned.json into <output_dir>. Files are read
+    by <executor> if one is given (anything with a map() method, as for
+    run_work_queue), and events are streamed to disk game by game, so memory
+    use does not grow with the history. Returns the number of games packed.
+    '''
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = cleaned_game_files(directory)
+    mapper = map if executor is None else executor.map
+    vocabularies = {name: Vocabulary(values) for name, values in VOCABULARIES.items()}
+    offsets = [0]
+    games = []
+
+    with open(os.path.join(output_dir, EVENTS_FILE), 'wb') as events_file:
+        for game_index, (game, rows) in enumerate(mapper(read_game, filenames)):
+            encode_events(game_index, rows, vocabularies).tofile(events_file)
+            offsets.append(offsets[-1] + len(rows))
+            games.append(game)
+
+    np.save(os.path.join(output_dir, OFFSETS_FILE), np.array(offsets, dtype=np.int64))
+    np.save(os.path.join(output_dir, GAMES_FILE), np.array(games, dtype=GAME_DTYPE))
+    #Written last: an arena without its header is an unfinished build.
+    with open(os.path.join(output_dir, HEADER_FILE), 'w') as header_file:
+        json.dump({
+            'nb_games': len(games),
+            'nb_events': offsets[-1],
+            'event_dtype': EVENT_DTYPE.descr,
+            'vocabularies': {name: vocabulary.values for name, vocabulary in vocabularies.items()}
+        }, header_file)
+    return len(games)
+
+class EventArena:
+    '''
+    Read-only view over a built arena:
+    - events: memory-mapped EVENT_DTYPE array of every event of every game
+    - offsets: events of game i are events[offsets[i]:offsets[i+1]]
+    - games: GAME_DTYPE array, one record per game
+    '''
+
+    def __init__(self, events, offsets, games, vocabularies):
+        self.events = events
+        self.offsets = offsets
+        self.games = games
+        self.vocabularies = vocabularies
+        self._game_index = None
+
+    def __len__(self):
+        return len(self.games)
+
+    def code(self, field, value):
+        '''Code of a text value in one of the vocabularies, -1 if never seen.'''
+        try:
+            return self.vocabularies[field].index(value)
+        except ValueError:
+            return -1
+
+    def decode(self, field, codes):
+        values = np.array(self.vocabularies[field] + [None], dtype=object)
+        return values[np.asarray(codes)]
+
+    def game_index(self, platform_id):
+        if self._game_index is None:
+            self._game_index = {platform_id: i for i, platform_id in enumerate(self.games['platform_id'])}
+        return self._game_index[platform_id]
+
+    def game(self, game):
+        '''Events of one game, by index or platform game id (a view, no copy).'''
+        if isinstance(game, str):
+            game = self.game_index(game)
+        return self.events[self.offsets[game]:self.offsets[game + 1]]
+
+    def game_ids(self):
+        '''Game index of every event, recomputed from the offsets.'''
+        return np.repeat(np.arange(len(self.games), dtype=np.int32), np.diff(self.offsets))
+
+    def filter(self, event_type, games=None):
+        '''
+        Events of one or several types (names or codes) across all games, or
+        across the given game indexes. The game field tells where each came from.
+        '''
+        event_types = [event_type] if isinstance(event_type, (str, int)) else event_type
+        codes = [self.code('event_type', value) if isinstance(value, str) else value for value in event_types]
+        if games is None:
+            events = self.events
+        else:
+            events = np.concatenate([self.game(game) for game in games]) if len(games) else self.events[:0]
+        return events[np.isin(events['event_type'], codes)]
+
+def load_event_arena(output_dir=ARENA_DIR):
+    with open(os.path.join(output_dir, HEADER_FILE), 'r') as header_file:
+        header = json.load(header_file)
+    event_dtype = np.dtype([tuple(field) for field in header['event_dtype']])
+    if header['nb_events']:
+        events = np.memmap(os.path.join(output_dir, EVENTS_FILE), dtype=event_dtype, mode='r',
+                           shape=(header['nb_events'],))
+    else:
+        events = np.empty(0, dtype=event_dtype)
+    return EventArena(events,
+                      np.load(os.path.join(output_dir, OFFSETS_FILE)),
+                      np.load(os.path.join(output_dir, GAMES_FILE)),
+                      header['vocabularies'])
+
+if __name__ == '__main__':
+    #python event_arena.py [games dir] [arena dir]
+    import sys
+    import time
+    start = time.perf_counter()
+    nb_games = build_event_arena(*sys.argv[1:3])
+    arena = load_event_arena(sys.argv[2] if len(sys.argv) > 2 else ARENA_DIR)
+    print(f'{nb_games} games, {len(arena.events)} events packed in {time.perf_counter() - start:.1f} s')
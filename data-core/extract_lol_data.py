@@ -5,28 +5,36 @@ import shutil
 import time
 import os
 from io import BytesIO
-import pandas as pd
 import datetime as dt
+from pipeline_metrics import PipelineMetrics, MetricsLog, format_summary
 
 S3_BUCKET_URL = "https://power-rankings-dataset-gprhack.s3.us-west-2.amazonaws.com"
 
-def download_gzip_and_write_to_json(file_name):
+def download_gzip_and_write_to_json(file_name, metrics=None, local_file_name=None):
    '''
    We download the gzip with the corresponding <file_name>
    and write its contents in a JSON format. Taken from Riot's supplied code.
+   The JSON goes to <local_file_name>.json, <file_name> with ':' replaced by
+   '_' unless given.
+   Download and decompression times and sizes go to <metrics> if provided.
    '''
-   local_file_name = file_name.replace(":", "_")
+   metrics = metrics if metrics is not None else PipelineMetrics()
+   if local_file_name is None:
+       local_file_name = file_name.replace(":", "_")
    # If file already exists locally do not re-download game
    if os.path.isfile(f"{local_file_name}.json"):
        return
 
-   response = requests.get(f"{S3_BUCKET_URL}/{file_name}.json.gz")
+   with metrics.stage('download'):
+       response = requests.get(f"{S3_BUCKET_URL}/{file_name}.json.gz")
    if response.status_code == 200:
+       metrics.add('bytes_in', len(response.content))
        try:
            gzip_bytes = BytesIO(response.content)
-           with gzip.GzipFile(fileobj=gzip_bytes, mode="rb") as gzipped_file:
+           with metrics.stage('decompress'), gzip.GzipFile(fileobj=gzip_bytes, mode="rb") as gzipped_file:
                with open(f"{local_file_name}.json", 'wb') as output_file:
                    shutil.copyfileobj(gzipped_file, output_file)
+                   metrics.add('bytes_decompressed', output_file.tell())
                print(f"{file_name}.json written")
        except Exception as e:
            print("Error:", e)
@@ -45,61 +53,128 @@ def download_esports_files():
    for file_name in esports_data_files:
        download_gzip_and_write_to_json(f"{directory}/{file_name}")
 
-def filter_leagues():
+#TFT and All-Star events sit in leagues.json but aren't competitive LoL.
+LEAGUES_TO_DROP = {98767991295297328, 108001239847565216}
+LEAGUE_FIELDS_TO_DROP = ['displayPriority','image','sport','lightImage','darkImage','slug']
+
+#Although the OPL tournaments are no longer "relevant," they would be
+#extremely useful when analyzing data from 2020 given its Worlds status
+#at the time. LCO takes over where the OPL left (continuity)
+OPL_TOURNAMENTS = {104151038596540368, 103535401218775280}
+
+def as_int(value):
+    '''Riot's files store ids as strings. The cleaned files have always carried
+    them as integers (pandas used to convert them for us), so we keep doing so.'''
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+def filter_leagues(leagues_data):
     '''
-    This function pre-emptively cleans the leagues.json file if it has just been
-    downloaded, or if we have deleted it before a restart.
+    Clears TFT and All-Star tournaments from our leagues, and drops the fields
+    that we do not need.
     '''
-    #If we haven't pre-cleaned things:
-    if not os.path.isfile('esports-data/leagues-cleaned.json'):
-        leagues_df = pd.read_json('esports-data/leagues.json')
-        #Clear TFT and All-Star tournaments from our leagues
-        try:
-            drop_these = leagues_df[(leagues_df.id == 98767991295297328) |
-                                          (leagues_df.id == 108001239847565216)]
-            leagues_df.drop(axis=0, labels=drop_these.index, inplace=True)
-        except:
-            print('We have already cleared the rows related to All-Star and TFT.')
-        #Drop extraneous columns
-        try:
-            leagues_df.drop(axis=1, columns=['displayPriority','image','sport',
-                                            'lightImage','darkImage','slug'],
-                            inplace=True)
-        except:
-            print('We have already cleared the columns that we did not need.')
-        leagues_df.to_json('esports-data/leagues-cleaned.json')
-
-def filter_tournaments():
+    cleaned_leagues = []
+    for league in leagues_data:
+        league_id = as_int(league.get('id'))
+        if league_id in LEAGUES_TO_DROP:
+            continue
+        cleaned_league = {key: value for key, value in league.items()
+                          if key not in LEAGUE_FIELDS_TO_DROP}
+        cleaned_league['id'] = league_id
+        cleaned_leagues.append(cleaned_league)
+    return cleaned_leagues
+
+def filter_tournaments(tournaments_data, leagues_data):
     '''
-    This function pre-emptively cleans the tournaments.json file if it has just
-    been downloaded, or if we have deleted it before a restart.
-    It will always run after filter_leagues.
+    We take a look at the Regional League codes and keep only the tournaments
+    that fit those competitions (plus the OPL ones). Because tournament IDs don't
+    carry over metadata tables, we have to do it this way for now.
+    We will sort tournaments from latest to earliest.
+    It will always run after filter_leagues, on its output.
     '''
-    if not os.path.isfile('esports-data/tournaments-cleaned.json'):
-        leagues_df = pd.read_json('esports-data/leagues.json')
-        tournaments_df = pd.read_json('esports-data/tournaments.json')
-        # We take a look at the Regional League codes and keep only the
-        # tournaments that fit those competitions. Because tournament IDs don't
-        # carry over metadata tables, we have to do it this way for now.
-        # We will sort tournaments from latest to earliest.
-        tournaments_df = pd.read_json('esports-data/tournaments.json')
-        leagues_df = leagues_df[['id','name']].rename(columns={'id':'leagueId',
-                                                        'name':'leagueName'})
-        clean_trs_df = pd.merge(tournaments_df,leagues_df,how='inner',on='leagueId')
-
-        # Although the OPL tournaments are no longer "relevant," they would be
-        # extremely useful when analyzing data from 2020 given its Worlds status
-        # at the time.
-        opl_df = tournaments_df[(tournaments_df['id'] == 104151038596540368)
-                                | (tournaments_df['id'] == 103535401218775280)].copy()
-        # LCO takes over where the OPL left (continuity)
-        opl_df.loc[:,'leagueName'] = 'LCO'
-
-        # Let there be koalas.
-        full_df = pd.concat([clean_trs_df,opl_df])
-        full_df.sort_values(by='startDate',ascending=False,inplace=True)
-        full_df.reset_index(drop=True,inplace=True)
-        full_df.to_json('esports-data/tournaments-cleaned.json', orient="records")
+    league_names = {league['id']: league.get('name') for league in leagues_data}
+
+    cleaned_tournaments = []
+    for tournament in tournaments_data:
+        tournament_id = as_int(tournament.get('id'))
+        league_id = as_int(tournament.get('leagueId'))
+
+        if tournament_id in OPL_TOURNAMENTS:
+            league_name = 'LCO'
+        elif league_id in league_names:
+            league_name = league_names[league_id]
+        else:
+            continue
+
+        cleaned_tournament = dict(tournament)
+        cleaned_tournament.update({'id': tournament_id, 'leagueId': league_id,
+                                   'leagueName': league_name})
+        cleaned_tournaments.append(cleaned_tournament)
+
+    cleaned_tournaments.sort(key=lambda x: x.get('startDate') or '', reverse=True)
+    return cleaned_tournaments
+
+def flatten_tournament_games(tournaments_data, mappings_data):
+    '''
+    Pre-flattens the tournament > stage > section > match > game hierarchy into
+    one record per game, with its platformGameId already resolved. A game that
+    isn't in the mapping table gets None as its platformGameId.
+    '''
+    platform_ids = {
+       esports_game["esportsGameId"]: esports_game["platformGameId"] for esports_game in mappings_data
+    }
+
+    game_list = []
+    for tournament in tournaments_data:
+        for stage in tournament.get("stages", []):
+            for section in stage.get("sections", []):
+                for match in section.get("matches", []):
+                    for game in match.get("games", []):
+                        game_list.append({
+                            'tournamentId': tournament.get('id'),
+                            'tournamentSlug': tournament.get('slug'),
+                            'leagueId': tournament.get('leagueId'),
+                            'leagueName': tournament.get('leagueName'),
+                            'startDate': tournament.get('startDate', ''),
+                            'stageName': stage.get('name'),
+                            'sectionName': section.get('name'),
+                            'matchId': match.get('id'),
+                            'gameId': game.get('id'),
+                            'gameNumber': game.get('number'),
+                            'state': game.get('state'),
+                            'platformGameId': platform_ids.get(game.get('id'))
+                        })
+    return game_list
+
+def prepare_esports_metadata(directory="esports-data"):
+    '''
+    Metadata stage: parses leagues.json, tournaments.json and mapping_data.json
+    once, then writes the cleaned leagues and tournaments alongside a flat game
+    list (game-list.json) that the downloader can iterate directly.
+    Nothing happens if the outputs are already there (delete them to refresh).
+    '''
+    outputs = [f'{directory}/leagues-cleaned.json', f'{directory}/tournaments-cleaned.json',
+               f'{directory}/game-list.json']
+    if all(os.path.isfile(output) for output in outputs):
+        return
+
+    with open(f"{directory}/leagues.json", "r") as json_file:
+        leagues_data = filter_leagues(json.load(json_file))
+    with open(f"{directory}/tournaments.json", "r") as json_file:
+        tournaments_data = filter_tournaments(json.load(json_file), leagues_data)
+    with open(f"{directory}/mapping_data.json", "r") as json_file:
+        game_list = flatten_tournament_games(tournaments_data, json.load(json_file))
+
+    for output, data in zip(outputs, [leagues_data, tournaments_data, game_list]):
+        with open(output, 'w') as json_file:
+            json.dump(data, json_file, separators=(',', ':'))
+
+def load_game_list(directory="esports-data"):
+    '''The flattened game list written by prepare_esports_metadata.'''
+    with open(f"{directory}/game-list.json", "r") as json_file:
+        return json.load(json_file)
 
 def process_ingame_event(game_event):
     '''
@@ -361,11 +436,48 @@ def we_want_to_document_this_event(game_event) -> bool:
     #no_stats_update = ['stats_update']
     #return (game_event.get('eventType',None) not in no_stats_update)
 
-def extract_useful_data(game_json):
+def update_draft_order(draft_order, champ_select_info):
+    '''
+    Bans and picks show up one by one over the champ_select updates, but only
+    the last update is kept. This appends each ban or pick to <draft_order>
+    the first time it is seen, so the cleaned file keeps the draft's order.
+    A pick that changes champion keeps its place.
+    '''
+    seen_bans = {(action['team'], action['championID']) for action in draft_order if action['action'] == 'ban'}
+    picks = {action['participantID']: action for action in draft_order if action['action'] == 'pick'}
+
+    for banned_champion in champ_select_info.get('bannedChampions') or []:
+        ban_key = (banned_champion.get('team'), banned_champion.get('championID'))
+        if ban_key[1] and ban_key not in seen_bans:
+            seen_bans.add(ban_key)
+            draft_order.append({'action': 'ban', 'team': ban_key[0], 'championID': ban_key[1],
+                                'participantID': None})
+
+    #teamOne is blue side (participants 1 to 5), teamTwo red side.
+    for team, team_data in [('blue', 'teamOne'), ('red', 'teamTwo')]:
+        for player in champ_select_info.get(team_data) or []:
+            participant_id = player.get('participantID')
+            champion_id = player.get('championID')
+            if not champion_id:
+                continue
+            if participant_id in picks:
+                picks[participant_id]['championID'] = champion_id
+            else:
+                picks[participant_id] = {'action': 'pick', 'team': team, 'championID': champion_id,
+                                         'participantID': participant_id}
+                draft_order.append(picks[participant_id])
+    return draft_order
+
+def extract_useful_data(game_json, directory="games", metrics=None):
     '''
     This function receives a json.load() that should not be empty or
     corrupted. When invoking this function, use try: except:
+    The cleaned events are written to <directory>/<platformGameId>-cleaned.json
+    Events kept/dropped and extract/write timings go to <metrics> if provided.
     '''
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    extract_start = time.perf_counter()
+    documented_events = 0
     event_list = []
 
     #We're using this to build each entry. Copypasting big blocks of code isn't
@@ -391,6 +503,7 @@ def extract_useful_data(game_json):
     has_pick_ban_updates = False
     game_info_found = False
     champ_select_info = None
+    draft_order = []
 
     for game_event in game_json:
 
@@ -411,6 +524,9 @@ def extract_useful_data(game_json):
 
         if has_pick_ban_updates:
             champ_select_info = build_event_dict(game_timer,game_event)
+            #The same list travels with every update, so the one that gets
+            #written sees the whole draft.
+            champ_select_info['draftOrder'] = update_draft_order(draft_order, champ_select_info)
 
         if game_event.get('eventType',None) == 'game_info':
             game_info_found = True
@@ -425,6 +541,7 @@ def extract_useful_data(game_json):
 
         if we_want_to_document_this_event(game_event):
             event_list.append(build_event_dict(game_timer,game_event))
+            documented_events += 1
 
         #That said, some specific stats_updates are worth taking and dissecting later.
         elif game_event.get('eventType',None) == 'stats_update':
@@ -434,141 +551,197 @@ def extract_useful_data(game_json):
                 event_list.append(build_event_dict(game_timer,game_event,
                                                     'game_state_10mn'))
                 stat_update_obtained[600]=True
+                metrics.add('stats_updates_sampled')
 
             #15-minute mark stat update
             if not stat_update_obtained[900] and (game_timer>=900):
                 event_list.append(build_event_dict(game_timer,game_event,
                                                     'game_state_15mn'))
                 stat_update_obtained[900]=True
+                metrics.add('stats_updates_sampled')
 
             #Endgame stat update
             if not stat_update_obtained['Endgame'] and game_event.get('gameOver',False):
                 event_list.append(build_event_dict(game_timer,game_event,
                                                     'game_state_end'))
                 stat_update_obtained['Endgame']=True
+                metrics.add('stats_updates_sampled')
+
+    #Events turned down by we_want_to_document_this_event count as dropped, even
+    #the stats updates that end up sampled above.
+    metrics.add('events_kept', documented_events)
+    metrics.add('events_dropped', len(game_json) - documented_events)
+    metrics.stage_seconds['extract'] += time.perf_counter() - extract_start
 
-    with open(f"games/{platform_id.replace(':','_')}-cleaned.json",'w') as revamped_file:
+    with metrics.stage('write'), open(f"{directory}/{platform_id.replace(':','_')}-cleaned.json",'w') as revamped_file:
         json.dump(event_list,revamped_file)
+        metrics.add('bytes_out', revamped_file.tell())
 
-def prepare_data_for_transformation(year=None):
+def as_selector(values):
+    '''Selectors accept a single value or any iterable of values. Everything is
+    compared as a string so that ids coming from JSON or from the command line
+    match alike. None means "no filter".'''
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        values = [values]
+    return {str(value) for value in values}
+
+def select_games(game_list, year=None, leagues=None, tournaments=None):
     '''
-    Tweaking Riot's download/data acquisition script to account for a person's
-    wish to download all the data for examination.
+    Keeps the completed games of the flat game list that match every selector:
+    - year: start year(s) of the tournament
+    - leagues: league ids or league names
+    - tournaments: tournament ids or slugs
     '''
-    start_time = time.time()
-    with open("esports-data/tournaments-cleaned.json", "r") as json_file:
-       tournaments_data = json.load(json_file)
-    with open("esports-data/mapping_data.json", "r") as json_file:
-       mappings_data = json.load(json_file)
+    years = as_selector(year)
+    leagues = as_selector(leagues)
+    tournaments = as_selector(tournaments)
+
+    for game in game_list:
+        if game['state'] != "completed":
+            continue
+        if years is not None and game['startDate'][:4] not in years:
+            continue
+        if leagues is not None and not {str(game['leagueId']), game['leagueName']} & leagues:
+            continue
+        if tournaments is not None and not {str(game['tournamentId']), game['tournamentSlug']} & tournaments:
+            continue
+        yield game
+
+def build_work_queue(year=None, leagues=None, tournaments=None, game_list=None, directory="games"):
+    '''
+    Plans an extraction run: every selected game is already resolved to its
+    platformGameId by the metadata stage, so all that is left is to diff them
+    against the cleaned files present in <directory> (one directory listing).
+    Returns the pending platformGameIds, in game list order, without duplicates.
+    '''
+    if game_list is None:
+        game_list = load_game_list()
 
-    directory = "games"
-    if not os.path.exists(directory):
-       os.makedirs(directory)
+    already_cleaned = set(os.listdir(directory)) if os.path.isdir(directory) else set()
 
-    mappings = {
-       esports_game["esportsGameId"]: esports_game for esports_game in mappings_data
-    }
+    work_queue = []
+    queued = set()
+    for game in select_games(game_list, year, leagues, tournaments):
+        platform_game_id = game['platformGameId']
+        if platform_game_id is None:
+            print(f"{game['gameId']} not found in the mapping table")
+            continue
 
-    game_counter = 0
+        cleaned_filename = f"{platform_game_id.replace(':','_')}-cleaned.json"
+        if cleaned_filename in already_cleaned or platform_game_id in queued:
+            continue
 
-    #This is where it goes a bit bleh
-    for tournament in tournaments_data:
-        start_date = tournament.get("startDate", "")
-        #Tweaking Riot's code here: I might want to simply download the entire dataset.
-        correct_year = start_date.startswith(str(year)) if year is not None else True
-
-        if correct_year:
-            print(f"Processing {tournament['slug']}")
-            for stage in tournament["stages"]:
-                for section in stage["sections"]:
-                    for match in section["matches"]:
-                        for game in match["games"]:
-                            if game["state"] == "completed":
-                                try:
-                                    platform_game_id = mappings[game["id"]]["platformGameId"]
-                                except KeyError:
-                                    print(f"{platform_game_id} {game['id']} not found in the mapping table")
-                                    continue
-
-                                game_filename = platform_game_id.replace(':','_')
-
-                                #If a cleaned version of the file doesn't exist:
-                                if not os.path.isfile(f"{directory}/{game_filename}-cleaned.json"):
-
-                                    #Download
-                                    download_gzip_and_write_to_json(f"{directory}/{platform_game_id}")
-
-                                    #Extract the data, keeping only the important bits
-                                    with open(f"{directory}/{game_filename}.json",'r') as game_file:
-                                        game_data = json.load(game_file)
-                                        extract_useful_data(game_data)
-
-                                    #Delete the source file
-                                    os.remove(f"{directory}/{game_filename}.json")
-
-                                game_counter += 1
-
-                            if game_counter % 10 == 0:
-                                print(
-                                    f"----- Processed {game_counter} games, current run time: \
-                                    {round((time.time() - start_time)/60, 2)} minutes"
-                                )
-
-def get_missing_lpl_games():
+        queued.add(platform_game_id)
+        work_queue.append(platform_game_id)
+
+    return work_queue
+
+def process_game(platform_game_id, directory="games"):
     '''
-    The LPL did things differently, and their data was recorded differently
-    before the 2023 summer split. For now, let's at least get the data.
+    One unit of work: download a game, keep only the important bits, and
+    delete the source file. Safe to run from threads or worker processes, which
+    is why the game's metrics come back as a plain dict (see PipelineMetrics).
     '''
-    start_time = time.time()
+    metrics = PipelineMetrics()
+    game_filename = platform_game_id.replace(':','_')
 
-    directory = "games"
-    if not os.path.exists(directory):
-       os.makedirs(directory)
+    #Download: the bucket always keeps games under games/, <directory> is
+    #only where we write them.
+    download_gzip_and_write_to_json(f"games/{platform_game_id}", metrics, f"{directory}/{game_filename}")
 
-    with open("esports-data/mapping_data.json", "r") as json_file:
-       mappings_data = json.load(json_file)
+    if os.path.isfile(f"{directory}/{game_filename}.json"):
+        #Extract the data, keeping only the important bits
+        with open(f"{directory}/{game_filename}.json",'r') as game_file:
+            with metrics.stage('parse'):
+                game_data = json.load(game_file)
+            extract_useful_data(game_data, directory, metrics)
 
-    # After extensive notebook usage, we found out that the tournament realms
-    # contained LPL for LPL games that weren't documented. That was a huge
-    # relief.
-    mappings_missing_lpl = {
-       esports_game["esportsGameId"]: esports_game for esports_game in mappings_data if 'LPL' in esports_game['platformGameId']
-    }
+        #Delete the source file
+        os.remove(f"{directory}/{game_filename}.json")
+        metrics.add('games_processed')
+    else:
+        metrics.add('games_failed')
 
-    game_counter = 0
+    game_metrics = metrics.as_dict()
+    game_metrics.update({'type': 'game', 'platformGameId': platform_game_id})
+    return game_metrics
 
-    for game in mappings_missing_lpl.values():
+def run_work_queue(work_queue, executor=None, directory="games", metrics_file=None):
+    '''
+    Hands the pending games to an executor: anything with a map() method works
+    (concurrent.futures.ThreadPoolExecutor, ProcessPoolExecutor...). Without
+    one, games are processed serially.
+    Every game's metrics are appended as a JSON line to <metrics_file> if one
+    is given, followed by a summary of the run, which is also printed.
+    '''
+    if not os.path.exists(directory):
+       os.makedirs(directory)
 
-        platform_game_id = game.get('platformGameId')
+    run_metrics = PipelineMetrics()
+    metrics_log = MetricsLog(metrics_file)
+    mapper = map if executor is None else executor.map
+    game_counter = 0
+
+    try:
+        for game_metrics in mapper(process_game, work_queue, [directory] * len(work_queue)):
+            run_metrics.merge(game_metrics)
+            metrics_log.write(game_metrics)
+            game_counter += 1
 
-        game_filename = platform_game_id.replace(':','_')
+            if game_counter % 10 == 0:
+                summary = run_metrics.summary()
+                print(
+                    f"----- Processed {game_counter}/{len(work_queue)} games, current run time: "
+                    f"{round(summary['elapsed_seconds']/60, 2)} minutes ({summary['games_per_second']} games/s)"
+                )
+    finally:
+        summary = run_metrics.summary()
+        metrics_log.write(summary)
+        metrics_log.close()
+        print(format_summary(summary))
 
-        #If a cleaned version of the file doesn't exist:
-        if not os.path.isfile(f"{directory}/{game_filename}-cleaned.json"):
+    return summary
 
-            #Download
-            download_gzip_and_write_to_json(f"{directory}/{platform_game_id}")
+def prepare_data_for_transformation(year=None, leagues=None, tournaments=None, executor=None,
+                                    metrics_file=None):
+    '''
+    Tweaking Riot's download/data acquisition script to account for a person's
+    wish to download all the data for examination (no selector = everything).
+    '''
+    work_queue = build_work_queue(year, leagues, tournaments)
+    print(f"{len(work_queue)} games left to process")
+    return run_work_queue(work_queue, executor, metrics_file=metrics_file)
 
-            #Extract the data, keeping only the important bits
-            with open(f"{directory}/{game_filename}.json",'r') as game_file:
-                game_data = json.load(game_file)
-                extract_useful_data(game_data)
+def get_missing_lpl_games(executor=None, metrics_file=None):
+    '''
+    The LPL did things differently, and their data was recorded differently
+    before the 2023 summer split. For now, let's at least get the data.
+    '''
+    directory = "games"
 
-            #Delete the source file
-            os.remove(f"{directory}/{game_filename}.json")
+    with open("esports-data/mapping_data.json", "r") as json_file:
+       mappings_data = json.load(json_file)
 
-            game_counter += 1
+    # After extensive notebook usage, we found out that the tournament realms
+    # contained LPL for LPL games that weren't documented. That was a huge
+    # relief.
+    already_cleaned = set(os.listdir(directory)) if os.path.isdir(directory) else set()
+    work_queue = list(dict.fromkeys(
+       esports_game['platformGameId'] for esports_game in mappings_data
+       if 'LPL' in esports_game['platformGameId'] and
+       f"{esports_game['platformGameId'].replace(':','_')}-cleaned.json" not in already_cleaned
+    ))
 
-            if game_counter % 10 == 0 and game_counter > 0:
-                print(
-                    f"----- Processed {game_counter} games, current run time: \
-                    {round((time.time() - start_time)/60, 2)} minutes"
-                )
+    return run_work_queue(work_queue, executor, directory, metrics_file)
 
 #If we want to run the script as a standalone, we can have a go.
 if __name__  == '__main__':
     download_esports_files()
-    filter_leagues()
-    filter_tournaments()
+    prepare_esports_metadata()
     prepare_data_for_transformation()
+    #Downloads are I/O bound, a thread pool speeds things up considerably:
+    #with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    #    prepare_data_for_transformation(year=2023, leagues=['LEC'], executor=executor)
     #get_missing_lpl_games()
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from event_arena import IN_ENEMY_JUNGLE, NO_SIDE
+
+#The Nb*Blue/Red columns of extract_datapoints_from_game, for every game of
+#an event arena at once. Each counter is a bincount keyed by game x side over
+#the events that feed it, instead of a Python loop per event and per game.
+SMALLER_CAMPS = ['blueCamp', 'redCamp', 'gromp', 'wolf', 'krug', 'raptor']
+
+#Wards placed or killed in the last 20 seconds are left out (see
+#extract_datapoints_from_game).
+LATE_WARD_SECONDS = 20
+
+COLUMNS = ['NbWardsPlacedBlue', 'NbWardsPlacedRed', 'NbControlWardsPlacedBlue', 'NbControlWardsPlacedRed',
+           'NbWardsKilledBlue', 'NbWardsKilledRed', 'NbControlWardsKilledBlue', 'NbControlWardsKilledRed',
+           'NbCampsSecuredBlue', 'NbCampsSecuredRed', 'NbCampsStolenBlue', 'NbCampsStolenRed',
+           'NbScuttlesBlue', 'NbScuttlesRed', 'NbRiftHeraldsBlue', 'NbRiftHeraldsRed',
+           'NbDragonsBlue', 'NbDragonsRed', 'NbBaronsBlue', 'NbBaronsRed',
+           'NbEldersBlue', 'NbEldersRed', 'NbTowersBlue', 'NbTowersRed',
+           'NbPlatesBlue', 'NbPlatesRed']
+
+def count_by_side(game, side, mask, nb_games):
+    '''[nb_games, 2] counts of the masked events, blue then red. Events without
+    a side are not counted, as in add_event_to_counter.'''
+    mask = mask & (side != NO_SIDE)
+    return np.bincount(game[mask] * 2 + side[mask], minlength=nb_games * 2).reshape(nb_games, 2)
+
+def resolved_sides(events, games):
+    '''
+    Side credited for each event, as add_event_to_counter decides it: the
+    event's team, or failing that the side the participant was listed on in
+    game_info.
+    '''
+    team = events['team'].astype(np.int64)
+    participant_side = games['sides'][events['game'], events['participant']]
+    return np.where(team != NO_SIDE, team, participant_side)
+
+def elder_dragons(game, side, time_order, nb_games):
+    '''
+    Which of the dragon kills (with a side, in game order) are elders: the
+    dragon that gives a team its fourth kill is the soul, and every dragon
+    after it in that game is an elder.
+    '''
+    nb_dragons = len(game)
+    order = np.lexsort((time_order, side, game))
+    group = game[order] * 2 + side[order]
+    #Running count of each team's dragons, in kill order.
+    new_group = np.ones(nb_dragons, dtype=bool)
+    new_group[1:] = group[1:] != group[:-1]
+    index = np.arange(nb_dragons)
+    running = np.empty(nb_dragons, dtype=np.int64)
+    running[order] = index - np.maximum.accumulate(np.where(new_group, index, 0)) + 1
+
+    soul_position = np.full(nb_games, np.iinfo(np.int64).max)
+    is_soul = running == 4
+    np.minimum.at(soul_position, game[is_soul], time_order[is_soul])
+    return time_order > soul_position[game]
+
+def objective_counts(arena):
+    '''
+    One row per game of the arena (same order), with esportsPlatformId and
+    every column of COLUMNS, equal to what extract_datapoints_from_game
+    returns for the same cleaned file.
+    '''
+    events = arena.events
+    games = arena.games
+    nb_games = len(games)
+    event_type = events['event_type']
+    game = events['game'].astype(np.int64)
+    position = np.arange(len(events))
+    code = arena.code
+
+    counts = {}
+    def add(name, counted):
+        counts[f'{name}Blue'] = counted[:, 0]
+        counts[f'{name}Red'] = counted[:, 1]
+
+    #Wards are credited through the participant lists only. wards_placed[placer-1]
+    #with placer 0 lands on the last slot, so participant 0 counts as the 10th.
+    participant = events['participant'].astype(np.int64)
+    ward_owner = np.where(participant == 0, 10, participant)
+    ward_side = games['sides'][game, ward_owner].astype(np.int64)
+    on_time = events['game_time'] < games['duration'][game] - LATE_WARD_SECONDS
+    control = events['ward'] == code('ward', 'control')
+    placed = (event_type == code('event_type', 'ward_placed')) & on_time
+    killed = (event_type == code('event_type', 'ward_killed')) & on_time
+    add('NbWardsPlaced', count_by_side(game, ward_side, placed & ~control, nb_games))
+    add('NbControlWardsPlaced', count_by_side(game, ward_side, placed & control, nb_games))
+    add('NbWardsKilled', count_by_side(game, ward_side, killed & ~control, nb_games))
+    add('NbControlWardsKilled', count_by_side(game, ward_side, killed & control, nb_games))
+
+    side = resolved_sides(events, games)
+    monster = events['monster']
+    monster_kill = event_type == code('event_type', 'epic_monster_kill')
+    stolen = monster_kill & ((events['flags'] & IN_ENEMY_JUNGLE) != 0)
+    small_camp = np.isin(monster, [code('monster', camp) for camp in SMALLER_CAMPS])
+    add('NbCampsSecured', count_by_side(game, side, monster_kill & ~stolen & small_camp, nb_games))
+    add('NbCampsStolen', count_by_side(game, side, stolen, nb_games))
+    add('NbScuttles', count_by_side(game, side, monster_kill & (monster == code('monster', 'scuttleCrab')), nb_games))
+    add('NbRiftHeralds', count_by_side(game, side, monster_kill & (monster == code('monster', 'riftHerald')), nb_games))
+    add('NbBarons', count_by_side(game, side, monster_kill & (monster == code('monster', 'baron')), nb_games))
+
+    dragon = monster_kill & (monster == code('monster', 'dragon')) & (side != NO_SIDE)
+    elder = np.zeros(len(events), dtype=bool)
+    elder[dragon] = elder_dragons(game[dragon], side[dragon], position[dragon], nb_games)
+    add('NbDragons', count_by_side(game, side, dragon & ~elder, nb_games))
+    add('NbElders', count_by_side(game, side, elder, nb_games))
+
+    #Turrets only count when their lane and tier are known: the original code
+    #fails on the tower_log key otherwise and skips the counter.
+    team = events['team'].astype(np.int64)
+    tower = ((event_type == code('event_type', 'building_destroyed'))
+             & (events['building'] == code('building', 'turret'))
+             & (events['lane'] != -1) & (events['tier'] != -1))
+    add('NbTowers', count_by_side(game, team, tower, nb_games))
+    add('NbPlates', count_by_side(game, team, event_type == code('event_type', 'turret_plate_destroyed'), nb_games))
+
+    df = pd.DataFrame({'esportsPlatformId': games['platform_id']})
+    for column in COLUMNS:
+        df[column] = counts[column]
+    return df
+
+if __name__ == '__main__':
+    #python objective_counts.py [arena dir] [output csv], after event_arena.py
+    import sys
+    from event_arena import ARENA_DIR, load_event_arena
+    df = objective_counts(load_event_arena(sys.argv[1] if len(sys.argv) > 1 else ARENA_DIR))
+    df.to_csv(sys.argv[2] if len(sys.argv) > 2 else 'objective-counts.csv', sep=';', index=False)
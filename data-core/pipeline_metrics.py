@@ -0,0 +1,91 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+#Stages of a single game's trip through the extraction pipeline, in order.
+STAGES = ['download', 'decompress', 'parse', 'extract', 'write']
+
+class PipelineMetrics:
+    '''
+    Collects stage timings and counters (bytes in/out, events kept/dropped...)
+    for the extraction pipeline. One instance is filled per game, so that it
+    can travel back from a worker thread or process as a plain dict, and the
+    run-level instance merges them.
+    '''
+
+    def __init__(self):
+        self.stage_seconds = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.start_time = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        '''Times the enclosed block and adds it to the stage total.'''
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - stage_start
+
+    def add(self, name, value=1):
+        self.counters[name] += value
+
+    def as_dict(self):
+        return {
+            'stages': {name: round(seconds, 6) for name, seconds in self.stage_seconds.items()},
+            'counters': dict(self.counters)
+        }
+
+    def merge(self, metrics_dict):
+        '''Adds up the output of another instance's as_dict().'''
+        for name, seconds in metrics_dict.get('stages', {}).items():
+            self.stage_seconds[name] += seconds
+        for name, value in metrics_dict.get('counters', {}).items():
+            self.counters[name] += value
+
+    def summary(self):
+        '''Run-level figures: totals per stage and counter, plus throughput.'''
+        elapsed = time.perf_counter() - self.start_time
+        games = self.counters.get('games_processed', 0)
+        summary = {
+            'type': 'summary',
+            'elapsed_seconds': round(elapsed, 3),
+            'games_per_second': round(games / elapsed, 3) if elapsed > 0 else 0.0
+        }
+        summary.update(self.as_dict())
+        return summary
+
+class MetricsLog:
+    '''
+    Appends metrics records as JSON lines when a file is given, so that runs
+    can be compared with each other afterwards. Without a file, it does nothing.
+    '''
+
+    def __init__(self, filename=None):
+        self.log_file = open(filename, 'a') if filename is not None else None
+
+    def write(self, record):
+        if self.log_file is not None:
+            self.log_file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+def format_summary(summary):
+    '''Human-readable version of PipelineMetrics.summary() for the console.'''
+    counters = summary['counters']
+    lines = [
+        f"===== {counters.get('games_processed', 0)} games in {summary['elapsed_seconds']} s "
+        f"({summary['games_per_second']} games/s), {counters.get('games_failed', 0)} failed",
+        f"      bytes downloaded: {counters.get('bytes_in', 0)}, decompressed: "
+        f"{counters.get('bytes_decompressed', 0)}, written: {counters.get('bytes_out', 0)}",
+        f"      events kept: {counters.get('events_kept', 0)}, dropped: {counters.get('events_dropped', 0)}, "
+        f"stats updates sampled: {counters.get('stats_updates_sampled', 0)}"
+    ]
+    for name in STAGES:
+        if name in summary['stages']:
+            lines.append(f"      {name:<10} {summary['stages'][name]:10.3f} s")
+    return '\n'.join(lines)
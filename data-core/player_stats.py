@@ -0,0 +1,162 @@
+import datetime as dt
+import os
+
+import numpy as np
+import pandas as pd
+
+#One row per player per game, collected by build_csv from the cleaned files it
+#already reads, and stored column by column: summoner and champion names as
+#integer codes into sorted name lists, and two indexes (rows grouped by
+#player, rows grouped by champion) so that a career or a champion's history
+#is a slice rather than a rescan of the games folder.
+PLAYER_STATS_DIR = 'player_stats'
+
+#[1,2,3,4,5] = [Top,Jg,Mid,AD,Supp] on blue side, [6,7,8,9,10] on red side
+#(see extract_game_state_data).
+ROLES = ['Top', 'Jg', 'Mid', 'AD', 'Sup']
+
+#Sampled at 10 and 15 minutes and at the end of the game.
+TIMED_STATS = ['totalGold', 'XP']
+#Only read at the end of the game.
+END_STATS = ['VISION_SCORE', 'TOTAL_DAMAGE_DEALT_TO_CHAMPIONS', 'TOTAL_DAMAGE_TAKEN',
+             'TIME_CCING_OTHERS', 'CHAMPIONS_KILLED', 'NUM_DEATHS', 'NUM_ASSISTS',
+             'MINIONS_KILLED', 'NEUTRAL_MINIONS_KILLED']
+GAME_STATES = {'game_state_10mn': '10', 'game_state_15mn': '15', 'game_state_end': 'End'}
+
+STAT_COLUMNS = ([f'{stat}{label}' for label in GAME_STATES.values() for stat in TIMED_STATS] + END_STATS)
+#Stored as codes, with the names in <column>_names.npy
+NAME_COLUMNS = ['summonerName', 'championName']
+COLUMNS = (['esportsPlatformId', 'gameDate', 'gameVersion', 'participantID', 'side', 'role', 'win']
+           + NAME_COLUMNS + STAT_COLUMNS)
+
+def player_rows(game_json):
+    '''
+    The players of one cleaned game: who played which champion on which side
+    (from game_info), with their stats from the sampled game states. Stats a
+    game does not have are NaN.
+    '''
+    header = {}
+    players = {}
+    stats = {}
+    for game_event in game_json:
+        event_type = game_event.get('eventType')
+        if event_type is None:
+            header = game_event
+        elif event_type == 'game_info':
+            players = {}
+            for side in ['blue', 'red']:
+                for player in game_event.get(side) or []:
+                    players[player.get('participantID')] = (side, player)
+        elif event_type in GAME_STATES:
+            label = GAME_STATES[event_type]
+            for participant in game_event.get('participants') or []:
+                participant_stats = stats.setdefault(participant.get('participantID'), {})
+                for stat in TIMED_STATS:
+                    participant_stats[f'{stat}{label}'] = participant.get(stat)
+                if label == 'End':
+                    for stat in END_STATS:
+                        participant_stats[stat] = participant.get(stat)
+
+    winner = game_json[-1].get('winningTeam') if game_json else None
+    game_date = header.get('gameDate')
+    rows = []
+    for participant_id, (side, player) in sorted(players.items(), key=lambda item: item[0] or 0):
+        row = {
+            'esportsPlatformId': header.get('esportsPlatformId'),
+            'gameDate': dt.datetime.fromisoformat(game_date).astimezone(dt.timezone.utc).replace(tzinfo=None)
+                        if game_date else None,
+            'gameVersion': header.get('gameVersion'),
+            'participantID': participant_id,
+            'side': side,
+            'role': ROLES[(participant_id - 1) % 5] if isinstance(participant_id, int) and participant_id > 0 else None,
+            'win': winner is not None and winner == side,
+            'summonerName': player.get('summonerName'),
+            'championName': player.get('championName'),
+        }
+        participant_stats = stats.get(participant_id, {})
+        for column in STAT_COLUMNS:
+            value = participant_stats.get(column)
+            row[column] = np.nan if value is None else value
+        rows.append(row)
+    return rows
+
+def group_index(codes, nb_values):
+    '''Rows grouped by code (stable, so in insertion order inside a group) and
+    the CSR offsets of each group.'''
+    order = np.argsort(codes, kind='stable')
+    offsets = np.zeros(nb_values + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=nb_values), out=offsets[1:])
+    return order, offsets
+
+def write_player_stats(rows, output_dir=PLAYER_STATS_DIR):
+    '''Writes the rows of player_rows() for all games as one .npy file per
+    column, plus the name lists and the player and champion indexes.'''
+    os.makedirs(output_dir, exist_ok=True)
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df = df.sort_values(['gameDate', 'esportsPlatformId', 'participantID'], kind='stable', na_position='first')
+
+    arrays = {
+        'esportsPlatformId': df['esportsPlatformId'].fillna('').to_numpy(dtype=str),
+        'gameDate': df['gameDate'].to_numpy(dtype='datetime64[s]'),
+        'gameVersion': df['gameVersion'].fillna('').to_numpy(dtype=str),
+        'participantID': df['participantID'].fillna(0).to_numpy(dtype=np.int8),
+        'side': df['side'].map({'blue': 0, 'red': 1}).fillna(-1).to_numpy(dtype=np.int8),
+        'role': df['role'].map({role: code for code, role in enumerate(ROLES)}).fillna(-1).to_numpy(dtype=np.int8),
+        'win': df['win'].to_numpy(dtype=bool),
+    }
+    for column in STAT_COLUMNS:
+        arrays[column] = df[column].to_numpy(dtype=np.float64)
+    for column in NAME_COLUMNS:
+        codes, names = pd.factorize(df[column].fillna(''), sort=True)
+        arrays[column] = codes.astype(np.int32)
+        arrays[f'{column}_names'] = names.to_numpy(dtype=str)
+        arrays[f'{column}_order'], arrays[f'{column}_offsets'] = group_index(arrays[column], len(names))
+
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f'{name}.npy'), array)
+    return len(df)
+
+class PlayerStats:
+    '''
+    Memory-mapped player-game table written by write_player_stats. Rows are
+    in game date order; career(name) and champion(name) read the rows of one
+    player or one champion through their index.
+    '''
+
+    def __init__(self, output_dir=PLAYER_STATS_DIR):
+        self.arrays = {}
+        for filename in os.listdir(output_dir):
+            if filename.endswith('.npy'):
+                self.arrays[filename[:-4]] = np.load(os.path.join(output_dir, filename), mmap_mode='r')
+        self.codes = {column: {str(name): code for code, name in enumerate(self.arrays[f'{column}_names'])}
+                      for column in NAME_COLUMNS}
+
+    def __len__(self):
+        return len(self.arrays['win'])
+
+    def rows_of(self, column, name):
+        code = self.codes[column].get(name)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        offsets = self.arrays[f'{column}_offsets']
+        return np.asarray(self.arrays[f'{column}_order'][offsets[code]:offsets[code + 1]])
+
+    def frame(self, rows):
+        '''The given rows as a DataFrame, with names, sides and roles decoded.'''
+        df = pd.DataFrame({column: self.arrays[column][rows] for column in COLUMNS})
+        for column in NAME_COLUMNS:
+            df[column] = self.arrays[f'{column}_names'][df[column].to_numpy()]
+        df['side'] = np.array(['blue', 'red', None], dtype=object)[df['side'].to_numpy()]
+        df['role'] = np.array(ROLES + [None], dtype=object)[df['role'].to_numpy()]
+        return df
+
+    def career(self, summoner_name):
+        '''Every game of a player, oldest first.'''
+        return self.frame(self.rows_of('summonerName', summoner_name))
+
+    def champion(self, champion_name):
+        '''Every game a champion was played in, oldest first.'''
+        return self.frame(self.rows_of('championName', champion_name))
+
+    def players(self):
+        return list(self.codes['summonerName'])
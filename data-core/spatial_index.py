@@ -0,0 +1,201 @@
+import json
+
+import numpy as np
+
+from event_arena import NO_SIDE
+
+#Positions of the wards and kills kept by process_ingame_event, for every game
+#of an event arena, as one columnar table sorted by the cell of a square grid
+#laid over Summoner's Rift. A region is a set of cells, so "wards in the enemy
+#jungle before 15:00" reads a few contiguous slices of the table instead of
+#every game's events, and heatmaps are bincounts over the same cells.
+MAP_SIZE = 15000  #x and z both run from 0 to about 14 900
+GRID_SIZE = 60    #cells per side, 250 units each
+POSITION_EVENTS = ['ward_placed', 'ward_killed', 'champion_kill']
+
+#Blue base is the bottom-left corner (low x and z), red base the top-right one.
+#The river follows the anti-diagonal x + z = MAP_SIZE. Widths are in map
+#units and approximate: the regions are meant for aggregates, not for
+#deciding single events.
+LANE_WIDTH = 1800
+RIVER_WIDTH = 1500
+BASE_SIZE = 4500
+
+def map_regions(grid_size=GRID_SIZE):
+    '''Boolean [grid_size, grid_size] masks (indexed [x cell, z cell]) of the
+    named regions of the map.'''
+    centers = (np.arange(grid_size) + 0.5) * MAP_SIZE / grid_size
+    x, z = np.meshgrid(centers, centers, indexing='ij')
+
+    blue_base = (x < BASE_SIZE) & (z < BASE_SIZE) & (x + z < BASE_SIZE * 1.5)
+    red_base = (x > MAP_SIZE - BASE_SIZE) & (z > MAP_SIZE - BASE_SIZE) & (x + z > 2 * MAP_SIZE - BASE_SIZE * 1.5)
+    top_lane = ((x < LANE_WIDTH) | (z > MAP_SIZE - LANE_WIDTH)) & ~blue_base & ~red_base
+    bot_lane = ((z < LANE_WIDTH) | (x > MAP_SIZE - LANE_WIDTH)) & ~blue_base & ~red_base
+    mid_lane = (np.abs(x - z) < LANE_WIDTH / 2) & ~blue_base & ~red_base
+    lanes = top_lane | bot_lane | mid_lane
+    river = (np.abs(x + z - MAP_SIZE) < RIVER_WIDTH / 2) & ~lanes
+    jungle = ~lanes & ~river & ~blue_base & ~red_base
+
+    return {
+        'blue_base': blue_base,
+        'red_base': red_base,
+        'top_lane': top_lane,
+        'mid_lane': mid_lane,
+        'bot_lane': bot_lane,
+        'river': river,
+        'blue_jungle': jungle & (x + z < MAP_SIZE),
+        'red_jungle': jungle & (x + z >= MAP_SIZE),
+    }
+
+REGIONS = map_regions()
+SIDE_NAMES = ['blue', 'red']
+
+def game_labels(arena, directory="esports-data"):
+    '''
+    League id of each game of the arena and its [blue, red] team ids, -1 when
+    unknown, from game-list.json (prepare_esports_metadata) and mapping_data.json.
+    '''
+    with open(f"{directory}/game-list.json", "r") as json_file:
+        game_leagues = {game['platformGameId']: game['leagueId'] for game in json.load(json_file)}
+    with open(f"{directory}/mapping_data.json", "r") as json_file:
+        team_mappings = {game['platformGameId']: game.get('teamMapping', {}) for game in json.load(json_file)}
+
+    leagues = np.full(len(arena.games), -1, dtype=np.int64)
+    teams = np.full((len(arena.games), 2), -1, dtype=np.int64)
+    for game, platform_id in enumerate(arena.games['platform_id']):
+        leagues[game] = int(game_leagues.get(platform_id) or -1)
+        team_mapping = team_mappings.get(platform_id, {})
+        for side, team_side in enumerate(['100', '200']):
+            teams[game, side] = int(team_mapping.get(team_side) or -1)
+    return leagues, teams
+
+class PositionTable:
+    '''
+    Columns (equal-length arrays, sorted by grid cell) of every positioned
+    event: x, z, game, game_time, event_type, side (the placer's or killer's),
+    ward, league, team, cell. Events of cell c are rows
+    cell_offsets[c]:cell_offsets[c+1].
+    '''
+
+    def __init__(self, columns, vocabularies, grid_size=GRID_SIZE):
+        self.columns = columns
+        self.vocabularies = vocabularies
+        self.grid_size = grid_size
+        self.regions = REGIONS if grid_size == GRID_SIZE else map_regions(grid_size)
+        nb_cells = grid_size * grid_size
+        self.cell_offsets = np.zeros(nb_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns['cell'], minlength=nb_cells), out=self.cell_offsets[1:])
+
+    def __len__(self):
+        return len(self.columns['cell'])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def code(self, field, value):
+        values = self.vocabularies[field]
+        return values.index(value) if value in values else -1
+
+    def rows_in(self, cells):
+        '''Rows of the given cells (a boolean grid or flat cell numbers), cell by cell.'''
+        cells = np.asarray(cells)
+        if cells.dtype == bool:
+            cells = np.flatnonzero(cells.ravel())
+        starts = self.cell_offsets[cells]
+        lengths = self.cell_offsets[cells + 1] - starts
+        #Concatenated ranges: each row is its cell's start plus its rank in the cell.
+        range_starts = np.cumsum(lengths) - lengths
+        return np.repeat(starts - range_starts, lengths) + np.arange(lengths.sum())
+
+    def query(self, region, relative=None, event_type=None, side=None, before=None, after=None, ward=None):
+        '''
+        Rows in a region, with optional filters (event type and ward type by
+        name, side as 'blue' or 'red', game time bounds in seconds). <region>
+        is a name of REGIONS, a boolean grid, or with <relative> ('own' or
+        'enemy') a region name without its side:
+        query('jungle', 'enemy', 'ward_placed', before=900) is every ward
+        placed in the enemy jungle before 15:00.
+        '''
+        if relative is None:
+            rows = self.rows_in(self.regions[region] if isinstance(region, str) else region)
+        else:
+            rows = []
+            for side_code, side_name in enumerate(SIDE_NAMES):
+                region_side = side_name if relative == 'own' else SIDE_NAMES[1 - side_code]
+                region_rows = self.rows_in(self.regions[f'{region_side}_{region}'])
+                rows.append(region_rows[self.columns['side'][region_rows] == side_code])
+            rows = np.sort(np.concatenate(rows))
+
+        keep = np.ones(len(rows), dtype=bool)
+        if event_type is not None:
+            keep &= self.columns['event_type'][rows] == self.code('event_type', event_type)
+        if side is not None:
+            keep &= self.columns['side'][rows] == SIDE_NAMES.index(side)
+        if before is not None:
+            keep &= self.columns['game_time'][rows] < before
+        if after is not None:
+            keep &= self.columns['game_time'][rows] >= after
+        if ward is not None:
+            keep &= self.columns['ward'][rows] == self.code('ward', ward)
+        return rows[keep]
+
+    def heatmap(self, rows=None, bins=64):
+        '''[bins, bins] counts (indexed [x bin, z bin]) of the given rows, or of all.'''
+        x = self.columns['x'] if rows is None else self.columns['x'][rows]
+        z = self.columns['z'] if rows is None else self.columns['z'][rows]
+        return np.histogram2d(x, z, bins=bins, range=[[0, MAP_SIZE], [0, MAP_SIZE]])[0]
+
+    def heatmaps(self, by, rows=None, bins=64):
+        '''
+        One heatmap per value of the <by> column ('team', 'league'...), all
+        binned in a single bincount. Returns (values, [nb_values, bins, bins]).
+        '''
+        rows = np.arange(len(self)) if rows is None else rows
+        values, groups = np.unique(self.columns[by][rows], return_inverse=True)
+        x_bin = np.clip((self.columns['x'][rows] * bins / MAP_SIZE).astype(np.int64), 0, bins - 1)
+        z_bin = np.clip((self.columns['z'][rows] * bins / MAP_SIZE).astype(np.int64), 0, bins - 1)
+        counts = np.bincount((groups * bins + x_bin) * bins + z_bin, minlength=len(values) * bins * bins)
+        return values, counts.reshape(len(values), bins, bins)
+
+def build_position_table(arena, leagues=None, teams=None, grid_size=GRID_SIZE):
+    '''
+    PositionTable of the arena's wards and champion kills that carry a
+    position. Wards are credited to the side their placer or killer was
+    listed on in game_info, kills to the killer's team. <leagues> and <teams>
+    come from game_labels; without them those columns are -1.
+    '''
+    events = arena.events
+    codes = [arena.code('event_type', event_type) for event_type in POSITION_EVENTS]
+    positioned = np.isin(events['event_type'], codes) & ~np.isnan(events['x']) & ~np.isnan(events['z'])
+    events = events[positioned]
+    game = events['game'].astype(np.int64)
+
+    kill = events['event_type'] == arena.code('event_type', 'champion_kill')
+    ward_side = arena.games['sides'][game, events['participant']]
+    side = np.where(kill, events['team'], ward_side).astype(np.int8)
+
+    leagues = np.full(len(arena.games), -1, dtype=np.int64) if leagues is None else np.asarray(leagues)
+    teams = np.full((len(arena.games), 2), -1, dtype=np.int64) if teams is None else np.asarray(teams)
+    team = np.where(side != NO_SIDE, teams[game, np.clip(side, 0, 1)], -1)
+
+    x = events['x'].astype(np.float32)
+    z = events['z'].astype(np.float32)
+    x_cell = np.clip((x * grid_size / MAP_SIZE).astype(np.int64), 0, grid_size - 1)
+    z_cell = np.clip((z * grid_size / MAP_SIZE).astype(np.int64), 0, grid_size - 1)
+    cell = (x_cell * grid_size + z_cell).astype(np.int32)
+
+    #Sorted by cell, stable so rows stay in game order inside a cell.
+    order = np.argsort(cell, kind='stable')
+    columns = {
+        'x': x[order],
+        'z': z[order],
+        'game': events['game'][order],
+        'game_time': events['game_time'][order],
+        'event_type': events['event_type'][order],
+        'side': side[order],
+        'ward': events['ward'][order],
+        'league': leagues[game][order],
+        'team': team[order],
+        'cell': cell[order],
+    }
+    return PositionTable(columns, arena.vocabularies, grid_size)
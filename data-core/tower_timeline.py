@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from event_arena import NO_SIDE
+
+#When each of the 22 turrets fell, per game: an int32 matrix in milliseconds
+#of game time, one column per (tier, lane, side) slot, in the order of the
+#tower_log keys of extract_datapoints_from_game. The slot of a
+#building_destroyed event is found in a lookup table indexed by the arena's
+#tier and lane codes, and the <tier><lane><side>Timer names only come back
+#when the matrix is exported.
+TOWER_SLOTS = [(tier, lane, side) for side in ['Blue', 'Red']
+               for tier, lane in [('Outer', 'Top'), ('Outer', 'Mid'), ('Outer', 'Bot'),
+                                  ('Inner', 'Top'), ('Inner', 'Mid'), ('Inner', 'Bot'),
+                                  ('Base', 'Top'), ('Base', 'Mid'), ('Base', 'Bot'),
+                                  ('Nexus1', 'Mid'), ('Nexus2', 'Mid')]]
+TOWER_COLUMNS = [f'{tier}{lane}{side}Timer' for tier, lane, side in TOWER_SLOTS]
+SLOTS_PER_SIDE = len(TOWER_SLOTS) // 2
+NEXUS2_OFFSET = 1 #Nexus2 is the slot right after Nexus1
+
+#The turret never fell.
+NEVER_FELL = np.iinfo(np.int32).max
+
+#(turretTier, lane) of a building_destroyed event -> blue side slot, and the
+#offset of each side, for the export path (extract_datapoints_from_game),
+#which fills one game's row of the matrix as it reads the events.
+EVENT_SLOTS = {(tier.rstrip('1').lower(), lane.lower()): slot
+               for slot, (tier, lane, side) in enumerate(TOWER_SLOTS[:SLOTS_PER_SIDE]) if tier != 'Nexus2'}
+SIDE_OFFSETS = {'blue': 0, 'red': SLOTS_PER_SIDE}
+
+def slot_lookup(arena):
+    '''
+    [tier code, lane code] -> slot on the blue side (add SLOTS_PER_SIDE for
+    red), -1 for turrets outside the 22 slots. The extra last row and column
+    catch the -1 (missing) codes.
+    '''
+    tiers = arena.vocabularies['tier']
+    lanes = arena.vocabularies['lane']
+    lookup = np.full((len(tiers) + 1, len(lanes) + 1), -1, dtype=np.int8)
+    for slot, (tier, lane, side) in enumerate(TOWER_SLOTS[:SLOTS_PER_SIDE]):
+        #Both nexus turrets are logged as 'nexus', the first one to fall is Nexus1.
+        if tier == 'Nexus2':
+            continue
+        tier_code = arena.code('tier', tier.rstrip('1').lower())
+        lane_code = arena.code('lane', lane.lower())
+        if tier_code != -1 and lane_code != -1:
+            lookup[tier_code, lane_code] = slot
+    return lookup
+
+def tower_timeline(arena):
+    '''
+    [nb_games, 22] int32 matrix of the game time (ms) each turret fell,
+    NEVER_FELL where it did not. Same rules as tower_log: a turret needs a
+    side, a lane and a tier, the second nexus turret of a side goes to Nexus2,
+    and the last event for a slot wins.
+    '''
+    events = arena.events
+    nb_games = len(arena.games)
+    turret = ((events['event_type'] == arena.code('event_type', 'building_destroyed'))
+              & (events['building'] == arena.code('building', 'turret'))
+              & (events['team'] != NO_SIDE))
+    turrets = events[turret]
+    slot = slot_lookup(arena)[turrets['tier'], turrets['lane']].astype(np.int64)
+    placed = slot != -1
+    turrets, slot = turrets[placed], slot[placed]
+    game = turrets['game'].astype(np.int64)
+    side = turrets['team'].astype(np.int64)
+
+    #Every nexus turret after the first one of its game and side is a Nexus2.
+    nexus1 = [base for base, (tier, lane, _) in enumerate(TOWER_SLOTS[:SLOTS_PER_SIDE]) if tier == 'Nexus1']
+    nexus = np.isin(slot, nexus1)
+    nexus_key = (game[nexus] * 2 + side[nexus]) * SLOTS_PER_SIDE + slot[nexus]
+    first_nexus = np.zeros(len(nexus_key), dtype=bool)
+    first_nexus[np.unique(nexus_key, return_index=True)[1]] = True
+    slot[np.flatnonzero(nexus)[~first_nexus]] += NEXUS2_OFFSET
+
+    #Events are in game order, so the last one per slot is the first one in reverse.
+    flat_slot = game * len(TOWER_SLOTS) + side * SLOTS_PER_SIDE + slot
+    last = len(flat_slot) - 1 - np.unique(flat_slot[::-1], return_index=True)[1]
+    timeline = np.full(nb_games * len(TOWER_SLOTS), NEVER_FELL, dtype=np.int32)
+    timeline[flat_slot[last]] = np.round(turrets['game_time'][last] * 1000).astype(np.int32)
+    return timeline.reshape(nb_games, len(TOWER_SLOTS))
+
+def tower_timers(times):
+    '''One game's row of the matrix as its <tier><lane><side>Timer values, in
+    seconds, None where the turret never fell.'''
+    return {column: None if time == NEVER_FELL else time / 1000
+            for column, time in zip(TOWER_COLUMNS, times.tolist())}
+
+def timeline_to_columns(timeline, duration=None):
+    '''
+    The <tier><lane><side>Timer columns, in seconds. Turrets that never fell
+    are NaN, as in hackathon-riot-data.csv, or the game duration when one is
+    given.
+    '''
+    seconds = timeline / 1000
+    fell = timeline != NEVER_FELL
+    if duration is None:
+        seconds[~fell] = np.nan
+    else:
+        seconds = np.where(fell, seconds, np.asarray(duration, dtype=float)[:, None])
+    return pd.DataFrame(seconds, columns=TOWER_COLUMNS)
+
+def towers_down_at(timeline, game_time):
+    '''[nb_games, 2] number of blue and red side turrets fallen before
+    <game_time> seconds (a scalar, or one value per game).'''
+    cutoff = np.round(np.asarray(game_time, dtype=float) * 1000).reshape(-1, 1)
+    fallen = timeline < cutoff
+    return np.stack([fallen[:, :SLOTS_PER_SIDE].sum(axis=1), fallen[:, SLOTS_PER_SIDE:].sum(axis=1)], axis=1)
+
+def first_tower(timeline):
+    '''Side whose turret fell first in each game (0 = blue, 1 = red), -1
+    when none fell.'''
+    first = timeline.argmin(axis=1)
+    side = (first >= SLOTS_PER_SIDE).astype(np.int8)
+    side[timeline.min(axis=1) == NEVER_FELL] = NO_SIDE
+    return side
@@ -2,6 +2,7 @@
 
 import pandas as pd
 import json
+from feature_table import load_feature_table
 
 
 def get_team_matches_updated(team_id, mapping_data):
@@ -34,7 +35,7 @@ def compute_total_game_lp_updated(data_path, esportsPlatformId, variable_weights
         else:
             return 1.25
 
-    data = pd.read_csv(data_path)
+    data = load_feature_table(data_path)
     data['version'] = data['gameVersion'].str.split('.').str[0:2].str.join('.')
     data = data.dropna(subset=['version'])
     quantiles = data.groupby('version')['gameDuration'].quantile(
@@ -51,7 +52,7 @@ def compute_total_game_lp_updated(data_path, esportsPlatformId, variable_weights
     game_data = filtered_data.iloc[0]
     lp_points = {"Blue": 0, "Red": 0}
 
-    for position in ["Top", "Jg", "Mid", "AD", "Bot"]:
+    for position in ["Top", "Jg", "Mid", "AD", "Sup"]:
         gold_diff_15 = game_data[f"GoldDiff15{position}"]
         gold_diff_end = game_data[f"GoldDiffEnd{position}"]
         lp_points["Blue"] += variable_weights["GoldDiff"] * \
@@ -128,6 +129,7 @@ variable_weights = {
 }
 
 # Uncomment the line below and replace the paths accordingly when you run the script
-generate_team_report_updated("path_to_csv_file.csv", "path_to_json_file.json",
+# (the data file is the feature table built by feature_table.py)
+generate_team_report_updated("game_features.parquet", "path_to_json_file.json",
                              "team_id_here", "path_to_output_excel_file.xlsx")
 # Note: Please replace the file paths and team_id with appropriate values before running the script.
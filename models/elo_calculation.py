@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 #Just in case:
 from game_scoring import process_and_score_games
+from ranking_snapshot import build_current_ratings, build_ranking_snapshot, build_rating_history, load_rating_history
 import math
 
 def k_factor (k_score, gameScore):
@@ -44,7 +45,8 @@ def elo_formula(blue_id, red_id, winner, game_date, k_score,
     current rating.
 
     At this point, we don't know whether crush score can be implemented, or if
-    we will take bo3/bo5 status under account.'''
+    we will take bo3/bo5 status under account. Predicted series odds (bo3/bo5)
+    are derived from the ratings in backend_AWS/lambda-functions/win_probability.py.'''
 
     res_dict = {
         'blue':(1,0),
@@ -111,6 +113,10 @@ if __name__=='__main__':
     #final_df = scores_df.merge(team_id_df,how='left',left_on='esportsPlatformId',right_on='esportsGameId')
     #final_df = final_df.merge(game_data,how='left',on='esportsPlatformId')
     #final_df.sort_values(by='gameDate',ascending=True,inplace=True)
+    #Still process_everything.csv rather than the feature table (feature_table.py):
+    #the Elo step needs the teams, league, stage and k-factor of every game,
+    #which notebooks/dataset_unification.ipynb joins onto the game scores and
+    #the feature table does not carry.
     final_df = pd.read_csv('process_everything.csv',sep=';')
     final_df = final_df[final_df.gameDate.str.startswith(year_selected)]
 
@@ -148,3 +154,11 @@ if __name__=='__main__':
 
     df_rating = pd.DataFrame(rating_list)
     df_rating.to_csv(f'elos_{year_selected}.csv',sep=';',index=False)
+
+    #Refresh what the ranking API reads: the current ratings table (Athena),
+    #the snapshot it serves from memory and the searchable rating history.
+    rating_history = load_rating_history()
+    build_current_ratings(rating_history)
+    #Before the snapshot, whose version file tells the API to reload.
+    build_rating_history(rating_history)
+    build_ranking_snapshot(rating_history)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+#Roles as they appear in our column names, top to bottom on the draft.
+ROLES = ['Top', 'Jg', 'Mid', 'AD', 'Sup']
+
+#Objectives that go into ObjectiveDiff. Rift Heralds are kept aside because
+#the LPL data (Oracle's Elixir) does not track them.
+OBJECTIVE_COLUMNS = ['TowerKillsEnd', 'InhibKillsEnd', 'BaronKillsEnd', 'DragonKillsEnd']
+HERALD_COLUMNS = ('NbRiftHeraldsBlue', 'NbRiftHeraldsRed')
+
+METRIC_COLUMNS = ['GoldDiffPerMinEnd', 'ADRDiffEnd', 'VisionScoreDiffPerMin', 'ObjectiveDiff']
+
+def safe_ratio(numerator, denominator):
+    '''Assists-to-death ratio without the Division By Zero situation: a team
+    that never died is treated as if it died once.'''
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return numerator / np.where(denominator == 0, 1.0, denominator)
+
+def column_total(df, columns):
+    '''Row-wise sum of a few columns, accumulated in a single array instead of
+    going through an intermediate DataFrame.'''
+    total = df[columns[0]].to_numpy(dtype=float, copy=True)
+    for col in columns[1:]:
+        total += df[col].to_numpy(dtype=float)
+    return total
+
+def side_total(df, template, side):
+    '''Sums a per-role column (e.g. "VisionScore{role}{side}") for one side.'''
+    return column_total(df, [template.format(role=role, side=side) for role in ROLES])
+
+def build_metrics(df, include_heralds=False):
+    '''Builds the four metrics used by the logistic regression straight from
+    the game data:
+    - gold diff/min at the end of the game
+    - ADR, assists/death ratio, at the end of the game
+    - vision score diff/min
+    - objective diff (turrets, inhibs, drakes, barons, and optionally heralds)
+
+    The gold diff is the feature table's GoldDiffEnd, or the difference of
+    the total gold columns in frames without it. Rows where a metric can't be
+    computed (missing endgame stats) are dropped, the index is kept so that the
+    caller can realign its esportsPlatformIds.'''
+    duration_min = df['gameDuration'].to_numpy(dtype=float) / 60
+
+    if 'GoldDiffEnd' in df.columns:
+        gold_diff_end = df['GoldDiffEnd'].to_numpy(dtype=float)
+    else:
+        gold_diff_end = df['BlueTotalGoldEnd'].to_numpy(dtype=float) - df['RedTotalGoldEnd'].to_numpy(dtype=float)
+
+    vision_diff = (side_total(df, 'VisionScore{role}{side}', 'Blue') -
+                   side_total(df, 'VisionScore{role}{side}', 'Red'))
+
+    #We chose the Assist-to-death ratio in the end, highlighting teamwork.
+    #It was statistically significant in testing.
+    adr_diff = (safe_ratio(df['BlueAssistsEnd'], df['BlueDeathsEnd']) -
+                safe_ratio(df['RedAssistsEnd'], df['RedDeathsEnd']))
+
+    objective_diff = (column_total(df, [f'Blue{col}' for col in OBJECTIVE_COLUMNS]) -
+                      column_total(df, [f'Red{col}' for col in OBJECTIVE_COLUMNS]))
+    if include_heralds:
+        objective_diff += (df[HERALD_COLUMNS[0]].to_numpy(dtype=float) -
+                           df[HERALD_COLUMNS[1]].to_numpy(dtype=float))
+
+    metrics_df = pd.DataFrame({
+        'winner': df['winner'].to_numpy(),
+        'GoldDiffPerMinEnd': gold_diff_end / duration_min,
+        'ADRDiffEnd': adr_diff,
+        'VisionScoreDiffPerMin': vision_diff / duration_min,
+        'ObjectiveDiff': objective_diff
+    }, index=df.index)
+
+    complete = np.isfinite(metrics_df[METRIC_COLUMNS].to_numpy()).all(axis=1)
+    if not complete.all():
+        metrics_df = metrics_df[complete]
+    return metrics_df.astype({'ObjectiveDiff': int})
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+#Single place where the Riot data (hackathon-riot-data.csv) and the LPL data
+#(Oracle's Elixir export) meet. Both sources are normalized to the schema
+#below once, stored in a Parquet file, and every model reads from there.
+FEATURE_TABLE = 'game_features.parquet'
+
+#Oracle's Elixir calls the support "Sup", our Riot extraction labels the
+#support gold difference "Bot". We settle on "Sup" everywhere.
+ROLES = ['Top', 'Jg', 'Mid', 'AD', 'Sup']
+SIDES = ['Blue', 'Red']
+
+def _schema():
+    '''Column name -> dtype of the unified feature table.'''
+    schema = {
+        'esportsPlatformId': 'string',
+        'source': pd.CategoricalDtype(['riot', 'lpl']),
+        'gameDate': 'datetime64[ns, UTC]',
+        'gameVersion': 'string',
+        'gameDuration': 'float64',
+        'winner': pd.CategoricalDtype(['blue', 'red']),
+        'GoldDiffEnd': 'float64',
+    }
+    for value in [15, 'End']:
+        for role in ROLES:
+            schema[f'GoldDiff{value}{role}'] = 'float64'
+    for side in SIDES:
+        for role in ROLES:
+            schema[f'VisionScore{role}{side}'] = 'float64'
+        for stat in ['Assists15', 'Deaths15', 'AssistsEnd', 'DeathsEnd', 'TowerKillsEnd',
+                     'InhibKillsEnd', 'BaronKillsEnd', 'DragonKillsEnd']:
+            schema[f'{side}{stat}'] = 'float64'
+        #Missing from the LPL data, left as NaN there.
+        schema[f'NbRiftHeralds{side}'] = 'float64'
+    return schema
+
+SCHEMA = _schema()
+
+def _conform(df, source):
+    '''Reorders and casts a normalized frame to the table schema. Columns that
+    a source doesn't have are added as missing values.'''
+    df = df.reindex(columns=list(SCHEMA))
+    df['source'] = source
+    df['gameDate'] = pd.to_datetime(df['gameDate'], utc=True, format='mixed', errors='coerce')
+    return df.astype(SCHEMA)
+
+def _clean_rows(df):
+    '''Same row filtering the scoring always did: no winner or no date means
+    the row is unusable, and a gameDuration above 7000 indicates incomplete data.'''
+    keep = df['winner'].notna() & df['gameDate'].notna() & (df['gameDuration'] <= 7000)
+    return df[keep]
+
+def normalize_riot(df):
+    '''Riot extraction (build_csv output) to the unified schema.'''
+    df = _clean_rows(df)
+    df = df.rename(columns={f'GoldDiff{value}Bot': f'GoldDiff{value}Sup' for value in [15, 'End']})
+    df = df.assign(GoldDiffEnd=df['BlueTotalGoldEnd'] - df['RedTotalGoldEnd'])
+    return _conform(df, 'riot')
+
+def normalize_lpl(df):
+    '''Oracle's Elixir LPL export to the unified schema: 1 indicates a win for
+    BlueResult, and the gold difference only comes split by role.'''
+    df = df.assign(winner=np.where(df['BlueResult'] == 1, 'blue', 'red'))
+    df = _clean_rows(df)
+    df = df.assign(GoldDiffEnd=df[[f'GoldDiffEnd{role}' for role in ROLES]].sum(axis=1, min_count=len(ROLES)))
+    return _conform(df, 'lpl')
+
+def build_feature_table(riot_filename='hackathon-riot-data.csv',
+                        lpl_filename='oracles_elixir_lpl_data.csv',
+                        output_filename=FEATURE_TABLE):
+    '''Ingestion stage: reads both sources once, normalizes them and writes the
+    result as a single Parquet file with a source column. Re-run it whenever
+    either CSV changes; the models only ever read the output.'''
+    frames = [normalize_riot(pd.read_csv(riot_filename, sep=';'))]
+    if lpl_filename is not None and os.path.isfile(lpl_filename):
+        frames.append(normalize_lpl(pd.read_csv(lpl_filename, sep=';')))
+
+    feature_df = pd.concat(frames, ignore_index=True).astype(SCHEMA)
+    feature_df.to_parquet(output_filename, index=False)
+    return feature_df
+
+def load_feature_table(filename=FEATURE_TABLE, columns=None, source=None):
+    '''Reads the feature table back, optionally only a few columns and/or a
+    single source ('riot' or 'lpl').'''
+    if columns is not None and source is not None and 'source' not in columns:
+        columns = list(columns) + ['source']
+    filters = [('source', '==', source)] if source is not None else None
+    df = pd.read_parquet(filename, columns=columns, filters=filters)
+    return df.reset_index(drop=True)
+
+if __name__ == '__main__':
+    build_feature_table()
@@ -0,0 +1,203 @@
+import datetime as dt
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+#The API's body file is written with the API's own encoder.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend_AWS', 'lambda-functions'))
+from rating_history import RatingHistory
+from snapshot_store import write_body_file
+
+#The ranking API answers from this file instead of querying Athena on every
+#call. It is rebuilt after each Elo update and uploaded next to the tables.
+SNAPSHOT_FILE = 'ranking_snapshot.json'
+#Holds the snapshot version only; the API's response cache watches it to know
+#when to drop what it has.
+VERSION_FILE = 'ranking_version.txt'
+#Pre-encoded responses, mapped into memory by the API (RANKING_BODIES).
+BODIES_FILE = 'ranking_snapshot.bodies'
+#Every team's ratings over time, for rating-as-of-date lookups (RATING_HISTORY).
+RATING_HISTORY_FILE = 'rating_history.npz'
+
+#One row per team and league stage instead of one per game: what the ranking
+#queries actually need. Uploaded as is under the table's S3 location.
+CURRENT_RATINGS_DIR = 'current_ratings'
+CURRENT_RATINGS_DDL = '''
+CREATE EXTERNAL TABLE current_ratings (
+    team_id bigint, team_code string, team_name string, rating double,
+    leaguelabel string, stage_name string, tournament_name string, game_date timestamp,
+    is_league_latest boolean, is_split_latest boolean, is_global_latest boolean)
+PARTITIONED BY (leagueid bigint)
+STORED AS PARQUET
+LOCATION 's3://<bucket>/current_ratings/';
+MSCK REPAIR TABLE current_ratings;
+'''
+
+def load_rating_history(pattern='elos_*.csv'):
+    '''Every elos_<year>.csv produced by elo_calculation.py, in game order.
+    The stage_name matches the one in our Athena tables, e.g.
+    "CBLOL 2020 Split 1 Regular Season 2020".'''
+    frames = [pd.read_csv(filename, sep=';') for filename in sorted(glob.glob(pattern))]
+    history = pd.concat(frames, ignore_index=True)
+    history['date'] = pd.to_datetime(history['date'], utc=True, format='mixed')
+    history['stage_name'] = (history['stageTournament'].astype(str) + ' ' +
+                             history['stageName'].astype(str) + ' ' +
+                             history['year'].astype(str))
+    #Files are chronological already, a stable sort keeps game order within a day.
+    return history.sort_values('date', kind='stable').reset_index(drop=True)
+
+def load_team_names(filename='esports-data/teams.json'):
+    '''team -> (team_code, team_name) from Riot's teams.json, if we have it.'''
+    if not os.path.isfile(filename):
+        return pd.DataFrame(columns=['team', 'team_code', 'team_name'])
+    with open(filename, 'r') as json_file:
+        teams_data = json.load(json_file)
+    teams = pd.DataFrame({
+        'team': [int(team['team_id']) for team in teams_data],
+        'team_code': [team.get('acronym') for team in teams_data],
+        'team_name': [team.get('name') for team in teams_data]
+    })
+    return teams.drop_duplicates(subset=['team'], keep='last')
+
+def latest_ratings(history, keys):
+    '''Last known rating for every combination of keys (team always included).'''
+    latest = history.drop_duplicates(subset=keys + ['team'], keep='last')
+    #Ties on rating are broken by team id, like teamRanking.py does.
+    return latest.sort_values(by=['rating', 'team'], ascending=[False, True], kind='stable')
+
+def latest_split(league_history):
+    '''Rows of a league's latest year and split (stageTournament): the split
+    of its most recent game, which getTeamRankings' team_rankings query keeps
+    (MAX_BY over the date).'''
+    last_game = league_history.iloc[-1]
+    return league_history[(league_history['year'] == last_game['year']) &
+                          (league_history['stageTournament'] == last_game['stageTournament'])]
+
+def team_records(ranked, with_rank=False):
+    '''Rows shaped like the API responses. Athena hands every value back as a
+    string (VarCharValue), except where getTeamRankings converts them, so the
+    snapshot does the same to keep responses identical.'''
+    records = []
+    for rank, row in enumerate(ranked.itertuples(index=False), start=1):
+        record = {
+            'team_id': str(row.team),
+            'team_code': row.team_code,
+            'team_name': row.team_name,
+            'ranking_points': float(row.rating) if with_rank else str(row.rating)
+        }
+        if with_rank:
+            record['rank'] = rank
+        records.append(record)
+    return records
+
+def build_current_ratings(history, teams=None, output_dir=CURRENT_RATINGS_DIR):
+    '''
+    Latest rating of every team in every league stage, partitioned by league
+    (leagueid=<id>/ folders). Flags mark the rows the other queries need:
+    - is_league_latest: the team's latest rating within the league
+    - is_split_latest: the team's latest rating within the league's latest
+      split (see latest_split), which getTeamRankings ranks
+    - is_global_latest: the team's latest rating overall
+    The whole folder is rewritten, so it never holds stale partitions.
+    '''
+    if teams is None:
+        teams = load_team_names()
+    history = history.merge(teams, how='left', on='team')
+    split_keys = ['year', 'stageTournament']
+    last_split = history.groupby('leagueId')[split_keys].transform('last')
+    history['in_latest_split'] = (history[split_keys] == last_split).all(axis=1)
+
+    current = history.drop_duplicates(subset=['leagueId', 'stage_name', 'team'], keep='last')
+    in_split = current['in_latest_split']
+    split_duplicate = current[in_split].duplicated(subset=['leagueId', 'team'], keep='last')
+    current = current.assign(
+        is_league_latest=~current.duplicated(subset=['leagueId', 'team'], keep='last'),
+        is_split_latest=in_split & ~split_duplicate.reindex(current.index, fill_value=True),
+        is_global_latest=~current.duplicated(subset=['team'], keep='last')
+    )
+    current = pd.DataFrame({
+        'team_id': current['team'].astype('int64'),
+        'team_code': current['team_code'].astype('string'),
+        'team_name': current['team_name'].astype('string'),
+        'rating': current['rating'].astype(float),
+        'leaguelabel': current['leagueLabel'].astype('string'),
+        'stage_name': current['stage_name'].astype('string'),
+        'tournament_name': current['stageTournament'].astype(str).astype('string'),
+        'game_date': current['date'],
+        'is_league_latest': current['is_league_latest'],
+        'is_split_latest': current['is_split_latest'],
+        'is_global_latest': current['is_global_latest'],
+        'leagueid': current['leagueId'].astype('int64')
+    })
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    current.to_parquet(output_dir, partition_cols=['leagueid'], index=False)
+    return current
+
+def build_rating_history(history, output_filename=RATING_HISTORY_FILE):
+    '''Saves the rating history sorted by team and date, which getRatingHistory
+    and offline tools search by date (see rating_history.py).'''
+    rating_history = RatingHistory.from_frame(history)
+    rating_history.save(output_filename)
+    return rating_history
+
+def build_ranking_snapshot(history, teams=None, output_filename=SNAPSHOT_FILE,
+                           version_filename=VERSION_FILE, bodies_filename=BODIES_FILE):
+    '''
+    Materializes what the three ranking endpoints serve:
+    - global: latest rating per team, best first (getGlobalRankings)
+    - leagues: latest rating per team within the league's latest split, ranked
+      and labelled with the split as getTeamRankings' query does, and within
+      the whole league, unranked (getTournamentRanking without a stage)
+    - stages: latest rating per team within each league stage (getTournamentRanking)
+    The version is a hash of the content, so an unchanged rebuild keeps it.
+    '''
+    if teams is None:
+        teams = load_team_names()
+    history = history.merge(teams, how='left', on='team')
+    history[['team_code', 'team_name']] = history[['team_code', 'team_name']].astype(object)
+    history = history.where(history.notna(), None)
+
+    snapshot = {
+        'global': team_records(latest_ratings(history, [])),
+        'leagues': {},
+        'stages': {}
+    }
+
+    for league_id, league_history in history.groupby('leagueId', sort=True):
+        league_key = str(league_id)
+        split_history = latest_split(league_history)
+        snapshot['leagues'][league_key] = {
+            'leaguelabel': league_history['leagueLabel'].iloc[-1],
+            'tournament_name': str(split_history['stageTournament'].iloc[-1]),
+            'teams': team_records(latest_ratings(split_history, []), with_rank=True),
+            'latest': team_records(latest_ratings(league_history, []))
+        }
+        snapshot['stages'][league_key] = {
+            stage_name: team_records(latest_ratings(stage_history, []))
+            for stage_name, stage_history in league_history.groupby('stage_name', sort=True)
+        }
+
+    body = json.dumps(snapshot, sort_keys=True)
+    snapshot['version'] = hashlib.sha1(body.encode()).hexdigest()[:16]
+    snapshot['generated_at'] = dt.datetime.now(dt.timezone.utc).isoformat()
+
+    with open(output_filename, 'w') as snapshot_file:
+        json.dump(snapshot, snapshot_file, separators=(',', ':'))
+    write_body_file(snapshot, bodies_filename)
+    #Written last, so a reader that sees a new version finds the new snapshot.
+    with open(version_filename, 'w') as version_file:
+        version_file.write(snapshot['version'])
+    return snapshot
+
+if __name__ == '__main__':
+    rating_history = load_rating_history()
+    build_current_ratings(rating_history)
+    build_rating_history(rating_history)
+    build_ranking_snapshot(rating_history)
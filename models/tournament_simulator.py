@@ -0,0 +1,344 @@
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend_AWS', 'lambda-functions'))
+from win_probability import expected_matrix, series_probability
+from ranking_snapshot import latest_ratings, load_rating_history
+
+#Monte Carlo outlook of a tournament of tournaments-cleaned.json, from the
+#teams' current Elo ratings: completed matches keep their result, the others
+#are drawn from the series win probabilities. Every simulation advances at
+#once: a stage takes the [nb_sims, entrants] array of its teams and returns
+#the [nb_sims, qualifiers] array of the teams it sends to the next one.
+
+#Rating of a team with no rated game yet, as in elo_formula.
+BASE_RATING = 1200
+#Simulations drawn at once; larger runs go in batches of this size.
+BATCH_SIZE = 50_000
+
+def team_id_of(team):
+    '''Integer id of a match team, None while it is still to be decided.'''
+    try:
+        team_id = int(team.get('id'))
+    except (TypeError, ValueError):
+        return None
+    if team_id == 0 or team.get('code') == 'TBD' or team.get('name') == 'TBD':
+        return None
+    return team_id
+
+def match_teams(match):
+    '''(team_a, team_b, winner) of a match, None where unknown.'''
+    teams = match.get('teams') or []
+    team_ids = [team_id_of(team) for team in teams[:2]] + [None] * (2 - len(teams[:2]))
+    winner = None
+    if match.get('state') == 'completed':
+        for team, team_id in zip(teams, team_ids):
+            if (team.get('result') or {}).get('outcome') == 'win':
+                winner = team_id
+    return team_ids[0], team_ids[1], winner
+
+def series_length(match):
+    '''Games in the series: strategy count, even lengths played as the next
+    odd one (the series probability needs a winner).'''
+    count = (match.get('strategy') or {}).get('count') or 1
+    return count if count % 2 else count + 1
+
+def bracket_order(size):
+    '''Seeds (0 = best) in bracket order, best against worst: 0, 7, 3, 4, ...'''
+    order = [0]
+    while len(order) < size:
+        order = [seed for top in order for seed in (top, 2 * len(order) - 1 - top)]
+    return order
+
+def cross_seeding(nb_groups, advance):
+    '''
+    Bracket slots of round robin qualifiers, as positions in the stage's
+    output (group * advance + place). With two teams out of each of an even
+    number of groups, winners meet runners-up of the paired group and group
+    mates start in opposite halves, as at Worlds. Otherwise seeds go by
+    place then group order, best against worst.
+    '''
+    if advance == 2 and nb_groups % 2 == 0:
+        top_half, bottom_half = [], []
+        for group in range(0, nb_groups, 2):
+            top_half += [group * 2, (group + 1) * 2 + 1]
+            bottom_half += [(group + 1) * 2, group * 2 + 1]
+        return top_half + bottom_half
+    seeds = [group * advance + place for place in range(advance) for group in range(nb_groups)]
+    return [seeds[seed] for seed in bracket_order(len(seeds))]
+
+def round_label(nb_teams):
+    return {2: 'Final', 4: 'Semifinals', 8: 'Quarterfinals'}.get(nb_teams, f'Round of {nb_teams}')
+
+class RoundRobin:
+    '''
+    Groups whose teams all meet, the best <advance> of each going through.
+    Fixtures are (team_a, team_b, best_of, winner), winner None if unplayed.
+    Ties on wins are broken at random: tiebreaker games and head-to-head
+    rules are not modelled.
+    '''
+
+    def __init__(self, name, groups, fixtures, advance=1):
+        self.name = name
+        self.groups = [list(group) for group in groups]
+        self.fixtures = list(fixtures)
+        self.advance = advance
+
+    def team_ids(self):
+        return [team_id for group in self.groups for team_id in group]
+
+    def columns(self):
+        return [self.name]
+
+    def simulate(self, tournament, entrants, nb_sims, rng, counts):
+        teams = tournament.positions_of(self.team_ids())
+        local = {team_id: i for i, team_id in enumerate(self.team_ids())}
+        team_a = np.array([local[fixture[0]] for fixture in self.fixtures], dtype=np.int64)
+        team_b = np.array([local[fixture[1]] for fixture in self.fixtures], dtype=np.int64)
+        p = np.array([tournament.probability(a, b, best_of) if winner is None else float(winner == a)
+                      for a, b, best_of, winner in self.fixtures])
+
+        #Wins per team: one matrix product per side instead of a loop over fixtures.
+        a_wins = rng.random((nb_sims, len(self.fixtures))) < p
+        one_hot = np.eye(len(teams), dtype=np.float32)
+        wins = a_wins.astype(np.float32) @ one_hot[team_a] + (~a_wins).astype(np.float32) @ one_hot[team_b]
+        standings = wins + rng.random(wins.shape)
+
+        qualifiers = []
+        start = 0
+        for group in self.groups:
+            columns = np.arange(start, start + len(group))
+            places = np.argsort(-standings[:, columns], axis=1, kind='stable')[:, :self.advance]
+            qualifiers.append(teams[columns][places])
+            start += len(group)
+        qualifiers = np.stack(qualifiers, axis=1).reshape(nb_sims, -1)
+        counts[self.name] += np.bincount(qualifiers.ravel(), minlength=len(tournament.team_ids))
+        return qualifiers
+
+class SingleElimination:
+    '''
+    A bracket played down to one winner. Teams are the first round in
+    bracket order when the file has them, otherwise <seeding> picks them
+    from the previous stage's qualifiers. Results are {(winner, loser)} of
+    the completed series.
+    '''
+
+    def __init__(self, name, rounds, results=(), teams=None, seeding=None):
+        self.name = name
+        self.rounds = list(rounds)
+        self.results = set(results)
+        self.teams = None if teams is None else list(teams)
+        self.seeding = None if seeding is None else list(seeding)
+
+    def team_ids(self):
+        return self.teams or []
+
+    def columns(self):
+        size = 2 ** len(self.rounds)
+        return [f'{self.name} {round_label(size >> i)}' for i in range(len(self.rounds))] + [self.name]
+
+    def simulate(self, tournament, entrants, nb_sims, rng, counts):
+        if self.teams is not None:
+            slots = np.broadcast_to(tournament.positions_of(self.teams), (nb_sims, len(self.teams)))
+        else:
+            slots = entrants[:, self.seeding]
+        nb_teams = len(tournament.team_ids)
+        #1 where the row team beat the column team, 0 for the reverse, -1 if unplayed.
+        played = np.full((nb_teams, nb_teams), -1, dtype=np.int8)
+        for winner, loser in self.results:
+            winner, loser = tournament.positions_of([winner, loser])
+            played[winner, loser], played[loser, winner] = 1, 0
+
+        for column, best_of in zip(self.columns(), self.rounds):
+            counts[column] += np.bincount(slots.ravel(), minlength=nb_teams)
+            team_a, team_b = slots[:, 0::2], slots[:, 1::2]
+            p = tournament.matrix(best_of)[team_a, team_b]
+            result = played[team_a, team_b]
+            p = np.where(result >= 0, result, p)
+            slots = np.where(rng.random(team_a.shape) < p, team_a, team_b)
+        counts[self.name] += np.bincount(slots.ravel(), minlength=nb_teams)
+        return slots
+
+class Tournament:
+    '''Stages in play order and the ratings of their teams (BASE_RATING for
+    teams without one).'''
+
+    def __init__(self, name, stages, ratings):
+        self.name = name
+        self.stages = list(stages)
+        self.team_ids = np.array(sorted({team_id for stage in self.stages for team_id in stage.team_ids()}),
+                                 dtype=np.int64)
+        self.positions = {int(team_id): i for i, team_id in enumerate(self.team_ids)}
+        self.ratings = np.array([ratings.get(int(team_id), BASE_RATING) for team_id in self.team_ids], dtype=float)
+        self.matrices = {}
+
+    def positions_of(self, team_ids):
+        return np.array([self.positions[team_id] for team_id in team_ids], dtype=np.int64)
+
+    def matrix(self, best_of):
+        '''Series win probabilities between every pair of teams, computed once
+        per series length.'''
+        if best_of not in self.matrices:
+            matrix = expected_matrix(self.ratings)
+            self.matrices[best_of] = series_probability(matrix, best_of) if best_of > 1 else matrix
+        return self.matrices[best_of]
+
+    def probability(self, team_a, team_b, best_of=1):
+        return self.matrix(best_of)[self.positions[team_a], self.positions[team_b]]
+
+    def columns(self):
+        return [column for stage in self.stages for column in stage.columns()]
+
+    def counts(self, nb_sims, seed=None):
+        '''How often each team reached each column's round, over nb_sims runs.'''
+        rng = np.random.default_rng(seed)
+        counts = {column: np.zeros(len(self.team_ids), dtype=np.int64) for column in self.columns()}
+        for start in range(0, nb_sims, BATCH_SIZE):
+            batch = min(BATCH_SIZE, nb_sims - start)
+            entrants = None
+            for stage in self.stages:
+                entrants = stage.simulate(self, entrants, batch, rng, counts)
+        return counts
+
+    def simulate(self, nb_sims=100_000, seed=None, processes=None):
+        '''
+        Advancement odds of every team: one column per stage (qualified, or
+        won it for the last one) and per bracket round reached, best odds of
+        winning the event first. <processes> splits the runs over that many
+        worker processes, each with its own random stream.
+        '''
+        if processes and processes > 1:
+            seeds = np.random.SeedSequence(seed).spawn(processes)
+            chunks = [nb_sims // processes + (i < nb_sims % processes) for i in range(processes)]
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.starmap(self.counts, zip(chunks, seeds))
+            counts = {column: sum(result[column] for result in results) for column in self.columns()}
+        else:
+            counts = self.counts(nb_sims, seed)
+
+        odds = pd.DataFrame({'team_id': self.team_ids, 'rating': self.ratings})
+        for column, count in counts.items():
+            odds[column] = count / nb_sims
+        odds['title'] = odds[self.stages[-1].name]
+        return odds.sort_values(['title', 'rating', 'team_id'], ascending=[False, False, True]).reset_index(drop=True)
+
+def is_round_robin(matches):
+    '''Every pair of the section's (known, more than two) teams meets.'''
+    teams = [match_teams(match) for match in matches]
+    if not teams or any(team_a is None or team_b is None for team_a, team_b, _ in teams):
+        return False
+    team_ids = {team_id for team_a, team_b, _ in teams for team_id in (team_a, team_b)}
+    pairs = {frozenset((team_a, team_b)) for team_a, team_b, _ in teams}
+    return len(team_ids) > 2 and len(pairs) == len(team_ids) * (len(team_ids) - 1) // 2
+
+def round_robin_stage(stage):
+    groups, fixtures = [], []
+    for section in stage.get('sections') or []:
+        group = []
+        for match in section.get('matches') or []:
+            team_a, team_b, winner = match_teams(match)
+            group += [team_id for team_id in (team_a, team_b) if team_id not in group]
+            fixtures.append((team_a, team_b, series_length(match), winner))
+        groups.append(group)
+    return RoundRobin(stage.get('name'), groups, fixtures)
+
+def elimination_stage(stage):
+    matches = [match for section in stage.get('sections') or [] for match in section.get('matches') or []]
+    nb_teams = len(matches) + 1
+    if nb_teams < 2 or nb_teams & (nb_teams - 1):
+        raise ValueError(f"Stage {stage.get('name')}: {len(matches)} matches are neither a round robin "
+                         "of known teams nor a single-elimination bracket")
+    rounds, results = [], set()
+    start = 0
+    while start < len(matches):
+        size = (nb_teams >> len(rounds)) // 2
+        rounds.append(series_length(matches[start]))
+        start += size
+    for match in matches:
+        team_a, team_b, winner = match_teams(match)
+        if winner is not None:
+            results.add((winner, team_b if winner == team_a else team_a))
+    first_round = [team_id for match in matches[:nb_teams // 2] for team_id in match_teams(match)[:2]]
+    teams = first_round if None not in first_round else None
+    return SingleElimination(stage.get('name'), rounds, results, teams)
+
+def carried_per_group(previous, stage):
+    '''Teams each group of a round robin sends to the round robin after it,
+    counted from the teams the next one lists: the same number per group.'''
+    next_teams = set(stage.team_ids())
+    carried = {sum(team_id in next_teams for team_id in group) for group in previous.groups}
+    if len(carried) != 1 or 0 in carried:
+        raise ValueError(f'Stage {previous.name}: groups do not send the same number of teams to {stage.name}')
+    return carried.pop()
+
+def tournament_stages(tournament):
+    '''
+    Stages of one tournament of tournaments-cleaned.json. A stage whose
+    sections are complete round robins is a RoundRobin, one group per
+    section; any other stage must be a single-elimination bracket whose
+    matches are listed round by round, the winners of matches 2k and 2k+1
+    meeting next. A bracket whose first round is still to be decided is
+    seeded from the round robin before it (see cross_seeding). A round robin
+    followed by another one sends on as many teams per group as the next
+    one's teams show; the next one's teams must be known.
+    Swiss and double-elimination stages are rejected with a ValueError: their
+    sections are not complete round robins and their match counts do not
+    make a single-elimination bracket.
+    '''
+    stages = []
+    for stage in tournament.get('stages') or []:
+        sections = [section.get('matches') or [] for section in stage.get('sections') or []]
+        if sections and all(is_round_robin(matches) for matches in sections):
+            stages.append(round_robin_stage(stage))
+        else:
+            stages.append(elimination_stage(stage))
+
+    for previous, stage in zip(stages, stages[1:]):
+        if isinstance(stage, RoundRobin):
+            if isinstance(previous, RoundRobin):
+                previous.advance = carried_per_group(previous, stage)
+            continue
+        if isinstance(previous, RoundRobin):
+            nb_teams = 2 ** len(stage.rounds)
+            if nb_teams % len(previous.groups):
+                raise ValueError(f'Stage {stage.name}: {nb_teams} teams cannot come evenly from '
+                                 f'{len(previous.groups)} groups')
+            previous.advance = nb_teams // len(previous.groups)
+            if stage.teams is None:
+                stage.seeding = cross_seeding(len(previous.groups), previous.advance)
+        elif stage.teams is None:
+            raise ValueError(f'Stage {stage.name}: teams can only be seeded from a round robin')
+    if stages and isinstance(stages[0], SingleElimination) and stages[0].teams is None:
+        raise ValueError(f'Stage {stages[0].name}: teams are not decided yet')
+    return stages
+
+def load_tournament(tournament, directory="esports-data"):
+    '''A tournament of tournaments-cleaned.json, by id or slug.'''
+    with open(f"{directory}/tournaments-cleaned.json", "r") as json_file:
+        tournaments_data = json.load(json_file)
+    for tournament_data in tournaments_data:
+        if str(tournament_data.get('id')) == str(tournament) or tournament_data.get('slug') == tournament:
+            return tournament_data
+    raise KeyError(f'No tournament {tournament} in {directory}/tournaments-cleaned.json')
+
+def current_ratings(pattern='elos_*.csv'):
+    '''team -> latest rating, from elo_calculation.py's output.'''
+    latest = latest_ratings(load_rating_history(pattern), [])
+    return dict(zip(latest['team'].astype(np.int64).tolist(), latest['rating'].astype(float).tolist()))
+
+def build_tournament(tournament_data, ratings):
+    return Tournament(tournament_data.get('slug') or str(tournament_data.get('id')),
+                      tournament_stages(tournament_data), ratings)
+
+if __name__ == '__main__':
+    #python tournament_simulator.py <tournament id or slug> [nb_sims], from the
+    #folder holding elos_<year>.csv and esports-data/
+    nb_sims = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    tournament = build_tournament(load_tournament(sys.argv[1]), current_ratings())
+    odds = tournament.simulate(nb_sims, processes=os.cpu_count())
+    print(odds.to_string(index=False, float_format=lambda value: f'{value:.3f}'))